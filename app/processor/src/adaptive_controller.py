@@ -0,0 +1,133 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+CPU_TEMP_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """
+    One step on the degradation ladder.
+
+    Attributes:
+        detect_stride: Run detection on every Nth frame.
+        imgsz_scale: Detector input size relative to the strategy's configured size.
+        max_crops: Cap on classifier crops per frame, None for the configured batch size.
+            At least 1: the classifier is the only source of species names.
+    """
+    detect_stride: int
+    imgsz_scale: float
+    max_crops: Optional[int] = None
+
+    def __post_init__(self):
+        if self.max_crops is not None and self.max_crops < 1:
+            raise ValueError(f'max_crops must be at least 1, got {self.max_crops}')
+
+
+# Cheapest knobs first: classifier budget, then input size, then detection cadence
+QUALITY_LEVELS = [
+    QualityLevel(detect_stride=1, imgsz_scale=1.0),
+    QualityLevel(detect_stride=1, imgsz_scale=1.0, max_crops=2),
+    QualityLevel(detect_stride=1, imgsz_scale=0.8, max_crops=1),
+    QualityLevel(detect_stride=2, imgsz_scale=0.8, max_crops=1),
+    QualityLevel(detect_stride=3, imgsz_scale=0.6, max_crops=1),
+]
+
+
+def read_cpu_temp(path: str = CPU_TEMP_PATH) -> Optional[float]:
+    """Read CPU temperature in °C, or None if the sensor isn't available."""
+    try:
+        with open(path) as f:
+            return int(f.read().strip()) / 1000
+    except (OSError, ValueError):
+        return None
+
+
+class AdaptiveController:
+    """
+    Live controller that trades detection quality for speed.
+
+    Watches wall-clock FPS from FPSTracker and the CPU temperature, and moves
+    along QUALITY_LEVELS: one step down when FPS is below target or the CPU
+    is too hot, one step up when there is clear headroom. Adjusts the
+    detection cadence, the detector input size and the classifier budget.
+    """
+
+    def __init__(self, fps_tracker, frame_processor, strategy, target_fps: float = 5.0, max_cpu_temp: float = 75.0,
+                 interval: float = 5.0, upgrade_cooldown: float = 30.0, min_samples: int = 10):
+        """
+        Args:
+            fps_tracker: FPSTracker timing the detection stage, reset together with reset()
+            frame_processor: FrameProcessor whose detect_stride is tuned
+            strategy: DetectionStrategy whose imgsz and max_batch_size are tuned
+            target_fps: FPS to sustain
+            max_cpu_temp: CPU temperature ceiling in °C
+            interval: Seconds between decisions
+            upgrade_cooldown: Seconds to wait after a downgrade before upgrading again
+            min_samples: Frames needed in the rolling window before deciding
+        """
+        self.fps_tracker = fps_tracker
+        self.frame_processor = frame_processor
+        self.strategy = strategy
+        self.target_fps = target_fps
+        self.max_cpu_temp = max_cpu_temp
+        self.interval = interval
+        self.upgrade_cooldown = upgrade_cooldown
+        self.min_samples = min_samples
+        self.logger = logging.getLogger(__name__)
+
+        self.base_imgsz = strategy.imgsz
+        self.base_batch_size = strategy.max_batch_size
+        self.reset()
+
+    def reset(self):
+        """Back to full quality for a new recording; call when the FPSTracker is reset."""
+        self.level = 0
+        self.last_check = time.monotonic()
+        self.last_downgrade = 0.0
+        self._apply()
+
+    def update(self):
+        """Call after each frame; re-evaluates the quality level at most once per interval."""
+        now = time.monotonic()
+        if now - self.last_check < self.interval:
+            return
+        if len(self.fps_tracker.recent_frame_times) < self.min_samples:
+            return
+        self.last_check = now
+
+        fps = self.fps_tracker.rolling_fps()
+        if fps is None:
+            return
+        temp = read_cpu_temp()
+        too_hot = temp is not None and temp >= self.max_cpu_temp
+        too_slow = fps < self.target_fps * 0.9
+        # Hysteresis: only step up with clear headroom and after a cooldown
+        has_headroom = (fps > self.target_fps * 1.5
+                        and (temp is None or temp < self.max_cpu_temp - 5)
+                        and now - self.last_downgrade >= self.upgrade_cooldown)
+
+        if (too_hot or too_slow) and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+            self.last_downgrade = now
+        elif has_headroom and self.level > 0:
+            self.level -= 1
+        else:
+            return
+
+        self._apply()
+        temp_str = f'{temp:.0f}°C' if temp is not None else 'n/a'
+        self.logger.info(
+            f'Quality level {self.level} (FPS {fps:.1f}, CPU {temp_str}): '
+            f'stride={self.frame_processor.detect_stride}, imgsz={self.strategy.imgsz}, '
+            f'batch={self.strategy.max_batch_size}')
+
+    def _apply(self):
+        level = QUALITY_LEVELS[self.level]
+        self.frame_processor.detect_stride = level.detect_stride
+        # Model input sizes must stay multiples of 32; fixed-size exports (e.g. static ONNX) can't be resized
+        if not getattr(self.strategy, 'fixed_imgsz', False):
+            self.strategy.imgsz = max(32, int(self.base_imgsz * level.imgsz_scale) // 32 * 32)
+        self.strategy.max_batch_size = min(self.base_batch_size, level.max_crops or self.base_batch_size)
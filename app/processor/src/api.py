@@ -1,10 +1,37 @@
+import itertools
+import json
 import logging
-import requests
 import os
+import threading
+import time
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
 
 
 class API():
-    def __init__(self):
+    """
+    Web API client.
+
+    Calls that need a response (set_active_species, activity_log) are sent synchronously,
+    on a session separate from the sender's so they never wait behind its uploads or backoff.
+    Notifications and new videos are queued and sent by a background thread with retry and
+    exponential backoff, so a slow or restarting web container never stalls the frame loop.
+    Pending notifications of the same kind are coalesced. create_video payloads are spooled
+    to disk first and only deleted once the web API accepts them.
+    """
+
+    def __init__(self, timeout=10.0, max_retries=5, backoff=1.0, max_backoff=60.0, queue_size=100,
+                 spool_dir='data/api_spool'):
+        """
+        Args:
+            timeout: Seconds to wait for each request
+            max_retries: Attempts before a queued notification is dropped (spooled videos never are)
+            backoff: Initial retry delay in seconds, doubled after each failure
+            max_backoff: Upper bound on the retry delay
+            queue_size: Max queued requests; the oldest notification is dropped when full
+            spool_dir: Directory for create_video payloads not yet accepted by the web API
+        """
         self.logger = logging.getLogger(__name__)
 
         # Ensure the API URL base is available
@@ -13,12 +40,65 @@ class API():
             raise EnvironmentError(
                 "API_URL_BASE environment variable is not set.")
 
-    def _send_request(self, method, endpoint, json_data):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_size = queue_size
+        self.spool_dir = spool_dir
+
+        # Persistent connection pools. The sender thread has its own, so heartbeats and
+        # set_active_species never queue behind a slow upload; synchronous calls from the
+        # main and heartbeat threads share the other one.
+        self.session = self._make_session(pool_maxsize=4)
+        self.sender_session = self._make_session(pool_maxsize=1)
+
+        self._pending = OrderedDict()  # key -> job, oldest first
+        self._cond = threading.Condition()
+        self._ids = itertools.count()
+        self._closed = False
+        self._worker = None
+
+    @staticmethod
+    def _make_session(pool_maxsize):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def start(self):
+        """Start the background sender and requeue videos spooled by a previous run."""
+        if self._worker:
+            return
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            spooled = sorted(f for f in os.listdir(self.spool_dir) if f.endswith('.json'))
+            if spooled:
+                self.logger.info(f'Resending {len(spooled)} spooled video(s)')
+            for name in spooled:
+                self._enqueue('POST', 'videos', None, spool_path=os.path.join(self.spool_dir, name))
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def close(self, timeout=5.0):
+        """Stop the sender, giving queued requests up to `timeout` seconds to go out."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending and self._worker and time.monotonic() < deadline:
+                self._cond.wait(0.1)
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker:
+            self._worker.join(timeout=1)
+        self.session.close()
+        self.sender_session.close()
+
+    def _send_request(self, method, endpoint, json_data, session=None):
         """ Helper function to send HTTP requests and handle errors """
         url = f"{self.api_url_base}/{endpoint}"
         try:
-            # Directly use requests methods based on method argument
-            response = requests.request(method, url, json=json_data)
+            response = (session or self.session).request(method, url, json=json_data, timeout=self.timeout)
 
             # Raise an error if the response status code is not 200 or 201
             response.raise_for_status()
@@ -28,21 +108,110 @@ class API():
             self.logger.error(f"API request failed for {url}: {e}")
             raise  # Re-raise the exception after logging it
 
+    def _enqueue(self, method, endpoint, json_data, key=None, spool_path=None):
+        """Queue a request for the sender thread. Jobs with the same key replace each other."""
+        job = {'method': method, 'endpoint': endpoint, 'json': json_data, 'spool_path': spool_path, 'attempts': 0}
+        with self._cond:
+            if key is None:
+                key = next(self._ids)
+            if key not in self._pending and len(self._pending) >= self.queue_size:
+                self._drop_oldest_notification()
+            self._pending[key] = job
+            self._cond.notify()
+
+    def _drop_oldest_notification(self):
+        for key, job in self._pending.items():
+            if not job['spool_path']:
+                del self._pending[key]
+                self.logger.warning(f"API queue full, dropped {job['endpoint']} request")
+                return
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, job = self._pending.popitem(last=False)
+                self._cond.notify_all()
+
+            delay = self._deliver(key, job)
+            if delay:
+                with self._cond:
+                    # Back off; close() cuts the wait short
+                    self._cond.wait_for(lambda: self._closed, timeout=delay)
+
+    def _deliver(self, key, job):
+        """Send one queued job. Returns a retry delay in seconds if it failed and was requeued."""
+        try:
+            data = job['json']
+            if job['spool_path']:
+                with open(job['spool_path']) as f:
+                    data = json.load(f)
+            self._send_request(job['method'], job['endpoint'], data, session=self.sender_session)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            # Client errors other than rate limiting won't succeed on retry
+            if status is not None and 400 <= status < 500 and status != 429:
+                self._discard(job)
+                return 0
+            return self._retry(key, job)
+        except requests.exceptions.RequestException:
+            return self._retry(key, job)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Can't read spooled request {job['spool_path']}: {e}")
+            if os.path.exists(job['spool_path']):
+                self._discard(job)
+            return 0
+
+        if job['spool_path']:
+            os.remove(job['spool_path'])
+        return 0
+
+    def _retry(self, key, job):
+        job['attempts'] += 1
+        if not job['spool_path'] and job['attempts'] > self.max_retries:
+            self.logger.warning(f"Giving up on {job['endpoint']} after {job['attempts']} attempts")
+            return 0
+        with self._cond:
+            # A newer coalesced job supersedes this one
+            if key not in self._pending:
+                self._pending[key] = job
+        return min(self.backoff * 2 ** (job['attempts'] - 1), self.max_backoff)
+
+    def _discard(self, job):
+        if job['spool_path']:
+            # Keep rejected payloads around for inspection instead of retrying forever
+            failed_dir = os.path.join(self.spool_dir, 'failed')
+            os.makedirs(failed_dir, exist_ok=True)
+            os.replace(job['spool_path'], os.path.join(failed_dir, os.path.basename(job['spool_path'])))
+        self.logger.error(f"API rejected {job['endpoint']} request, not retrying")
+
+    def _spool(self, data):
+        """Write a payload to the spool directory atomically and return its path."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d%H%M%S')}_{next(self._ids)}.json"
+        path = os.path.join(self.spool_dir, name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+        return path
+
     def notify_motion(self):
-        # No need for try/except here since _send_request handles errors
-        self._send_request('POST', 'notify/motion', {})
+        self._enqueue('POST', 'notify/motion', {}, key='motion')
 
     def notify_species(self, species):
-        # No need for try/except here since _send_request handles errors
-        self._send_request('POST', 'notify/detections', {'detection': species})
+        self._enqueue('POST', 'notify/detections', {'detection': species}, key=('species', species))
 
     def create_video(self, species_video, species_audio, start_time, end_time, video_path, spectrogram_path):
+        """Queue a new video for upload. The payload is spooled to disk until the web API accepts it."""
         # Fields to exclude from API payload (non-serializable or internal)
         exclude_fields = {'best_frame'}
-        
+
         def clean_detection(d):
             return {k: v for k, v in d.items() if k not in exclude_fields}
-        
+
         video_data = {
             'processor_version': '1',
             'species': [clean_detection(sp) for sp in species_video] + [{**sp, 'source': 'audio'} for sp in species_audio],
@@ -51,8 +220,10 @@ class API():
             'video_path': video_path,
             'spectrogram_path': spectrogram_path
         }
-        response = self._send_request('POST', 'videos', video_data)
-        return response.json()
+        if self.spool_dir:
+            self._enqueue('POST', 'videos', None, spool_path=self._spool(video_data))
+        else:
+            self._enqueue('POST', 'videos', video_data)
 
     def set_active_species(self, active_names):
         response = self._send_request('PUT', 'species/active', active_names)
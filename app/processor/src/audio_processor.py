@@ -2,14 +2,31 @@ import time
 import logging
 import os
 import subprocess
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-import librosa
-import librosa.display
 from datetime import datetime
-from birdnetlib import Recording
+from birdnetlib import RecordingBuffer
 from birdnetlib.analyzer import Analyzer
 from birdnetlib.species import SpeciesList
+from spectrogram import mel_power, power_to_db, render_spectrogram, save_spectrogram
+
+
+def read_pcm(path):
+    """Raw s16le mono audio as float32 samples in [-1, 1]."""
+    return np.fromfile(path, dtype='<i2').astype(np.float32) / 32768
+
+
+_species_list = None  # Loads the BirdNET metadata model, created on first use
+
+
+def get_regional_species(lat, lon, date=None):
+    """Common names of the species BirdNET expects at a location around a date."""
+    global _species_list
+    if _species_list is None:
+        _species_list = SpeciesList()
+    species = _species_list.return_list(
+        lat=lat, lon=lon, date=date or datetime.now(), threshold=0.03)
+    return [s['common_name'] for s in species]
 
 
 class AudioProcessor:
@@ -18,70 +35,40 @@ class AudioProcessor:
         self.lon = lon
         self.spectrogram_px_per_sec = spectrogram_px_per_sec
         self.logger = logging.getLogger(__name__)
-        self.analyzer = Analyzer()
-        self.species_list = SpeciesList()
+        self._analyzer = None  # BirdNET's TFLite model, loaded on first analysis
         self.sample_rate = 48000
+        self.min_conf = 0.5
+        self.stream = None
 
     def extract_audio(self, video_path):
-        temp_path = f"{os.path.splitext(video_path)[0]}_temp.wav"
-        subprocess.run(['ffmpeg', '-i', video_path, '-vn', '-acodec', 'pcm_s16le',
-                        '-ar', str(self.sample_rate), '-ac', '1', '-y', temp_path],
-                       check=True, stderr=subprocess.PIPE)
-        return temp_path
+        """Decode the video's audio track to mono float32 samples, piped from ffmpeg without a temp file."""
+        result = subprocess.run(['ffmpeg', '-i', video_path, '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+                                 '-ar', str(self.sample_rate), '-ac', '1', '-'],
+                                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768
 
     def generate_spectrogram(self, ndarray: np.ndarray, sr: int, output_path: str,
-                             height_px: int = 256,
-                             dpi: int = 100) -> None:
-        """Generate mel spectrogram from audio ndarray in 500-12000Hz range"""
-        start_total = time.time()
+                             height_px: int = 256) -> None:
+        """Generate mel spectrogram from audio ndarray in 200-12000Hz range"""
+        st = time.time()
         duration = len(ndarray) / sr
         width_px = int(duration * self.spectrogram_px_per_sec)
-
-        n_fft = 2048
         hop_length = int(sr / self.spectrogram_px_per_sec)
 
-        mel_spec = librosa.feature.melspectrogram(
-            y=ndarray,
-            sr=sr,
-            n_fft=n_fft,
-            hop_length=hop_length,
-            n_mels=128,
-            fmin=200,
-            fmax=12000,
-            power=2.0
-        )
-        S_db = librosa.power_to_db(mel_spec, ref=np.max)
+        S_db = power_to_db(mel_power(ndarray, sr, n_fft=2048, hop_length=hop_length,
+                                     n_mels=128, fmin=200, fmax=12000))
+        save_spectrogram(render_spectrogram(S_db, sr, width_px, height_px, vmin=-60, vmax=0), output_path)
 
-        # Use plt.figure in a try-finally block to ensure cleanup
-        try:
-            fig = plt.figure(figsize=(width_px/dpi, height_px/dpi))
-            ax = plt.Axes(fig, [0., 0., 1., 1.])
-            ax.set_axis_off()
-            fig.add_axes(ax)
-
-            librosa.display.specshow(
-                S_db, sr=sr, ax=ax,
-                cmap='magma',
-                x_axis='time',
-                y_axis='mel',
-                hop_length=hop_length,
-                vmin=-60,
-                vmax=0
-            )
-
-            plt.savefig(output_path, dpi=dpi, bbox_inches=None,
-                        pad_inches=0, format='jpeg', pil_kwargs={'quality': 85, 'optimize': True})
-        finally:
-            # Ensure proper cleanup of matplotlib resources
-            plt.close('all')  # Close all figures to prevent memory leaks
+        self.logger.debug(f"Spectrogram generation time: {time.time() - st:.2f}s")
 
-        self.logger.info(
-            f"Total spectrogram generation time: {time.time() - start_total:.2f}s")
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            self._analyzer = Analyzer()
+        return self._analyzer
 
-    def get_regional_species(self):
-        species = self.species_list.return_list(
-            lat=self.lat, lon=self.lon, date=datetime.now(), threshold=0.03)
-        return [s['common_name'] for s in species]
+    def get_regional_species(self, date=None):
+        return get_regional_species(self.lat, self.lon, date)
 
     def merge_detections(self, detections):
         """
@@ -116,50 +103,174 @@ class AudioProcessor:
         merged.append(current)
         return merged
 
+    def start_stream(self, pcm_path):
+        """Start analyzing audio tapped to `pcm_path` (raw s16le mono) while recording is in progress."""
+        self.cancel_stream()
+        self.stream = AudioStream(self, pcm_path)
+        self.stream.start()
+
+    def cancel_stream(self):
+        """Stop the current stream without using its results."""
+        stream, self.stream = self.stream, None
+        if stream:
+            stream.stop()
+            stream.cleanup()
+
+    def stop_stream(self):
+        """
+        Stop the current stream once recording has stopped. Only the last partial window is
+        left to analyze, so this returns quickly.
+
+        Returns:
+            Tuple of (raw detections, path of the tapped PCM). Detections are None if nothing
+            was streamed, in which case the recording itself has to be analyzed.
+        """
+        stream, self.stream = self.stream, None
+        if stream is None:
+            return None, None
+        stream.stop()
+        if stream.error or not stream.samples_analyzed:
+            self.logger.warning('No streamed audio available, the recording will be analyzed instead')
+            stream.cleanup()
+            return None, None
+        self.logger.info(f'Streamed {stream.samples_analyzed / self.sample_rate:.1f}s of audio')
+        return stream.detections, stream.pcm_path
+
+    def finish(self, video_path, raw_detections=None, pcm_path=None):
+        """
+        Produce merged detections and the spectrogram for a finished recording, from
+        streamed detections if available or by analyzing the recording otherwise.
+
+        Returns:
+            Tuple of (merged detections, spectrogram path or None)
+        """
+        if raw_detections is None:
+            return self.run(video_path)
+        try:
+            return self._finalize(raw_detections, lambda: read_pcm(pcm_path), video_path)
+        except Exception as e:
+            self.logger.error(f'Error processing audio: {e}')
+            return [], None
+        finally:
+            if pcm_path and os.path.exists(pcm_path):
+                os.remove(pcm_path)
+
+    def analyze_samples(self, samples, offset=0.0):
+        """Run BirdNET on a float32 mono buffer; detection times are shifted by `offset` seconds."""
+        recording = RecordingBuffer(
+            self.analyzer,
+            samples,
+            self.sample_rate,
+            lat=self.lat,
+            lon=self.lon,
+            date=datetime.now(),
+            min_conf=self.min_conf,
+        )
+        recording.analyze()
+        return [{
+            'species_name': det['common_name'],
+            'start_time': det['start_time'] + offset,
+            'end_time': det['end_time'] + offset,
+            'confidence': det['confidence'],
+            'source': 'audio'
+        } for det in recording.detections]
+
+    def _finalize(self, raw_detections, load_audio, video_path):
+        """Merge adjacent detections and render the spectrogram if anything was heard."""
+        merged_detections = self.merge_detections(raw_detections)
+
+        # Generate spectrogram if there are audio detections
+        spectrogram_path = None
+        if merged_detections:
+            spectrogram_path = os.path.join(
+                os.path.dirname(video_path), f"spectrogram_{self.spectrogram_px_per_sec}.jpg")
+            self.generate_spectrogram(load_audio(), self.sample_rate, spectrogram_path)
+        return merged_detections, spectrogram_path
+
     def run(self, video_path):
         self.logger.info(f'Processing audio from video "{video_path}"...')
         st = time.time()
 
         try:
-            # Extract audio to temporary WAV file
-            temp_audio_path = self.extract_audio(video_path)
-
-            recording = Recording(
-                self.analyzer,
-                temp_audio_path,
-                lat=self.lat,
-                lon=self.lon,
-                date=datetime.now(),
-                min_conf=0.5,
-            )
-            recording.analyze()
-
-            # Convert detections and merge adjacent ones
-            raw_detections = [{
-                'species_name': det['common_name'],
-                'start_time': det['start_time'],
-                'end_time': det['end_time'],
-                'confidence': det['confidence'],
-                'source': 'audio'
-            } for det in recording.detections]
-
-            merged_detections = self.merge_detections(raw_detections)
-
-            # Generate spectrogram if there are audio detections
-            spectrogram_path = None
-            if merged_detections:
-                spectrogram_path = os.path.join(
-                    os.path.dirname(video_path), f"spectrogram_{self.spectrogram_px_per_sec}.jpg")
-                self.generate_spectrogram(
-                    recording.ndarray, self.sample_rate, spectrogram_path)
+            # Decode audio straight into memory and analyze the array
+            samples = self.extract_audio(video_path)
+            raw_detections = self.analyze_samples(samples)
+
+            merged_detections, spectrogram_path = self._finalize(
+                raw_detections, lambda: samples, video_path)
 
             self.logger.info(
                 f'Total Audio Processing Time: {(time.time() - st) * 1000:.0f} msec')
-
-            # Cleanup temporary file
-            os.remove(temp_audio_path)
             return merged_detections, spectrogram_path
 
         except Exception as e:
             self.logger.error(f'Error processing audio: {e}')
             return [], None
+
+
+class AudioStream:
+    """
+    Analyzes a growing raw PCM file (s16le mono) in BirdNET-sized 3 s windows on a
+    background thread, so most of the audio is already analyzed when recording stops.
+    Windows start at multiples of 3 s, the same chunks BirdNET uses on a whole file.
+    """
+    WINDOW_SECONDS = 3.0
+
+    def __init__(self, processor: AudioProcessor, pcm_path, poll_interval=0.25):
+        self.processor = processor
+        self.pcm_path = pcm_path
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self.detections = []
+        self.samples_analyzed = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Signal that recording has stopped and wait for the remaining audio to be analyzed."""
+        self._stop.set()
+        self._thread.join()
+
+    def cleanup(self):
+        if os.path.exists(self.pcm_path):
+            os.remove(self.pcm_path)
+
+    def _analyze(self, data):
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+        offset = self.samples_analyzed / self.processor.sample_rate
+        self.detections.extend(self.processor.analyze_samples(samples, offset))
+        self.samples_analyzed += len(samples)
+
+    def _run(self):
+        window_bytes = int(self.WINDOW_SECONDS * self.processor.sample_rate) * 2
+        buffer = bytearray()
+        f = None
+        try:
+            while True:
+                # Check before reading so audio flushed right before stop() is still picked up
+                stopping = self._stop.is_set()
+                if f is None and os.path.exists(self.pcm_path):
+                    f = open(self.pcm_path, 'rb')
+                chunk = f.read() if f else b''
+                buffer += chunk
+                while len(buffer) >= window_bytes:
+                    self._analyze(bytes(buffer[:window_bytes]))
+                    del buffer[:window_bytes]
+                if stopping:
+                    break
+                if not chunk:
+                    self._stop.wait(self.poll_interval)
+            # Partial last window; BirdNET pads it (or drops it if too short)
+            tail = len(buffer) // 2 * 2
+            if tail:
+                self._analyze(bytes(buffer[:tail]))
+        except Exception as e:
+            self.logger.error(f'Streaming audio analysis failed: {e}')
+            self.error = e
+        finally:
+            if f:
+                f.close()
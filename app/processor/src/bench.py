@@ -0,0 +1,198 @@
+"""
+Offline replay benchmark for the processor pipeline.
+
+Replays every clip in a directory through FrameProcessor and DecisionMaker
+deterministically (every frame, or every Nth frame with --stride) and prints
+a JSON report with per-stage latency percentiles, memory and detections
+per clip. No camera, PIR sensor or web API needed.
+
+Stages are timed separately: detect is the detector and tracker call only,
+blur_check and classify are reported on their own, and strategy is the whole
+strategy call (detect + box filtering + blur_check + classify).
+
+Usage:
+    python src/bench.py data/samples/videos --strategy two_stage --stride 2 --output bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import time
+from statistics import mean
+from frame_processor import FrameProcessor
+from detection_strategy import SingleStageStrategy, TwoStageStrategy
+from inference_backend import create_backend
+from decision_maker import DecisionMaker
+from fps_tracker import FPSTracker
+from sources.video_file_source import VideoFileSource
+from app_config.app_config import app_config
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+STAGES = ['capture', 'light_check', 'detect', 'blur_check', 'classify', 'track_update', 'strategy']
+
+
+def build_strategy(strategy_type, backend_name, threads=None):
+    detector_path = app_config.get('processor.models.binary' if strategy_type == 'two_stage' else 'processor.models.single_stage')
+    imgsz = app_config.get('processor.inference.imgsz') or (320 if strategy_type == 'two_stage' else 640)
+    backend = create_backend(backend_name, threads=threads, benchmark_model=detector_path, benchmark_imgsz=imgsz)
+    if strategy_type == 'two_stage':
+        classifier_path = app_config.get('processor.models.classifier')
+        classifier_imgsz = app_config.get('processor.inference.classifier_imgsz', 224)
+        classifier_backend = create_backend(backend_name, threads=threads, benchmark_model=classifier_path,
+                                            benchmark_task='classify', benchmark_imgsz=classifier_imgsz)
+        return TwoStageStrategy(
+            binary_model_path=detector_path,
+            classifier_model_path=classifier_path,
+            max_batch_size=app_config.get('processor.classifier_batch_size', 4),
+            blur_metric=app_config.get('processor.blur_metric', 'laplacian'),
+            backend=backend,
+            imgsz=imgsz,
+            classifier_imgsz=classifier_imgsz,
+            classifier_backend=classifier_backend
+        )
+    return SingleStageStrategy(
+        model_path=detector_path,
+        blur_metric=app_config.get('processor.blur_metric', 'laplacian'),
+        backend=backend,
+        imgsz=imgsz
+    )
+
+
+def process_peak_rss_mb():
+    """Peak RSS of the whole process since it started (models included), not of a single clip."""
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb():
+    """Current RSS, or None where /proc isn't available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def stage_report(profiler):
+    report = {}
+    for stage in STAGES:
+        samples = profiler.stage_times.get(stage)
+        if not samples:
+            continue
+        report[stage] = {
+            'count': len(samples),
+            'mean_ms': round(mean(samples) * 1000, 2),
+            **{f'p{p}_ms': round(profiler.stage_latency(stage, p) * 1000, 2) for p in (50, 95, 99)},
+        }
+    return report
+
+
+def run_clip(path, frame_processor, decision_maker, profiler, stride):
+    source = VideoFileSource(path, realtime=False, stride=stride)
+    frame_processor.reset()
+    decision_maker.reset()
+    profiler.reset()
+    rss_before = current_rss_mb()
+
+    frames = detections = 0
+    st = time.time()
+    try:
+        while True:
+            with profiler.stage('capture'):
+                frame = source.capture()
+            if frame is None:
+                break
+            frames += 1
+            # Stamp frames with video time so track times don't depend on processing speed
+            frame_time, results = frame_processor.detect(
+                frame, frame_processor.start_time + source.position_seconds)
+            detections += len(results)
+            has_detections = frame_processor.update(frame_time, results)
+            decision_maker.update_has_detections(has_detections)
+            decision_maker.decide_species(frame_processor.tracks)
+    finally:
+        source.close()
+    elapsed = time.time() - st
+    rss_after = current_rss_mb()
+
+    results = decision_maker.get_results(frame_processor.tracks)
+    return {
+        'clip': os.path.basename(path),
+        'frames': frames,
+        'elapsed_s': round(elapsed, 2),
+        'fps': round(frames / elapsed, 2) if elapsed else None,
+        'raw_detections': detections,
+        'tracks': len(frame_processor.tracks),
+        'species': [{
+            'track_id': r['track_id'],
+            'species_name': r['species_name'],
+            'confidence': round(r['confidence'], 3),
+            'start_time': r['start_time'],
+            'end_time': r['end_time'],
+        } for r in results],
+        'stages': stage_report(profiler),
+        # RSS change over this clip; process_peak_rss_mb is cumulative across clips
+        'rss_delta_mb': round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+        'process_peak_rss_mb': round(process_peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay clips through the processor and report performance")
+    parser.add_argument('clips', type=str, help='Directory of video clips (or a single clip)')
+    parser.add_argument('--strategy', type=str, choices=['single_stage', 'two_stage'],
+                        default=app_config.get('processor.detection_strategy', 'single_stage'))
+    parser.add_argument('--backend', type=str, choices=['auto', 'ncnn', 'onnx'],
+                        default=app_config.get('processor.inference.backend', 'ncnn'))
+    parser.add_argument('--threads', type=int, default=app_config.get('processor.inference.threads'),
+                        help='Intra-op threads per model')
+    parser.add_argument('--stride', type=int, default=1, help='Process every Nth frame')
+    parser.add_argument('--no-skip-static', action='store_true', help='Run detection on static frames too')
+    parser.add_argument('--output', type=str, help='Write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if os.path.isdir(args.clips):
+        clips = sorted(os.path.join(args.clips, f) for f in os.listdir(args.clips)
+                       if f.lower().endswith(VIDEO_EXTENSIONS))
+    else:
+        clips = [args.clips]
+
+    # Keep every sample so percentiles cover the whole clip
+    profiler = FPSTracker(window=None)
+    strategy = build_strategy(args.strategy, args.backend, args.threads)
+    strategy.profiler = profiler
+    frame_processor = FrameProcessor(
+        detection_strategy=strategy,
+        tracker=app_config.get('processor.tracker'),
+        skip_static_frames=not args.no_skip_static,
+        max_track_frames=app_config.get('processor.max_track_frames'),
+        # Dark frames are replayed as fast as any other, not rate limited like a live camera
+        low_light_delay=0
+    )
+    frame_processor.profiler = profiler
+    decision_maker = DecisionMaker()
+
+    report = {
+        'strategy': args.strategy,
+        'backend': strategy.backend.name,
+        'classifier_backend': getattr(strategy, 'classifier_backend', strategy.backend).name,
+        'imgsz': strategy.imgsz,
+        'stride': args.stride,
+        'skip_static_frames': not args.no_skip_static,
+        'clips': [run_clip(path, frame_processor, decision_maker, profiler, args.stride) for path in clips],
+        'process_peak_rss_mb': round(process_peak_rss_mb(), 1),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class TrackClassificationState:
+    """Running classification stats for one track."""
+    votes: Counter = field(default_factory=Counter)
+    conf_sums: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    total: int = 0
+    last_frame: int = 0
+    last_area: float = 0.0
+    best_blur: float = 0.0
+
+    def top_two(self) -> Tuple[Tuple[str, int], int]:
+        common = self.votes.most_common(2)
+        second = common[1][1] if len(common) > 1 else 0
+        return common[0], second
+
+
+class ClassificationScheduler:
+    """
+    Decides which tracks get classifier budget on each frame.
+
+    Tracks with few predictions, a low vote margin or a low average classifier
+    confidence go first. Tracks whose label has converged are skipped until
+    their box grows noticeably (bird came closer) or a sharper crop shows up.
+    """
+
+    def __init__(self, min_predictions: int = 3, converged_margin: float = 0.6, converged_confidence: float = 0.6,
+                 growth_factor: float = 1.5, sharpness_factor: float = 1.5):
+        """
+        Args:
+            min_predictions: Predictions a track needs before it can be considered converged
+            converged_margin: Minimum (top votes - runner-up votes) / total votes to be converged
+            converged_confidence: Minimum average classifier confidence of the top species to be converged
+            growth_factor: Box area growth since the last classification that re-opens a converged track
+            sharpness_factor: Blur variance gain over the best crop so far that re-opens a converged track
+        """
+        self.min_predictions = min_predictions
+        self.converged_margin = converged_margin
+        self.converged_confidence = converged_confidence
+        self.growth_factor = growth_factor
+        self.sharpness_factor = sharpness_factor
+        self.reset()
+
+    def reset(self):
+        self.tracks: Dict[int, TrackClassificationState] = {}
+        self.frame = 0
+
+    def priority(self, track_id: int) -> float:
+        """Higher means more in need of classification."""
+        state = self.tracks.get(track_id)
+        if state is None or state.total == 0:
+            return float('inf')
+        # Small staleness bonus rotates between tracks with equal uncertainty
+        staleness = 0.01 * (self.frame - state.last_frame)
+        if state.total < self.min_predictions:
+            return 2.0 + (self.min_predictions - state.total) + staleness
+        (species, top_count), second_count = state.top_two()
+        margin = (top_count - second_count) / state.total
+        avg_conf = state.conf_sums[species] / top_count
+        return (1 - margin) + (1 - avg_conf) + staleness
+
+    def is_converged(self, track_id: int, area: float) -> bool:
+        state = self.tracks.get(track_id)
+        if state is None or state.total < self.min_predictions:
+            return False
+        if area > state.last_area * self.growth_factor:
+            return False
+        (species, top_count), second_count = state.top_two()
+        margin = (top_count - second_count) / state.total
+        avg_conf = state.conf_sums[species] / top_count
+        return margin >= self.converged_margin and avg_conf >= self.converged_confidence
+
+    def is_sharper(self, track_id: int, blur_variance: float) -> bool:
+        """True if a crop is sharp enough to re-classify an otherwise converged track."""
+        state = self.tracks.get(track_id)
+        return state is None or blur_variance > state.best_blur * self.sharpness_factor
+
+    def prioritize(self, boxes: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """
+        Start a new frame and split boxes into (pending, converged).
+
+        Args:
+            boxes: Dicts with at least 'track_id' and 'area' (pixels)
+        Returns:
+            pending boxes sorted by priority (highest first) and converged boxes.
+        """
+        self.frame += 1
+        pending, converged = [], []
+        for box in boxes:
+            (converged if self.is_converged(box['track_id'], box['area']) else pending).append(box)
+        pending.sort(key=lambda b: (-self.priority(b['track_id']), b['track_id']))
+        return pending, converged
+
+    def record(self, track_id: int, species: str, confidence: float, area: float, blur_variance: float):
+        """Fold a classifier prediction for a track into its stats."""
+        state = self.tracks.setdefault(track_id, TrackClassificationState())
+        if species is not None:
+            state.votes[species] += 1
+            state.conf_sums[species] += confidence
+            state.total += 1
+        state.last_frame = self.frame
+        state.last_area = area
+        state.best_blur = max(state.best_blur, blur_variance or 0.0)
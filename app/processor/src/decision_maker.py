@@ -1,6 +1,5 @@
 import logging
 import time
-from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +8,32 @@ logger = logging.getLogger(__name__)
 MIN_CONFIDENCE_TO_PROCESS = 0.10
 
 
+class TrackTally:
+    """Running vote count and confidence sum per species for one track's predictions."""
+
+    def __init__(self, preds):
+        self.preds = preds  # The track's preds list this tally follows
+        self.seen = 0
+        self.counts = {}
+        self.conf_sums = {}
+        self.first_seen = {}
+        self.leader = None
+
+    def consume(self):
+        """Fold in predictions appended since the last call."""
+        for species_name, confidence in self.preds[self.seen:]:
+            self.first_seen.setdefault(species_name, len(self.first_seen))
+            count = self.counts.get(species_name, 0) + 1
+            self.counts[species_name] = count
+            self.conf_sums[species_name] = self.conf_sums.get(species_name, 0.0) + confidence
+            # Ties go to the species seen first, like Counter.most_common
+            if self.leader is None or count > self.counts[self.leader] or (
+                    count == self.counts[self.leader] and
+                    self.first_seen[species_name] < self.first_seen[self.leader]):
+                self.leader = species_name
+        self.seen = len(self.preds)
+
+
 class DecisionMaker():
     def __init__(self,  max_record_seconds=60, max_inactive_seconds=10, min_track_duration=2):
         self.max_record_seconds = max_record_seconds
@@ -21,6 +46,15 @@ class DecisionMaker():
         self.species_decided = False
         self.start_time = time.time()
         self.inactive_start_time = None
+        self.tallies = {}
+
+    def _tally(self, track_id, track):
+        tally = self.tallies.get(track_id)
+        # New track, or a different recording reusing the track id
+        if tally is None or tally.preds is not track['preds'] or tally.seen > len(track['preds']):
+            tally = self.tallies[track_id] = TrackTally(track['preds'])
+        tally.consume()
+        return tally
 
     def update_has_detections(self, has_detections):
         if not has_detections:
@@ -45,30 +79,33 @@ class DecisionMaker():
         if self.species_decided:
             # already decided once
             return None
-        results = self.get_results(tracks)
+        # Called per frame: the frame payload is only built for the final results
+        results = self.get_results(tracks, include_frames=False)
         if len(results) > 0:
             self.species_decided = True
             return results[0]['species_name']
         return None
 
-    def get_results(self, tracks):
+    def get_results(self, tracks, include_frames=True):
+        """
+        Qualifying tracks with their winning species and combined confidence.
+        include_frames adds each track's per-frame boxes, which the API payload needs.
+        """
         result = []
         for track_id, track in tracks.items():
             # Skip tracks with no predictions yet
             if not track['preds']:
                 continue
-            # Find most common prediction for each track
-            # preds is a list of (species_name, confidence)
-            species_only = [p[0] for p in track['preds']]
-            pred_counts = Counter(species_only)
-            species_name, count = pred_counts.most_common(1)[0]
-            
-            voting_confidence = count / len(track['preds'])
-            
-            # Calculate average classifier confidence for the winning species
-            relevant_confs = [p[1] for p in track['preds'] if p[0] == species_name]
-            avg_classifier_conf = sum(relevant_confs) / len(relevant_confs)
-            
+            # Most common prediction, from running per-track tallies
+            tally = self._tally(track_id, track)
+            species_name = tally.leader
+            count = tally.counts[species_name]
+
+            voting_confidence = count / tally.seen
+
+            # Average classifier confidence for the winning species
+            avg_classifier_conf = tally.conf_sums[species_name] / count
+
             # Combine confidences
             confidence = voting_confidence * avg_classifier_conf
             
@@ -87,7 +124,8 @@ class DecisionMaker():
                     'confidence': confidence,
                     'best_frame': track.get('best_frame'),
                     'source': 'video',
-                    'frames': track.get('frames', [])  # Per-frame bounding box data
+                    # Per-frame bounding box data
+                    'frames': track['frames'].to_list() if include_frames and 'frames' in track else []
                 })
 
         return result
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
+import re
+from contextlib import nullcontext
 import logging
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
-from ultralytics import YOLO
 import cv2
+from classification_scheduler import ClassificationScheduler
+from inference_backend import InferenceBackend, NcnnBackend
+from sharpness import DEFAULT_BLUR_THRESHOLDS, measure_sharpness
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +22,7 @@ class DetectionResult:
         class_name: The detected class name (species).
         confidence: Confidence score of the detection (0.0 to 1.0).
         bbox: Normalized bounding box coordinates [x1, y1, x2, y2].
-        blur_variance: Laplacian variance of the crop (higher = sharper).
+        blur_variance: Sharpness of the crop, Laplacian variance by default (higher = sharper).
         crop: BGR image crop of the detected object.
     """
     track_id: int
@@ -29,18 +33,34 @@ class DetectionResult:
     crop: Optional[np.ndarray] = None
 
 class DetectionStrategy(ABC):
-    def __init__(self, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0, max_blur_checks: int = 3):
+    def __init__(self, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: Optional[float] = None, max_blur_checks: int = 3, imgsz: int = 640,
+                 blur_metric: str = 'laplacian', blur_max_side: int = 320):
         self.min_center_dist = min_center_dist
         self.min_box_size_px = min_box_size_px
-        self.blur_threshold = blur_threshold
+        self.blur_metric = blur_metric
+        self.blur_threshold = blur_threshold if blur_threshold is not None else DEFAULT_BLUR_THRESHOLDS[blur_metric]
+        self.blur_max_side = blur_max_side
         self.max_blur_checks = max_blur_checks
+        # Runtime-tunable budget knobs (see AdaptiveController)
+        self.imgsz = imgsz  # detector input size
+        self.fixed_imgsz = False  # True if the backend's model only accepts its export size
+        self.max_batch_size = 1  # crops classified per frame, only two-stage classifies separately
+        # Optional FPSTracker for per-stage timing (set by the benchmark)
+        self.profiler = None
 
-    def is_blurry(self, image: np.ndarray) -> Tuple[bool, float]:
+    def profile(self, stage: str):
+        """Context manager timing a stage if a profiler is attached, no-op otherwise."""
+        return self.profiler.stage(stage) if self.profiler else nullcontext()
+
+    def is_blurry(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> Tuple[bool, float]:
         """
-        Check if the image is blurry using the variance of the Laplacian.
+        Check if the image is blurry using the configured sharpness metric
+        (variance of the Laplacian by default), computed on a capped central window.
         
         Args:
             image: BGR image crop
+            gray: Grayscale version of the crop, e.g. a slice of a frame converted
+                once per frame. Converted from image if not given.
             
         Returns:
             Tuple of (is_blurry: bool, variance: float).
@@ -49,14 +69,48 @@ class DetectionStrategy(ABC):
         if image is None or image.size == 0:
             return True, 0.0
         
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        variance = cv2.Laplacian(gray, cv2.CV_64F).var()
+        with self.profile('blur_check'):
+            if gray is None:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            variance = measure_sharpness(gray, self.blur_metric, self.blur_max_side)
         
         is_blur = variance < self.blur_threshold
         if is_blur:
             logger.info(f"Blur detected: variance={variance:.1f} < threshold={self.blur_threshold}")
         return is_blur, variance
 
+    def class_labels(self) -> Dict[int, str]:
+        """Class id -> species label of the model the regional filter applies to."""
+        return {}
+
+    def set_regional_species(self, regional_species: Optional[List[str]]):
+        """
+        (Re)build the regional class filter. Safe to call from another thread while
+        detecting; the new filter is swapped in at once and used from the next frame.
+        Does nothing if the species set hasn't changed.
+        """
+        species_key = frozenset(regional_species or ())
+        if species_key == getattr(self, '_species_key', None):
+            return
+        classes = None
+        class_index = None
+        if species_key:
+            self.logger.info(f'Initializing with regional species filters: {regional_species}')
+            labels = self.class_labels()
+            # One alternation regex instead of a substring test per (label, species) pair
+            pattern = re.compile('|'.join(re.escape(name) for name in species_key))
+            classes = [id for id, label in labels.items() if pattern.search(label)]
+            # Log the actual class names that are enabled
+            enabled_classes = [labels[id] for id in classes]
+            self.logger.info(f'Regional species filters active: {len(classes)} classes enabled.')
+            self.logger.info(f'Enabled classes: {enabled_classes}')
+            # Index array for vectorized filtered argmax over class probabilities
+            class_index = np.array(classes, dtype=np.intp) if classes else None
+        self.regional_species = regional_species
+        self.class_index = class_index
+        self.classes = classes
+        self._species_key = species_key
+
     @abstractmethod
     def detect(self, frame: np.ndarray, tracker_config: str, min_confidence: float) -> List[DetectionResult]:
         pass
@@ -94,76 +148,103 @@ class DetectionStrategy(ABC):
 
         return True
 
+    def filter_boxes(self, xyxyn: np.ndarray, xyxy: np.ndarray, confidences: np.ndarray,
+                     min_confidence: float, frame_shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of the per-box checks: edge distance, confidence,
+        clamping to the frame and minimum size, applied as one mask.
+        
+        Args:
+            xyxyn: Normalized boxes, shape (N, 4)
+            xyxy: Absolute boxes in pixels, shape (N, 4)
+            confidences: Detection confidences, shape (N,)
+            min_confidence: Minimum required confidence
+            frame_shape: Shape of the frame the boxes belong to
+            
+        Returns:
+            Tuple of (indices of surviving boxes, their clamped integer pixel coords (M, 4)).
+        """
+        h, w = frame_shape[:2]
+        d = self.min_center_dist
+        center_x = (xyxyn[:, 0] + xyxyn[:, 2]) / 2
+        center_y = (xyxyn[:, 1] + xyxyn[:, 3]) / 2
+
+        # Truncate like int() and clamp to the frame
+        coords = xyxy.astype(np.int64)
+        np.clip(coords[:, 0::2], 0, w, out=coords[:, 0::2])
+        np.clip(coords[:, 1::2], 0, h, out=coords[:, 1::2])
+
+        mask = ((center_x >= d) & (center_x <= 1 - d) &
+                (center_y >= d) & (center_y <= 1 - d) &
+                (confidences >= min_confidence) &
+                (coords[:, 2] - coords[:, 0] >= self.min_box_size_px) &
+                (coords[:, 3] - coords[:, 1] >= self.min_box_size_px))
+        keep = np.flatnonzero(mask)
+        return keep, coords[keep]
+
+    def _load_detector(self, backend: InferenceBackend, model_path: str):
+        """Load the detector through the backend, adopting its input size if it's fixed."""
+        model = backend.load(model_path, 'detect', self.imgsz)
+        fixed_imgsz = backend.fixed_imgsz(model)
+        if fixed_imgsz:
+            self.imgsz = fixed_imgsz
+            self.fixed_imgsz = True
+        # Warmup the tracker
+        model.track(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), imgsz=self.imgsz,
+                    tracker="bytetrack.yaml", persist=True, verbose=False)
+        return model
+
 class SingleStageStrategy(DetectionStrategy):
-    def __init__(self, model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1):
-        super().__init__(min_center_dist)
+    def __init__(self, model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, blur_metric: str = 'laplacian',
+                 backend: Optional[InferenceBackend] = None, imgsz: int = 640):
+        super().__init__(min_center_dist, imgsz=imgsz, blur_metric=blur_metric)
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.model = YOLO(model_path, task="detect")
-        self.regional_species = regional_species
-        self.classes = None
-        
-        if self.regional_species:
-             self.logger.info(f'Initializing with regional species filters: {self.regional_species}')
-             self.classes = [id for id, label in self.model.names.items() if any(
-                reg_species in label for reg_species in self.regional_species)]
-             
-             # Log the actual class names that are enabled
-             enabled_classes = [self.model.names[id] for id in self.classes]
-             self.logger.info(f'Regional species filters active: {len(self.classes)} classes enabled.')
-             self.logger.info(f'Enabled classes: {enabled_classes}')
+        self.backend = backend or NcnnBackend()
+        self.model = self._load_detector(self.backend, model_path)
+        self.set_regional_species(regional_species)
 
-        # Warmup
-        self.model.track(np.zeros((640, 640, 3)), tracker="bytetrack.yaml", persist=True, verbose=False)
+    def class_labels(self) -> Dict[int, str]:
+        return self.model.names
 
     def detect(self, frame: np.ndarray, tracker_config: str, min_confidence: float) -> List[DetectionResult]:
-        results = self.model.track(
-            frame, persist=True, conf=min_confidence,
-            classes=self.classes, tracker=tracker_config, verbose=False)
+        with self.profile('detect'):
+            results = self.model.track(
+                frame, persist=True, conf=min_confidence, imgsz=self.imgsz,
+                classes=self.classes, tracker=tracker_config, verbose=False)
         
         if not results or results[0].boxes.id is None:
             return []
 
         boxes = results[0].boxes
-        track_ids = boxes.id.int().cpu().tolist()
-        class_indexes = boxes.cls.int().cpu().tolist()
-        confidences = boxes.conf.cpu().tolist()
+        track_ids = boxes.id.int().cpu().numpy()
+        class_indexes = boxes.cls.int().cpu().numpy()
+        confidences = boxes.conf.cpu().numpy()
         xyxyn = boxes.xyxyn.cpu().numpy()
         xyxy = boxes.xyxy.cpu().numpy()
 
-        h, w, _ = frame.shape
+        # Validity, size and clamping as one mask; Python objects only for survivors
+        keep, coords = self.filter_boxes(xyxyn, xyxy, confidences, min_confidence, frame.shape)
+
+        # Convert to grayscale once per frame and share it across crops
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if len(keep) else None
 
         detection_results = []
-        for track_id, class_idx, conf, bbox_norm, bbox_abs in zip(track_ids, class_indexes, confidences, xyxyn, xyxy):
-            if not self.is_valid_detection(bbox_norm, conf, min_confidence):
-                continue
-            
-            # Check min size
-            x1n, y1n, x2n, y2n = bbox_norm
-            if (x2n - x1n) * w < self.min_box_size_px or (y2n - y1n) * h < self.min_box_size_px:
-                continue
-            
+        for i, (x1, y1, x2, y2) in zip(keep.tolist(), coords.tolist()):
             # Extract crop and compute blur
-            x1, y1, x2, y2 = map(int, bbox_abs)
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-            
-            if x2 <= x1 or y2 <= y1:
-                continue
-                
-            crop = frame[y1:y2, x1:x2].copy()
-            is_blur, blur_variance = self.is_blurry(crop)
+            crop = frame[y1:y2, x1:x2]
+            is_blur, blur_variance = self.is_blurry(crop, gray[y1:y2, x1:x2])
             
             # Skip blurry detections (same as TwoStageStrategy)
             if is_blur:
                 continue
 
             detection_results.append(DetectionResult(
-                track_id=track_id, 
-                class_name=self.model.names[class_idx], 
-                confidence=conf, 
-                bbox=bbox_norm,
+                track_id=int(track_ids[i]), 
+                class_name=self.model.names[int(class_indexes[i])], 
+                confidence=float(confidences[i]), 
+                bbox=xyxyn[i],
                 blur_variance=blur_variance,
-                crop=crop
+                crop=crop.copy()
             ))
             
         return detection_results
@@ -174,33 +255,30 @@ class SingleStageStrategy(DetectionStrategy):
 
 
 class TwoStageStrategy(DetectionStrategy):
-    def __init__(self, binary_model_path: str, classifier_model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0):
-        super().__init__(min_center_dist, min_box_size_px, blur_threshold)
+    def __init__(self, binary_model_path: str, classifier_model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: Optional[float] = None, max_batch_size: int = 4, blur_metric: str = 'laplacian',
+                 backend: Optional[InferenceBackend] = None, imgsz: int = 320, classifier_imgsz: int = 224,
+                 classifier_backend: Optional[InferenceBackend] = None):
+        super().__init__(min_center_dist, min_box_size_px, blur_threshold, imgsz=imgsz, blur_metric=blur_metric)
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.regional_species = regional_species
         
-        self.binary_model = YOLO(binary_model_path, task="detect")
-        self.classifier_model = YOLO(classifier_model_path, task="classify")
+        self.backend = backend or NcnnBackend()
+        # The classifier can run on another runtime, e.g. when only the detector has an ONNX export
+        self.classifier_backend = classifier_backend or self.backend
+        self.binary_model = self._load_detector(self.backend, binary_model_path)
+        # Classify at the size the model was trained/exported at; classifier_imgsz only covers exports without metadata
+        self.classifier_imgsz = self.classifier_backend.export_imgsz(classifier_model_path) or classifier_imgsz
+        self.classifier_model = self.classifier_backend.load(classifier_model_path, 'classify', self.classifier_imgsz)
         
-        # Round-robin index for classification scheduling
-        self._classification_index = 0
+        # Decides which tracks get classifier budget each frame
+        self.scheduler = ClassificationScheduler()
+        # Max crops classified per frame in one classifier call. Disabled if the backend rejects batches.
+        self.max_batch_size = max(1, max_batch_size)
+        self._batch_supported = self.max_batch_size > 1
         
+        # Normalized class names, looked up per classified crop
+        self.labels = self.class_labels()
         # Pre-calculate allowed class IDs for regional species
-        self.classes = None
-        if self.regional_species:
-            self.logger.info(f'Initializing with regional species filters: {self.regional_species}')
-            self.classes = [
-                id for id, label in self.classifier_model.names.items() 
-                if any(reg_species in self._normalize_class_name(label) for reg_species in self.regional_species)
-            ]
-            # Log the actual class names that are enabled
-            enabled_classes = [self._normalize_class_name(self.classifier_model.names[id]) for id in self.classes]
-            self.logger.info(f'Regional species filters active: {len(self.classes)} classes enabled.')
-            self.logger.info(f'Enabled classes: {enabled_classes}')
-
-        # Warmup
-        self.binary_model.track(np.zeros((320, 320, 3), dtype=np.uint8), tracker="bytetrack.yaml", persist=True, verbose=False)
-        self.classifier_model(np.zeros((224, 224, 3), dtype=np.uint8), verbose=False)
+        self.set_regional_species(regional_species)
 
     def _normalize_class_name(self, name: str) -> str:
         """
@@ -217,30 +295,63 @@ class TwoStageStrategy(DetectionStrategy):
         """
         return name.replace('_OR_', '/').replace('_', ' ')
 
-    def _classify_crop(self, crop: np.ndarray) -> Tuple[Optional[str], float]:
+    def class_labels(self) -> Dict[int, str]:
+        return {id: self._normalize_class_name(label) for id, label in self.classifier_model.names.items()}
+
+    def _top_species(self, result) -> Tuple[Optional[str], float]:
         """
-        Run classification on a crop, manually filtering for regional species if configured since ultralytics classifier ignores 'classes' arg.
+        Pick the best species from a classifier result, manually filtering for regional species if configured since ultralytics classifier ignores 'classes' arg.
         Returns: (species_name, confidence)
         """
-        result_cls = self.classifier_model(crop, verbose=False)
-        
-        if not result_cls or not result_cls[0].probs:
+        if not result or not result.probs:
             return None, 0.0
             
-        probs = result_cls[0].probs
+        probs = result.probs
+        class_index = self.class_index
         
-        if self.classes:
-            # Filter for best regional species
+        if class_index is not None:
+            # Filter for best regional species: one masked argmax over the allowed class ids
             all_probs = probs.data
-            valid_probs = {cid: all_probs[cid].item() for cid in self.classes if cid < len(all_probs)}
-            
-            if valid_probs:
-                best_id, best_conf = max(valid_probs.items(), key=lambda x: x[1])
-                return self._normalize_class_name(result_cls[0].names[best_id]), best_conf
-            return "Unknown", 0.0
+            all_probs = all_probs.cpu().numpy() if hasattr(all_probs, 'cpu') else np.asarray(all_probs)
+            # Ids past the end of the output (labels/model mismatch) are skipped instead of raising
+            class_index = class_index[class_index < len(all_probs)]
+            if not len(class_index):
+                return "Unknown", 0.0
+            allowed = all_probs[class_index]
+            best = int(np.argmax(allowed))
+            return self.labels[int(class_index[best])], float(allowed[best])
             
         top1_idx = probs.top1
-        return self._normalize_class_name(result_cls[0].names[top1_idx]), probs.top1conf.item()
+        return self.labels[top1_idx], probs.top1conf.item()
+
+    def _classify_crop(self, crop: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        Run classification on a single crop.
+        Returns: (species_name, confidence)
+        """
+        result_cls = self.classifier_model(crop, imgsz=self.classifier_imgsz, verbose=False)
+        return self._top_species(result_cls[0] if result_cls else None)
+
+    def _classify_crops(self, crops: List[np.ndarray]) -> List[Tuple[Optional[str], float]]:
+        """
+        Classify several crops with a single classifier call.
+
+        Crops of any size go in as they are: ultralytics' classify preprocessing
+        (resize shorter side, center crop to classifier_imgsz) runs on each crop,
+        the same as for a single crop, and stacks them into one batch. Falls back
+        to one call per crop (and stays there) if the backend rejects batched input.
+        """
+        with self.profile('classify'):
+            if len(crops) > 1 and self._batch_supported:
+                try:
+                    results = self.classifier_model(crops, imgsz=self.classifier_imgsz, verbose=False)
+                    if results is not None and len(results) == len(crops):
+                        return [self._top_species(r) for r in results]
+                    self.logger.warning(f'Classifier returned {len(results) if results else 0} results for a batch of {len(crops)}, disabling batching')
+                except Exception as e:
+                    self.logger.warning(f'Classifier rejected batch of {len(crops)}, disabling batching: {e}')
+                self._batch_supported = False
+            return [self._classify_crop(c) for c in crops]
 
     def detect(self, frame: np.ndarray, tracker_config: str, min_confidence: float) -> List[DetectionResult]:
         """
@@ -250,55 +361,39 @@ class TwoStageStrategy(DetectionStrategy):
         1. Binary Detection: Detect "bird" vs "not bird" using fast model.
         2. Validity Filter (cheap): Drop detections that are too close to edges,
            too small, or low confidence. These are likely noise or partial birds.
-        3. Round-Robin Classification (one per frame): To limit compute, we classify
-           only ONE bird per frame, rotating through valid detections.
-        4. Blur Check (before classification): Skip classification if the selected
-           crop is blurry (motion blur, out of focus). Try up to 3 candidates.
-        5. Build Results: Return all valid detections. Only the classified one
-           has a species name; others have class_name=None (tracked but not yet classified).
+        3. Prioritized Classification (batched): To limit compute, we classify
+           at most max_batch_size birds per frame in one classifier call. The
+           scheduler puts uncertain tracks first and skips converged ones unless
+           their box grew or a sharper crop is available.
+        4. Blur Check (before classification): Skip crops that are blurry
+           (motion blur, out of focus). Up to max_batch_size + max_blur_checks - 1
+           candidates are checked per frame.
+        5. Build Results: Return all valid detections. Only the classified ones
+           have a species name; others have class_name=None (tracked but not yet classified).
         """
         # 1. Binary Detection
-        results = self.binary_model.track(
-            frame, persist=True, conf=min_confidence, verbose=False, imgsz=320, tracker=tracker_config)
+        with self.profile('detect'):
+            results = self.binary_model.track(
+                frame, persist=True, conf=min_confidence, verbose=False, imgsz=self.imgsz, tracker=tracker_config)
             
         if not results or results[0].boxes.id is None:
             return []
 
         boxes = results[0].boxes
-        track_ids = boxes.id.int().cpu().tolist()
-        confidences = boxes.conf.cpu().tolist()
+        track_ids = boxes.id.int().cpu().numpy()
+        confidences = boxes.conf.cpu().numpy()
         xyxyn = boxes.xyxyn.cpu().numpy() # normalized for output
         xyxy = boxes.xyxy.cpu().numpy()   # absolute for cropping
 
-        h, w, _ = frame.shape
-
-        # 2. Collect all valid boxes first
-        valid_boxes = []
-        for track_id, conf, bbox_norm, bbox_abs in zip(track_ids, confidences, xyxyn, xyxy):
-            # Check validity BEFORE classification to save compute
-            if not self.is_valid_detection(bbox_norm, conf, min_confidence):
-                continue
-
-            x1, y1, x2, y2 = map(int, bbox_abs)
-            # Clamp
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-             
-            if x2 <= x1 or y2 <= y1:
-                continue
-            
-            # Check minimum size
-            box_w = x2 - x1
-            box_h = y2 - y1
-            if box_w < self.min_box_size_px or box_h < self.min_box_size_px:
-                continue
-            
-            valid_boxes.append({
-                'track_id': track_id,
-                'conf': conf,
-                'bbox_norm': bbox_norm,
-                'crop_coords': (x1, y1, x2, y2)
-            })
+        # 2. Validity filter BEFORE classification to save compute, as one mask over all boxes
+        keep, coords = self.filter_boxes(xyxyn, xyxy, confidences, min_confidence, frame.shape)
+        valid_boxes = [{
+            'track_id': int(track_ids[i]),
+            'conf': float(confidences[i]),
+            'bbox_norm': xyxyn[i],
+            'crop_coords': (x1, y1, x2, y2),
+            'area': (x2 - x1) * (y2 - y1)
+        } for i, (x1, y1, x2, y2) in zip(keep.tolist(), coords.tolist())]
         
         if not valid_boxes:
             return []
@@ -306,26 +401,39 @@ class TwoStageStrategy(DetectionStrategy):
         # Sort by track_id for consistent ordering
         valid_boxes.sort(key=lambda b: b['track_id'])
         
-        # 3. Round-robin selection - find first non-blurry box to classify
-        start_idx = self._classification_index % len(valid_boxes)
-        self._classification_index += 1
+        # 3. Prioritized selection - uncertain tracks first, converged ones only if sharper
+        pending, converged = self.scheduler.prioritize(valid_boxes)
+        converged_ids = {b['track_id'] for b in converged}
+        batch_size = self.max_batch_size if self._batch_supported else 1
+        max_checks = min(len(valid_boxes), batch_size + self.max_blur_checks - 1)
         
-        classified = None  # {track_id, crop, blur_variance}
-        for i in range(min(len(valid_boxes), self.max_blur_checks)):
-            idx = (start_idx + i) % len(valid_boxes)
-            box = valid_boxes[idx]
+        # Convert to grayscale once per frame and share it across crops
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        classified = {}  # track_id -> {crop, blur_variance, area}
+        for box in (pending + converged)[:max_checks]:
             x1, y1, x2, y2 = box['crop_coords']
             crop = frame[y1:y2, x1:x2]
-            is_blur, variance = self.is_blurry(crop)
-            if not is_blur:
-                classified = {
-                    'track_id': box['track_id'],
-                    'crop': crop.copy(),
-                    'blur_variance': variance
-                }
+            is_blur, variance = self.is_blurry(crop, gray[y1:y2, x1:x2])
+            if is_blur:
+                continue
+            if box['track_id'] in converged_ids and not self.scheduler.is_sharper(box['track_id'], variance):
+                continue
+            classified[box['track_id']] = {
+                'crop': crop.copy(),
+                'blur_variance': variance,
+                'area': box['area']
+            }
+            if len(classified) >= batch_size:
                 break
         
-        # 4. Build results - only classified box has species_name and crop
+        # Classify all selected crops in one call
+        predictions = dict(zip(classified, self._classify_crops([c['crop'] for c in classified.values()])))
+        for track_id, (species_name, cls_conf) in predictions.items():
+            self.scheduler.record(track_id, species_name, cls_conf,
+                                  classified[track_id]['area'], classified[track_id]['blur_variance'])
+        
+        # 4. Build results - only classified boxes have species_name and crop
         detection_results = []
         for box in valid_boxes:
             species_name = None
@@ -333,13 +441,13 @@ class TwoStageStrategy(DetectionStrategy):
             blur_variance = None
             combined_conf = box['conf']  # Default to detector confidence
             
-            if classified and box['track_id'] == classified['track_id']:
-                species_name, cls_conf = self._classify_crop(classified['crop'])
+            if box['track_id'] in classified:
+                species_name, cls_conf = predictions[box['track_id']]
                 # Combined confidence: P(species) = P(is_bird) × P(species|is_bird)
                 combined_conf = box['conf'] * cls_conf
 
-                crop = classified['crop']
-                blur_variance = classified['blur_variance']
+                crop = classified[box['track_id']]['crop']
+                blur_variance = classified[box['track_id']]['blur_variance']
             
             detection_results.append(DetectionResult(
                 track_id=box['track_id'],
@@ -353,6 +461,6 @@ class TwoStageStrategy(DetectionStrategy):
         return detection_results
 
     def reset(self):
-        self._classification_index = 0
+        self.scheduler.reset()
         if hasattr(self.binary_model.predictor, 'trackers'):
             self.binary_model.predictor.trackers[0].reset()
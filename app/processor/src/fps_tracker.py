@@ -1,19 +1,32 @@
 from timeit import default_timer
 import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from statistics import mean, median
-from typing import List
+from typing import List, Optional
 
 
 class FPSTracker:
-    def __init__(self):
+    def __init__(self, window: Optional[int] = 30):
+        """
+        Args:
+            window: Number of recent samples kept for rolling (live) statistics. None keeps all samples.
+        """
         self.timer = default_timer
         self.frame_times: List[float] = []
+        self.recent_frame_times = deque(maxlen=window)
+        # When each recent frame finished, for wall-clock throughput
+        self.recent_frame_ends = deque(maxlen=window)
+        self.stage_times = defaultdict(lambda: deque(maxlen=window))
         self.logger = logging.getLogger(__name__)
         self.reset()
 
     def reset(self):
         """Reset tracking stats for new motion detection sequence"""
         self.frame_times.clear()
+        self.recent_frame_times.clear()
+        self.recent_frame_ends.clear()
+        self.stage_times.clear()
         self.start_time = None
         self.total_frames = 0
 
@@ -25,10 +38,40 @@ class FPSTracker:
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
-        frame_time = self() - self.start_time
+        end = self()
+        frame_time = end - self.start_time
         self.frame_times.append(frame_time)
+        self.recent_frame_times.append(frame_time)
+        self.recent_frame_ends.append(end)
         self.total_frames += 1
 
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage (e.g. capture, track). Safe to use from several threads."""
+        start = self()
+        try:
+            yield
+        finally:
+            self.stage_times[name].append(self() - start)
+
+    def rolling_fps(self) -> Optional[float]:
+        """
+        Wall-clock FPS over the recent window: frames finished per second, including the time
+        spent between frames. Near-instant frames (skipped detection) can't inflate it beyond
+        what the pipeline actually delivers. None until there are two samples.
+        """
+        if len(self.recent_frame_ends) < 2:
+            return None
+        elapsed = self.recent_frame_ends[-1] - self.recent_frame_ends[0]
+        return (len(self.recent_frame_ends) - 1) / elapsed if elapsed > 0 else None
+
+    def stage_latency(self, name: str, percentile: float = 50) -> Optional[float]:
+        """Recent latency percentile of a stage in seconds, or None if there are no samples"""
+        samples = sorted(self.stage_times.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
     def log_summary(self):
         """Log FPS statistics for the completed motion sequence"""
         if not self.frame_times:
@@ -48,5 +91,10 @@ class FPSTracker:
             f"Avg: {avg_fps:.1f} | Med: {median_fps:.1f} | "
             f"Min: {min_fps:.1f} | Max: {max_fps:.1f}"
         )
+        if self.stage_times:
+            stages = ' | '.join(
+                f"{name}: p50 {self.stage_latency(name, 50) * 1000:.0f}ms, p95 {self.stage_latency(name, 95) * 1000:.0f}ms"
+                for name in sorted(self.stage_times))
+            self.logger.info(f"Stage latency (recent): {stages}")
 
         self.reset()  # Clear stats for next motion sequence
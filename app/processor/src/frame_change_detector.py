@@ -0,0 +1,52 @@
+import logging
+import numpy as np
+import cv2
+
+
+class FrameChangeDetector:
+    """Cheap frame differencing to skip detection when nothing in the scene has moved."""
+
+    def __init__(self, pixel_threshold=15, min_changed_ratio=0.005, max_skip_frames=5, sample_rate=8):
+        """
+        Args:
+            pixel_threshold: Minimum grayscale difference (0-255) for a pixel to count as changed
+            min_changed_ratio: Minimum fraction of changed pixels to run detection
+            max_skip_frames: Force detection after this many skipped frames to keep the tracker fed
+            sample_rate: Sample every Nth pixel for performance
+        """
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.max_skip_frames = max_skip_frames
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        self.reference = None
+        self.skipped = 0
+        self.total_skipped = 0
+
+    def should_detect(self, frame):
+        """
+        Compare frame against the last frame detection ran on.
+        Args:
+            frame: BGR format numpy array from camera
+        Returns:
+            bool: True if the scene changed enough (or too many frames were skipped) to run detection
+        """
+        gray = cv2.cvtColor(
+            frame[::self.sample_rate, ::self.sample_rate], cv2.COLOR_BGR2GRAY)
+
+        if (self.reference is not None and self.reference.shape == gray.shape
+                and self.skipped < self.max_skip_frames):
+            diff = cv2.absdiff(gray, self.reference)
+            changed_ratio = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            if changed_ratio < self.min_changed_ratio:
+                self.skipped += 1
+                self.total_skipped += 1
+                return False
+
+        # Compare against the last detected frame, so slow changes still add up
+        self.reference = gray
+        self.skipped = 0
+        return True
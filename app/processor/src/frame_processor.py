@@ -3,15 +3,31 @@ import math
 import logging
 import cv2
 import numpy as np
+from contextlib import nullcontext
+from dataclasses import replace
 from light_level_detector import LightLevelDetector
+from frame_change_detector import FrameChangeDetector
+from track_history import TrackHistory
 from detection_strategy import DetectionStrategy
 
 class FrameProcessor:
-    def __init__(self, detection_strategy: DetectionStrategy, save_images=False, tracker='bytetrack.yaml'):
+    def __init__(self, detection_strategy: DetectionStrategy, save_images=False, tracker='bytetrack.yaml', skip_static_frames=True,
+                 max_track_frames=None, best_frame_quality=90, low_light_delay=1.0):
         self.save_images = save_images
         self.tracker = tracker
+        # Cap on bbox samples stored per track (decimated when full); None keeps all
+        self.max_track_frames = max_track_frames
+        self.best_frame_quality = best_frame_quality
+        # Seconds to back off on frames too dark to process (0 for offline replay)
+        self.low_light_delay = low_light_delay
         self.logger = logging.getLogger(__name__)
         self.light_detector = LightLevelDetector()
+        # Skips detection on frames where nothing moved since the last detected frame
+        self.change_detector = FrameChangeDetector() if skip_static_frames else None
+        # Run detection on every Nth frame only (tuned at runtime by AdaptiveController)
+        self.detect_stride = 1
+        # Optional FPSTracker for per-stage timing (set by the benchmark)
+        self.profiler = None
         
         self.strategy = detection_strategy
         
@@ -19,24 +35,48 @@ class FrameProcessor:
         self.reset()
 
     def run(self, img):
+        """Detect on a frame and fold the results into tracks. Returns True if anything valid was detected."""
+        return self.update(*self.detect(img))
+
+    def detect(self, img, captured_at=None):
+        """
+        Run the light check and detection strategy on a frame without touching tracks.
+
+        Args:
+            img: BGR frame
+            captured_at: time.time() when the frame was captured. Defaults to now.
+        Returns:
+            Tuple of (frame_time, results) where frame_time is relative to the recording start.
+        """
         # incoming frame is BGR
         if img is None:
             raise Exception('Frame is missing')
         self.cnt += 1
         
-        # Capture frame timestamp BEFORE processing to account for detection latency
-        frame_time = round(time.time() - self.start_time, 2)
+        # Use frame capture timestamp (or now) so detection latency doesn't skew track timing
+        frame_time = round((captured_at or time.time()) - self.start_time, 2)
 
         # Check lighting condition first
-        if not self.light_detector.has_sufficient_light(img):
-            time.sleep(1)  # rate limiting when light is low
-            return False
+        with self._profile('light_check'):
+            sufficient_light = self.light_detector.has_sufficient_light(img)
+        if not sufficient_light:
+            if self.low_light_delay:
+                time.sleep(self.low_light_delay)  # rate limiting when light is low
+            return frame_time, []
+
+        # Static scene or off-stride frame: carry the last detections forward instead of running
+        # the model. Keeps tracks (and the inactivity timer) alive while a bird sits still.
+        if (self.cnt % self.detect_stride != 0 or
+                (self.change_detector and not self.change_detector.should_detect(img))):
+            return frame_time, [replace(r, class_name=None, crop=None, blur_variance=None) for r in self.last_results]
 
         # Detect
         st = time.time()
         
-        # Strategy detect - Returns ONLY valid result objects
-        results = self.strategy.detect(img, self.tracker, min_confidence=0.1) # min_confidence could be config, leaving 0.1 default
+        # Strategy detect - Returns ONLY valid result objects.
+        # Profiled as a whole; the strategy times its detect, blur_check and classify stages inside it.
+        with self._profile('strategy'):
+            results = self.strategy.detect(img, self.tracker, min_confidence=0.1) # min_confidence could be config, leaving 0.1 default
         
         if self.save_images and results:
             debug_img = img.copy()
@@ -50,29 +90,37 @@ class FrameProcessor:
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
             cv2.imwrite(f'data/test/frame{str(self.cnt)}.jpg', debug_img)
 
+        self.logger.debug(
+            f'Detection Time: {(time.time() - st) * 1000:.0f} msec | '
+            f'Valid: {len(results)}'
+        )
+
+        self.last_results = results
+        return frame_time, results
+
+    def update(self, frame_time, results):
+        """Update tracks with valid detections. Returns True if there were any."""
         if not results:
             self.logger.debug('No detections')
             return False
 
-        # Update tracks with valid detections
-        for res in results:
-            self.update_track(res.track_id, res.class_name, res.confidence, res.bbox, frame_time, res.crop, res.blur_variance)
+        with self._profile('track_update'):
+            for res in results:
+                self.update_track(res.track_id, res.class_name, res.confidence, res.bbox, frame_time, res.crop, res.blur_variance)
 
-        self.logger.debug(
-            f'Detection Time: {(time.time() - st) * 1000:.0f} msec | '
-            f'Valid: {len(results)}'
-        )
+        return True
 
-        return len(results) > 0
+    def _profile(self, stage):
+        return self.profiler.stage(stage) if self.profiler else nullcontext()
 
     def update_track(self, track_id, class_name, confidence, bbox, frame_time, crop=None, blur_variance=None):
         if track_id not in self.tracks:
             self.tracks[track_id] = {
                 'start_time': frame_time,
                 'preds': [],
-                'best_frame': None,
+                'best_frame': None,  # JPEG-encoded crop (bytes)
                 'best_frame_score': 0.0,
-                'frames': []  # List of {t: float, bbox: [x1,y1,x2,y2]}
+                'frames': TrackHistory(max_samples=self.max_track_frames)
             }
         # Only append real predictions (None means not classified this frame)
         if class_name is not None:
@@ -80,10 +128,7 @@ class FrameProcessor:
         self.tracks[track_id]['end_time'] = frame_time
         
         # Store frame bbox for track visualization
-        self.tracks[track_id]['frames'].append({
-            't': frame_time,
-            'bbox': [round(float(b), 2) for b in bbox]
-        })
+        self.tracks[track_id]['frames'].append(frame_time, bbox)
         
         # Update best frame using combined score: sharpness + size
         # Log-space addition balances blur variance and pixel count regardless of scale
@@ -92,11 +137,19 @@ class FrameProcessor:
             # 1.5x weight on blur to prioritize sharpness over size
             frame_score = 1.5 * math.log(blur_variance + 1) + math.log(pixel_count + 1)
             if frame_score > self.tracks[track_id]['best_frame_score']:
-                self.tracks[track_id]['best_frame'] = crop
-                self.tracks[track_id]['best_frame_score'] = frame_score
+                # Encode on replacement so only one small JPEG per track is held
+                ok, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, self.best_frame_quality])
+                if ok:
+                    self.tracks[track_id]['best_frame'] = buffer.tobytes()
+                    self.tracks[track_id]['best_frame_score'] = frame_score
 
     def reset(self):
         self.tracks = {}
+        self.last_results = []
+        if self.change_detector:
+            if self.change_detector.total_skipped:
+                self.logger.info(f'Skipped detection on {self.change_detector.total_skipped} static frames')
+            self.change_detector.reset()
         if self.strategy:
             self.strategy.reset()
         self.start_time = time.time()
@@ -0,0 +1,269 @@
+"""
+Inference backends for the detection strategies.
+
+A backend loads a model exported for its runtime and returns an ultralytics-style model
+(`names`, `track()`, `__call__`), so strategies keep ultralytics' pre/post-processing and
+ByteTrack tracking whatever runs the network:
+
+- NcnnBackend: NCNN exports (`*_ncnn_model` directories), best on Raspberry Pi ARM cores
+- OnnxBackend: ONNX Runtime on CPU (`*.onnx` next to the NCNN export), best on x86
+- DummyBackend: no model at all, returns empty results (tests, wiring)
+
+select_backend() times the available backends on the host and picks the fastest, per
+model: a two-stage setup can end up with the detector and the classifier on different
+runtimes, e.g. when only one of them has an ONNX export.
+"""
+import ast
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from statistics import median
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NCNN_SUFFIX = '_ncnn_model'
+
+# OnnxBackend swaps ultralytics' ONNX Runtime session for one with our thread settings. That
+# relies on AutoBackend internals (the `session` attribute its forward() runs), checked
+# against these ultralytics releases; others keep ultralytics' own session.
+SESSION_SWAP_VERSIONS = ((8, 1), (8, 2), (8, 3))
+
+
+def _metadata_imgsz(imgsz) -> Optional[int]:
+    """Square input size from an ultralytics metadata 'imgsz' entry: an int, [h, w], or its string form."""
+    if isinstance(imgsz, str):
+        imgsz = ast.literal_eval(imgsz)
+    if isinstance(imgsz, (list, tuple)):
+        imgsz = max(imgsz)
+    return int(imgsz) if imgsz else None
+
+
+class InferenceBackend(ABC):
+    name = None
+
+    def __init__(self, threads: Optional[int] = None):
+        """
+        Args:
+            threads: Intra-op threads for inference. None keeps the runtime default.
+        """
+        self.threads = threads
+
+    @abstractmethod
+    def model_path(self, path: str) -> str:
+        """Path of this backend's export for a configured (NCNN) model path."""
+
+    def available(self, path: str) -> bool:
+        """True if the runtime is installed and the export for `path` exists."""
+        return os.path.exists(self.model_path(path))
+
+    def load(self, path: str, task: str, imgsz: int):
+        """Load and warm up a model. `path` is the configured model path."""
+        from ultralytics import YOLO
+        model = YOLO(self.model_path(path), task=task)
+        # Warmup creates the predictor, whose runtime session is then tuned
+        model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, verbose=False)
+        self.configure(model.predictor.model, self.model_path(path))
+        return model
+
+    def configure(self, autobackend, model_path: str):
+        """Apply runtime knobs (e.g. threads) to ultralytics' AutoBackend after loading."""
+
+    def fixed_imgsz(self, model) -> Optional[int]:
+        """Input size the model was exported with if it can't take other sizes, else None."""
+        return None
+
+    def export_imgsz(self, path: str) -> Optional[int]:
+        """Input size recorded in the export's ultralytics metadata, None if it has none."""
+        return None
+
+
+class NcnnBackend(InferenceBackend):
+    name = 'ncnn'
+
+    def model_path(self, path: str) -> str:
+        return path
+
+    def available(self, path: str) -> bool:
+        try:
+            import ncnn  # noqa: F401
+        except ImportError:
+            return False
+        return super().available(path)
+
+    def configure(self, autobackend, model_path: str):
+        if self.threads:
+            # Extractors copy the net options on every forward, so this applies from the next call
+            autobackend.net.opt.num_threads = self.threads
+
+    def export_imgsz(self, path: str) -> Optional[int]:
+        metadata_path = os.path.join(path, 'metadata.yaml')
+        if not os.path.exists(metadata_path):
+            return None
+        import yaml
+        with open(metadata_path) as f:
+            return _metadata_imgsz((yaml.safe_load(f) or {}).get('imgsz'))
+
+
+class OnnxBackend(InferenceBackend):
+    name = 'onnx'
+
+    def model_path(self, path: str) -> str:
+        base = path[:-len(NCNN_SUFFIX)] if path.endswith(NCNN_SUFFIX) else os.path.splitext(path)[0]
+        return base + '.onnx'
+
+    def available(self, path: str) -> bool:
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            return False
+        return super().available(path)
+
+    def configure(self, autobackend, model_path: str):
+        if not self.threads:
+            return
+        import onnxruntime
+        from ultralytics import __version__ as ultralytics_version
+        if not supports_session_swap(ultralytics_version) or \
+                not isinstance(getattr(autobackend, 'session', None), onnxruntime.InferenceSession):
+            logger.warning(f'ONNX thread settings not applied: untested ultralytics {ultralytics_version}')
+            return
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        # ultralytics doesn't expose session options, so swap in a CPU session built with ours
+        autobackend.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+
+    def fixed_imgsz(self, model) -> Optional[int]:
+        shape = model.predictor.model.session.get_inputs()[0].shape
+        # Dynamic exports have symbolic (string) dimensions
+        return shape[2] if isinstance(shape[2], int) else None
+
+    def export_imgsz(self, path: str) -> Optional[int]:
+        if not self.available(path):
+            return None
+        import onnxruntime
+        # ultralytics stores its metadata in the ONNX model's custom metadata map
+        session = onnxruntime.InferenceSession(self.model_path(path), providers=['CPUExecutionProvider'])
+        return _metadata_imgsz(session.get_modelmeta().custom_metadata_map.get('imgsz'))
+
+
+def supports_session_swap(ultralytics_version: str) -> bool:
+    """True if OnnxBackend may replace AutoBackend.session in this ultralytics release."""
+    try:
+        major, minor = (int(part) for part in ultralytics_version.split('.')[:2])
+    except ValueError:
+        return False
+    return (major, minor) in SESSION_SWAP_VERSIONS
+
+
+class DummyModel:
+    """Stands in for an ultralytics model: same call signatures, never detects anything."""
+
+    def __init__(self, task: str, names: Dict[int, str]):
+        self.task = task
+        self.names = names
+        self.predictor = None
+
+    def _results(self, source):
+        count = len(source) if isinstance(source, list) else 1
+        return [SimpleNamespace(boxes=SimpleNamespace(id=None), probs=None, names=self.names)
+                for _ in range(count)]
+
+    def track(self, source, **kwargs):
+        return self._results(source)
+
+    def predict(self, source, **kwargs):
+        return self._results(source)
+
+    def __call__(self, source, **kwargs):
+        return self._results(source)
+
+
+class DummyBackend(InferenceBackend):
+    """Backend without a runtime, for tests and dry runs on machines without models."""
+    name = 'dummy'
+
+    def __init__(self, threads: Optional[int] = None, names: Optional[Dict[int, str]] = None):
+        super().__init__(threads)
+        self.names = names or {0: 'bird'}
+
+    def model_path(self, path: str) -> str:
+        return path
+
+    def available(self, path: str) -> bool:
+        return True
+
+    def load(self, path: str, task: str, imgsz: int):
+        return DummyModel(task, self.names)
+
+
+BACKENDS = {
+    'ncnn': NcnnBackend,
+    'onnx': OnnxBackend,
+    'dummy': DummyBackend,
+}
+
+
+def benchmark_backend(backend: InferenceBackend, path: str, task: str, imgsz: int, runs: int = 10) -> float:
+    """Median latency in seconds of one inference at imgsz."""
+    model = backend.load(path, task, imgsz)
+    frame = np.random.default_rng(0).integers(0, 255, (imgsz, imgsz, 3), dtype=np.uint8)
+    times = []
+    for _ in range(runs):
+        st = time.perf_counter()
+        model.predict(frame, imgsz=imgsz, verbose=False)
+        times.append(time.perf_counter() - st)
+    return median(times)
+
+
+def select_backend(path: str, task: str = 'detect', imgsz: int = 320, candidates: Optional[List[str]] = None,
+                   threads: Optional[int] = None, runs: int = 10) -> InferenceBackend:
+    """
+    Time every available backend on this host with the model at `path` and return the fastest.
+
+    Args:
+        path: Configured model path (the NCNN export; other exports are looked up next to it)
+        task: Model task, 'detect' or 'classify'
+        imgsz: Input size to benchmark at
+        candidates: Backend names to try. Defaults to all real runtimes.
+        threads: Threads setting passed to each backend
+        runs: Timed inferences per backend
+    """
+    candidates = candidates or ['ncnn', 'onnx']
+    timings = {}
+    for name in candidates:
+        backend = BACKENDS[name](threads=threads)
+        if not backend.available(path):
+            logger.info(f'Inference backend {name}: not available for {path}')
+            continue
+        try:
+            timings[name] = benchmark_backend(backend, path, task, imgsz, runs)
+        except Exception as e:
+            logger.warning(f'Inference backend {name} failed to run: {e}')
+            continue
+        logger.info(f'Inference backend {name}: {timings[name] * 1000:.1f} ms per inference')
+
+    if not timings:
+        raise RuntimeError(f'No inference backend can run {path} (tried {candidates})')
+    best = min(timings, key=timings.get)
+    logger.info(f'Selected inference backend for {path}: {best}')
+    return BACKENDS[best](threads=threads)
+
+
+def create_backend(name: str = 'ncnn', threads: Optional[int] = None, benchmark_model: Optional[str] = None,
+                   benchmark_task: str = 'detect', benchmark_imgsz: int = 320) -> InferenceBackend:
+    """
+    Backend by name, or the fastest one for benchmark_model if name is 'auto'.
+    With 'auto', call once per model: only backends that can run that model are considered.
+    """
+    if name == 'auto':
+        return select_backend(benchmark_model, benchmark_task, benchmark_imgsz, threads=threads)
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown inference backend "{name}". Options: auto, {", ".join(BACKENDS)}')
+    return BACKENDS[name](threads=threads)
@@ -94,9 +94,17 @@ class LLMVerifier:
             return False
         return True
     
-    def verify(self, crop: np.ndarray, detected_species: str, observation_time: datetime = None) -> dict:
-        """Verify if detection is plausible."""
-        if crop is None or crop.size == 0:
+    @staticmethod
+    def _to_jpeg(image) -> bytes:
+        """Accept a JPEG-encoded crop (as stored on tracks) or a BGR array."""
+        if isinstance(image, np.ndarray):
+            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            return buffer.tobytes()
+        return image
+
+    def verify(self, image, detected_species: str, observation_time: datetime = None) -> dict:
+        """Verify if detection is plausible. image is JPEG bytes or a BGR array."""
+        if image is None or len(image) == 0 or (isinstance(image, np.ndarray) and image.size == 0):
             return {'is_plausible': False, 'reasoning': 'Empty image'}
         
         # Increment rate limit counters
@@ -104,7 +112,7 @@ class LLMVerifier:
         self.calls_this_day += 1
         
         try:
-            _, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            jpeg = self._to_jpeg(image)
             
             # Format datetime for the prompt
             dt_str = observation_time.strftime('%Y-%m-%d %H:%M') if observation_time else 'Unknown'
@@ -121,7 +129,7 @@ class LLMVerifier:
             response = self.client.models.generate_content(
                 model=self.model,
                 contents=[types.Content(role="user", parts=[
-                    types.Part.from_bytes(data=buffer.tobytes(), mime_type="image/jpeg"),
+                    types.Part.from_bytes(data=jpeg, mime_type="image/jpeg"),
                     types.Part.from_text(text=prompt)
                 ])],
                 config=types.GenerateContentConfig(
@@ -139,7 +147,7 @@ class LLMVerifier:
             logger.error(f"LLM verification failed: {e}")
             return {'is_plausible': True, 'reasoning': f'Error: {e}'}
     
-    def _save_log(self, track_id: int, crop: np.ndarray, detection: dict, result: dict):
+    def _save_log(self, track_id: int, image, detection: dict, result: dict):
         """Save verification to persistent log folder organized by year/month/day."""
         if not self.log_dir:
             return
@@ -152,7 +160,8 @@ class LLMVerifier:
         timestamp = now.strftime('%H%M%S')
         log_path = os.path.join(date_folder, f'{timestamp}_track{track_id}')
         
-        cv2.imwrite(f'{log_path}.jpg', crop)
+        with open(f'{log_path}.jpg', 'wb') as f:
+            f.write(self._to_jpeg(image))
         with open(f'{log_path}.json', 'w') as f:
             json.dump({
                 'species': detection.get('species_name'),
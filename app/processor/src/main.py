@@ -5,18 +5,7 @@ import argparse
 import logging
 import os
 import shutil
-from frame_processor import FrameProcessor
-from detection_strategy import SingleStageStrategy, TwoStageStrategy
-from motion_detectors.pir import PIRMotionDetector
-from motion_detectors.fake import FakeMotionDetector
-from decision_maker import DecisionMaker
-from fps_tracker import FPSTracker
-from api import API
-from sources.media_source import MediaSource
-from sources.video_file_source import VideoFileSource
-from audio_processor import AudioProcessor
-from llm_verifier import LLMVerifier
-from app_config.app_config import app_config
+from functools import partial
 
 # Set up logging
 logging.basicConfig(
@@ -34,8 +23,7 @@ def get_output_path():
     return output_dir
 
 
-def heartbeat():
-    api = API()
+def heartbeat(api):
     id = None
     while True:
         # keep updating activity_log record until restart
@@ -44,8 +32,24 @@ def heartbeat():
 
 
 def main():
-    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
-    heartbeat_thread.start()
+    # Imported here rather than at module level: post-processing workers are spawned, which
+    # re-imports this script in each of them, and they must not load the models or the camera
+    from frame_processor import FrameProcessor
+    from detection_strategy import SingleStageStrategy, TwoStageStrategy
+    from inference_backend import create_backend
+    from motion_detectors.pir import PIRMotionDetector
+    from motion_detectors.fake import FakeMotionDetector
+    from decision_maker import DecisionMaker
+    from fps_tracker import FPSTracker
+    from pipeline import FramePipeline
+    from adaptive_controller import AdaptiveController
+    from api import API
+    from sources.media_source import MediaSource
+    from sources.video_file_source import VideoFileSource
+    from audio_processor import AudioProcessor, get_regional_species
+    from regional_species import RegionalSpeciesCache
+    from post_processor import PostProcessingQueue
+    from app_config.app_config import app_config
 
     parser = argparse.ArgumentParser(description="Smart bird feeder program")
     parser.add_argument('input', type=str, nargs='?',
@@ -55,7 +59,15 @@ def main():
     args = parser.parse_args()
 
     # Instantiate all helper classes
-    api = API()
+    api = API(
+        timeout=app_config.get('processor.api.timeout', 10),
+        max_retries=app_config.get('processor.api.max_retries', 5),
+        queue_size=app_config.get('processor.api.queue_size', 100),
+        spool_dir=app_config.get('processor.api.spool_dir', 'data/api_spool'))
+    # Background sender for notifications and videos (resends any spooled videos)
+    api.start()
+    heartbeat_thread = threading.Thread(target=heartbeat, args=(api,), daemon=True)
+    heartbeat_thread.start()
     if args.fake_motion:
         motion = args.fake_motion.lower() == 'true'
         motion_detector = FakeMotionDetector(motion=motion, wait=10)
@@ -68,46 +80,103 @@ def main():
     camera_config = app_config.get('camera')
     media_source = MediaSource(main_size=main_size, camera_config=camera_config) if not args.input else VideoFileSource(
         args.input, main_size=main_size)
-    audio_processor = AudioProcessor(lat=app_config.get(
-        'secrets.latitude'), lon=app_config.get('secrets.longitude'), spectrogram_px_per_sec=app_config.get('processor.spectrogram_px_per_sec'))
-    regional_species = audio_processor.get_regional_species() + ["Squirrel"]
+    lat, lon = app_config.get('secrets.latitude'), app_config.get('secrets.longitude')
+    stream_audio = app_config.get('processor.stream_audio', True) and not args.input
+    # Only streaming analyzes audio in this process; otherwise the post-processing worker holds the only BirdNET model
+    audio_processor = AudioProcessor(
+        lat=lat, lon=lon, spectrogram_px_per_sec=app_config.get('processor.spectrogram_px_per_sec')) if stream_audio else None
+    # Regional species list is cached per location and ISO week and refreshed when the week rolls over
+    species_cache = RegionalSpeciesCache(
+        partial(get_regional_species, lat, lon),
+        lat=lat, lon=lon,
+        cache_dir=app_config.get('processor.cache_dir', 'data/cache'))
+    regional_species = species_cache.get() + ["Squirrel"]
     regional_species = api.set_active_species(regional_species)
 
-    # Initialize LLM verifier if API key is configured
-    gemini_api_key = app_config.get('ai.gemini_api_key')
-    llm_verifier = None
-    if gemini_api_key:
-        llm_verifier = LLMVerifier(
-            api_key=gemini_api_key,
-            model=app_config.get('ai.model'),
-            min_confidence=app_config.get('ai.llm_verification.min_confidence'),
-            max_calls_per_hour=app_config.get('ai.llm_verification.max_calls_per_hour'),
-            max_calls_per_day=app_config.get('ai.llm_verification.max_calls_per_day'),
-            latitude=app_config.get('secrets.latitude'),
-            longitude=app_config.get('secrets.longitude'),
-            log_dir=os.path.join('data', 'llm_verification_logs'),
-        )
+    def on_post_processed(job, result):
+        video_detections = result['video_detections']
+        audio_detections = result['audio_detections']
+        logging.info(
+            f'Post-processing done. Video Result: {video_detections}; Audio Result: {audio_detections}')
+        if video_detections:
+            api.create_video(video_detections, audio_detections,
+                             datetime.fromisoformat(job['start_time']), datetime.fromisoformat(job['end_time']),
+                             job['video_path'], result['spectrogram_path'])
+        else:
+            # LLM rejected every detection, delete folder
+            shutil.rmtree(os.path.dirname(job['video_path']), ignore_errors=True)
+
+    def on_post_processing_failed(job):
+        # The recording will never be uploaded; the failed job file stays in jobs_dir for inspection
+        logging.warning(f"Deleting recording of failed post-processing job {job['id']}")
+        shutil.rmtree(os.path.dirname(job['video_path']), ignore_errors=True)
+
+    # Audio analysis and LLM verification run in a worker process so the capture loop re-arms right away
+    post_processing = PostProcessingQueue(
+        on_post_processed,
+        jobs_dir=app_config.get('processor.postprocess.jobs_dir', 'data/postprocess_jobs'),
+        workers=app_config.get('processor.postprocess.workers', 1),
+        max_attempts=app_config.get('processor.postprocess.max_attempts', 3),
+        on_failed=on_post_processing_failed)
+    post_processing.resume()
 
     # Configure Detection Strategy
     strategy_type = app_config.get('processor.detection_strategy', 'single_stage')
+    detector_path = app_config.get('processor.models.binary' if strategy_type == 'two_stage' else 'processor.models.single_stage')
+    imgsz = app_config.get('processor.inference.imgsz') or (320 if strategy_type == 'two_stage' else 640)
+    backend_name = app_config.get('processor.inference.backend', 'ncnn')
+    threads = app_config.get('processor.inference.threads')
+    backend = create_backend(backend_name, threads=threads, benchmark_model=detector_path, benchmark_imgsz=imgsz)
     if strategy_type == 'two_stage':
+        classifier_path = app_config.get('processor.models.classifier')
+        classifier_imgsz = app_config.get('processor.inference.classifier_imgsz', 224)
+        # With 'auto' the classifier gets its own pick: it may not have an export for the detector's runtime
+        classifier_backend = create_backend(backend_name, threads=threads, benchmark_model=classifier_path,
+                                            benchmark_task='classify', benchmark_imgsz=classifier_imgsz)
         detection_strategy = TwoStageStrategy(
-            binary_model_path=app_config.get('processor.models.binary'),
-            classifier_model_path=app_config.get('processor.models.classifier'),
-            regional_species=regional_species
+            binary_model_path=detector_path,
+            classifier_model_path=classifier_path,
+            regional_species=regional_species,
+            max_batch_size=app_config.get('processor.classifier_batch_size', 4),
+            blur_metric=app_config.get('processor.blur_metric', 'laplacian'),
+            backend=backend,
+            imgsz=imgsz,
+            classifier_imgsz=classifier_imgsz,
+            classifier_backend=classifier_backend
         )
     else:
         detection_strategy = SingleStageStrategy(
-            model_path=app_config.get('processor.models.single_stage'),
-            regional_species=regional_species
+            model_path=detector_path,
+            regional_species=regional_species,
+            blur_metric=app_config.get('processor.blur_metric', 'laplacian'),
+            backend=backend,
+            imgsz=imgsz
         )
 
+    def on_regional_species_update(species):
+        active_names = api.set_active_species(species + ["Squirrel"])
+        detection_strategy.set_regional_species(active_names)
+
+    species_cache.on_update = on_regional_species_update
+    species_cache.start()
+
     frame_processor = FrameProcessor(
         detection_strategy=detection_strategy,
         tracker=app_config.get('processor.tracker'), 
-        save_images=app_config.get('processor.save_images')
+        save_images=app_config.get('processor.save_images'),
+        skip_static_frames=app_config.get('processor.skip_static_frames', True),
+        max_track_frames=app_config.get('processor.max_track_frames')
     )
     fps_tracker = FPSTracker()
+    controller = None
+    if app_config.get('processor.adaptive.enabled', True):
+        controller = AdaptiveController(
+            fps_tracker, frame_processor, detection_strategy,
+            target_fps=app_config.get('processor.adaptive.target_fps', 5),
+            max_cpu_temp=app_config.get('processor.adaptive.max_cpu_temp', 75))
+    pipeline = FramePipeline(
+        media_source, frame_processor, decision_maker, fps_tracker,
+        on_species=api.notify_species, controller=controller)
 
     # Main motion detection loop
     while True:
@@ -119,7 +188,11 @@ def main():
         output_path = get_output_path()
         video_output = f"{output_path}/video.mp4"
 
-        media_source.start_recording(video_output)
+        # Raw audio tapped from the recording so BirdNET can analyze it while recording
+        audio_tap = f"{output_path}/audio.pcm" if stream_audio else None
+        media_source.start_recording(video_output, audio_tap=audio_tap)
+        if audio_tap:
+            audio_processor.start_stream(audio_tap)
 
         logging.info(
             f'Motion detected. Processing started. Recording video and audio to "{video_output}"')
@@ -130,20 +203,10 @@ def main():
             frame_processor.reset()
             decision_maker.reset()
             fps_tracker.reset()
-            while True:
-                frame = media_source.capture()
-                if frame is None:
-                    break
-                with fps_tracker:
-                    has_detections = frame_processor.run(frame)
-
-                # Decision making
-                decision_maker.update_has_detections(has_detections)
-                species = decision_maker.decide_species(frame_processor.tracks)
-                if species is not None:
-                    api.notify_species(species)
-                if decision_maker.decide_stop_recording():
-                    break
+            if controller:
+                controller.reset()
+            # Capture, detection and track bookkeeping overlap on separate threads
+            pipeline.run()
             fps_tracker.log_summary()
         finally:
             media_source.stop_recording()
@@ -152,29 +215,24 @@ def main():
         try:
             video_detections = decision_maker.get_results(
                 frame_processor.tracks)
-            audio_detections, spectrogram_path = [], None
-            if video_detections:
-                audio_detections, spectrogram_path = audio_processor.run(
-                    video_output)
-                
-                # LLM validation (if enabled)
-                if llm_verifier:
-                    video_detections = llm_verifier.validate_detections(video_detections, start_time)
-                    
-            # Log summary without best_frame arrays
+            # Log summary without best_frame images
             video_summary = [{k: v for k, v in d.items() if k != 'best_frame'} for d in video_detections]
-            logging.info(
-                f'Processing stopped. Video Result: {video_summary}; Audio Result: {audio_detections}')
-            if len(video_detections) > 0:
-                api.create_video(video_detections, audio_detections, start_time,
-                                 end_time, video_output, spectrogram_path)
-            else:
+            logging.info(f'Processing stopped. Video Result: {video_summary}')
+            if video_detections:
+                # Streamed audio detections (None if the recording has to be analyzed)
+                audio_detections, audio_pcm_path = audio_processor.stop_stream() if audio_processor else (None, None)
+                post_processing.submit(video_output, start_time, end_time, video_detections,
+                                       audio_detections, audio_pcm_path)
+            elif audio_processor:
+                audio_processor.cancel_stream()
                 # no detections, delete folder
                 shutil.rmtree(output_path)
         except Exception as e:
             logging.error(e)
 
     media_source.close()
+    post_processing.close()
+    api.close()
 
 
 if __name__ == "__main__":
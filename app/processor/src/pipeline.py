@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+# Marks the end of the stream in stage queues
+_END = object()
+
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue that evicts the oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize=1):
+        super().__init__(maxsize=maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item):
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class FramePipeline:
+    """
+    Runs one recording through three overlapping stages, each on its own thread:
+
+    1. Capture: media_source.capture() (includes YUV->BGR conversion). None ends the
+       stream; TimeoutError (camera stall) is logged and capture is retried.
+    2. Detect: light check, detection and classification via frame_processor.detect().
+    3. Track: track bookkeeping, decision making and species notification.
+
+    Capture -> detect uses a drop-oldest queue, so detection always works on the
+    freshest frame and a slow model never backs up the camera. Detect -> track
+    is bounded but blocking, since results feed the track votes and must not be lost.
+    """
+
+    def __init__(self, media_source, frame_processor, decision_maker, fps_tracker,
+                 on_species: Optional[Callable[[str], None]] = None, frame_queue_size: int = 1, result_queue_size: int = 4,
+                 controller=None):
+        self.media_source = media_source
+        self.frame_processor = frame_processor
+        self.decision_maker = decision_maker
+        self.fps_tracker = fps_tracker
+        self.on_species = on_species
+        # Optional AdaptiveController, updated from the detect stage that owns the strategy
+        self.controller = controller
+        self.frame_queue_size = frame_queue_size
+        self.result_queue_size = result_queue_size
+        self.logger = logging.getLogger(__name__)
+
+    def run(self):
+        """Process frames until the decision maker stops the recording or the source runs out."""
+        self._stop = threading.Event()
+        self._error = None
+        self._frames = DropOldestQueue(self.frame_queue_size)
+        self._results = DropOldestQueue(self.result_queue_size)
+
+        threads = [
+            threading.Thread(target=self._guard, args=(self._capture_stage,), name='capture'),
+            threading.Thread(target=self._guard, args=(self._detect_stage,), name='detect'),
+            threading.Thread(target=self._guard, args=(self._track_stage,), name='track'),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if self._frames.dropped:
+            self.logger.info(f'Pipeline dropped {self._frames.dropped} stale frames')
+        if self._error is not None:
+            raise self._error
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except Exception as e:
+            self.logger.error(f'Pipeline stage {threading.current_thread().name} failed: {e}')
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+            # Unblock downstream stages waiting on input
+            self._frames.put_latest(_END)
+            self._results.put_latest(_END)
+
+    def _put(self, q, item):
+        # Blocking put; once a stage has failed, evict instead so nothing waits on a dead consumer
+        while self._error is None:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        q.put_latest(item)
+
+    def _capture_stage(self):
+        while not self._stop.is_set():
+            try:
+                with self.fps_tracker.stage('capture'):
+                    frame = self.media_source.capture()
+            except TimeoutError as e:
+                self.logger.warning(f'Capture stalled, retrying: {e}')
+                continue
+            if frame is None:
+                break
+            self._frames.put_latest((time.time(), frame))
+        # Let detection take the pending frame before the end marker
+        self._put(self._frames, _END)
+
+    def _detect_stage(self):
+        while True:
+            item = self._frames.get()
+            if item is _END:
+                break
+            captured_at, frame = item
+            with self.fps_tracker:
+                detection = self.frame_processor.detect(frame, captured_at)
+            if self.controller:
+                self.controller.update()
+            self._put(self._results, detection)
+        self._put(self._results, _END)
+
+    def _track_stage(self):
+        while True:
+            item = self._results.get()
+            if item is _END:
+                break
+            with self.fps_tracker.stage('track'):
+                has_detections = self.frame_processor.update(*item)
+
+            # Decision making
+            self.decision_maker.update_has_detections(has_detections)
+            species = self.decision_maker.decide_species(self.frame_processor.tracks)
+            if species is not None and self.on_species:
+                self.on_species(species)
+            if self.decision_maker.decide_stop_recording():
+                self._stop.set()
@@ -0,0 +1,240 @@
+"""
+Post-processing of finished recordings (audio, LLM verification) in a worker process,
+so the capture loop can re-arm as soon as recording stops.
+
+Job state is persisted as one JSON file per job in `jobs_dir` until the job is done,
+and unfinished jobs are resubmitted on startup. Failed jobs keep their file (status
+'failed') for inspection and are handed to `on_failed`, e.g. to delete the recording.
+
+Workers are started with spawn, which re-imports the launching script as __mp_main__
+in every worker; main.py keeps its heavy imports (models, camera) inside main() so
+workers only load what _init_worker needs.
+"""
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Per-process state of pool workers (set by _init_worker)
+_audio_processor = None
+_llm_verifier = None
+
+
+def _init_worker():
+    """Build the heavy helpers once per worker process."""
+    global _audio_processor, _llm_verifier
+    from app_config.app_config import app_config
+    from audio_processor import AudioProcessor
+    from llm_verifier import LLMVerifier
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    _audio_processor = AudioProcessor(
+        lat=app_config.get('secrets.latitude'), lon=app_config.get('secrets.longitude'),
+        spectrogram_px_per_sec=app_config.get('processor.spectrogram_px_per_sec'))
+
+    gemini_api_key = app_config.get('ai.gemini_api_key')
+    if gemini_api_key:
+        _llm_verifier = LLMVerifier(
+            api_key=gemini_api_key,
+            model=app_config.get('ai.model'),
+            min_confidence=app_config.get('ai.llm_verification.min_confidence'),
+            max_calls_per_hour=app_config.get('ai.llm_verification.max_calls_per_hour'),
+            max_calls_per_day=app_config.get('ai.llm_verification.max_calls_per_day'),
+            latitude=app_config.get('secrets.latitude'),
+            longitude=app_config.get('secrets.longitude'),
+            log_dir=os.path.join('data', 'llm_verification_logs'),
+        )
+
+
+def run_job(job):
+    """Worker side: finish audio analysis and LLM validation for one recording."""
+    audio_detections, spectrogram_path = _audio_processor.finish(
+        job['video_path'], job['audio_detections'], job['audio_pcm_path'])
+
+    video_detections = [decode_detection(d) for d in job['video_detections']]
+    if _llm_verifier:
+        video_detections = _llm_verifier.validate_detections(
+            video_detections, datetime.fromisoformat(job['start_time']))
+
+    # best_frame isn't needed past this point
+    return {
+        'video_detections': [{k: v for k, v in d.items() if k != 'best_frame'} for d in video_detections],
+        'audio_detections': audio_detections,
+        'spectrogram_path': spectrogram_path,
+    }
+
+
+def encode_detection(detection):
+    """Make a detection JSON-serializable (best_frame JPEG bytes -> base64)."""
+    best_frame = detection.get('best_frame')
+    if best_frame is None:
+        return detection
+    return {**detection, 'best_frame': base64.b64encode(best_frame).decode('ascii')}
+
+
+def decode_detection(detection):
+    best_frame = detection.get('best_frame')
+    if best_frame is None:
+        return detection
+    return {**detection, 'best_frame': base64.b64decode(best_frame)}
+
+
+class PostProcessingQueue:
+    """Runs post-processing jobs in a process pool and hands results to `on_done` in this process."""
+
+    def __init__(self, on_done, jobs_dir='data/postprocess_jobs', workers=1, max_attempts=3, on_failed=None):
+        """
+        Args:
+            on_done: Called as on_done(job, result) when a job finishes (from a pool thread)
+            jobs_dir: Directory where job state is persisted
+            workers: Number of worker processes
+            max_attempts: Jobs that were started this many times without finishing are marked failed
+            on_failed: Called as on_failed(job) once a job is marked failed and won't be retried
+        """
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Post-processing queue is closed')
+            if self._executor is None:
+                self._executor = self._new_executor()
+            return self._executor
+
+    def _new_executor(self):
+        # spawn: don't fork the camera/pipeline threads into the workers
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker)
+
+    def _job_path(self, job):
+        return os.path.join(self.jobs_dir, f"{job['id']}.json")
+
+    def _save(self, job):
+        path = self._job_path(job)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(job, f)
+        os.replace(path + '.tmp', path)
+
+    def submit(self, video_path, start_time, end_time, video_detections, audio_detections=None,
+               audio_pcm_path=None):
+        """Persist a job for a finished recording and queue it. Returns immediately."""
+        job = {
+            'id': f"{start_time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}",
+            'status': 'pending',
+            'attempts': 0,
+            'video_path': video_path,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'video_detections': [encode_detection(d) for d in video_detections],
+            'audio_detections': audio_detections,
+            'audio_pcm_path': audio_pcm_path,
+        }
+        self._run(job)
+        return job['id']
+
+    def resume(self):
+        """Resubmit jobs left unfinished by a previous run."""
+        for name in sorted(os.listdir(self.jobs_dir)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.jobs_dir, name)) as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f'Unreadable post-processing job {name}: {e}')
+                continue
+            if job['status'] != 'pending':
+                continue
+            if job['attempts'] >= self.max_attempts:
+                self._fail(job, f"gave up after {job['attempts']} attempts")
+                continue
+            logger.info(f"Resuming post-processing job {job['id']}")
+            self._run(job)
+
+    def _run(self, job):
+        job['attempts'] += 1
+        self._save(job)
+        executor = self._get_executor()
+        try:
+            future = executor.submit(run_job, job)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            executor = self._get_executor()
+            future = executor.submit(run_job, job)
+        future.add_done_callback(lambda f: self._finished(job, f, executor))
+
+    def _reset_executor(self, broken):
+        """Drop a broken executor; the next submit starts a fresh one. No-op if it was already replaced."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _fail(self, job, error):
+        logger.error(f"Post-processing job {job['id']} failed: {error}")
+        job['status'] = 'failed'
+        job['error'] = str(error)
+        self._save(job)
+        if self.on_failed:
+            try:
+                self.on_failed(job)
+            except Exception as e:
+                logger.error(f"Cleaning up failed post-processing job {job['id']} failed: {e}")
+
+    def _finished(self, job, future, executor):
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            # Worker died (e.g. out of memory). Every job of the pool fails with it, so each is
+            # resubmitted to a fresh pool until it runs out of attempts.
+            logger.error(f"Post-processing worker died on job {job['id']}: {e}")
+            self._reset_executor(executor)
+            if self._closed:
+                return  # stays pending, resumed on restart
+            if job['attempts'] >= self.max_attempts:
+                self._fail(job, e)
+                return
+            try:
+                self._run(job)
+            except RuntimeError as e:
+                # Queue closed concurrently; the job stays pending for the next start
+                logger.warning(f"Can't resubmit post-processing job {job['id']}: {e}")
+            return
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        try:
+            self.on_done(job, result)
+        except Exception as e:
+            self._fail(job, f'handling result: {e}')
+            return
+        os.remove(self._job_path(job))
+
+    def close(self, wait=True):
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        # Outside the lock: done callbacks of the jobs being waited for take it too
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+class RegionalSpeciesCache:
+    """
+    On-disk cache of the regional species list keyed by (lat, lon, ISO week).
+
+    BirdNET's species list only changes with location and week of the year, so it is
+    computed (loading the BirdNET metadata model) at most once per week and location.
+    A background thread notices when the week rolls over, refreshes the list and
+    passes it to `on_update`, so long-running processors follow the season.
+    """
+
+    def __init__(self, fetch: Callable[[datetime], List[str]], lat: float, lon: float,
+                 cache_dir: str = 'data/cache', on_update: Optional[Callable[[List[str]], None]] = None,
+                 check_interval: float = 3600.0):
+        """
+        Args:
+            fetch: Computes the species list for a date, e.g. audio_processor.get_regional_species bound to a location
+            lat: Latitude
+            lon: Longitude
+            cache_dir: Directory for cached lists
+            on_update: Called with the new list after a background refresh
+            check_interval: Seconds between week rollover checks
+        """
+        self.fetch = fetch
+        self.lat = lat
+        self.lon = lon
+        self.cache_dir = cache_dir
+        self.on_update = on_update
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self.current_key = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _key(self, date: datetime) -> str:
+        year, week, _ = date.isocalendar()
+        lat = f'{self.lat:.4f}' if self.lat is not None else 'none'
+        lon = f'{self.lon:.4f}' if self.lon is not None else 'none'
+        return f'{lat}_{lon}_{year}W{week:02d}'
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'regional_species_{key}.json')
+
+    def get(self, date: Optional[datetime] = None) -> List[str]:
+        """Species list for the week of `date` (default now), from disk if cached."""
+        date = date or datetime.now()
+        species = self._load(date)
+        self.current_key = self._key(date)
+        return species
+
+    def _load(self, date: datetime) -> List[str]:
+        key = self._key(date)
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                species = json.load(f)
+            self.logger.info(f'Loaded {len(species)} regional species from cache ({key})')
+        except (OSError, ValueError):
+            species = self.fetch(date)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(species, f)
+            os.replace(path + '.tmp', path)
+            self.logger.info(f'Cached {len(species)} regional species ({key})')
+        return species
+
+    def start(self):
+        """Start the background thread that refreshes the list when the week rolls over."""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def refresh_if_stale(self) -> bool:
+        """Reload the list if the week changed since the last get(). Returns True if it did."""
+        date = datetime.now()
+        key = self._key(date)
+        if key == self.current_key:
+            return False
+        species = self._load(date)
+        if self.on_update:
+            self.on_update(species)
+        # Only marked current once applied, so a failed update is retried on the next check
+        self.current_key = key
+        self.logger.info(f'Week rolled over, regional species list refreshed ({key})')
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.refresh_if_stale()
+            except Exception as e:
+                # Keep the current list and try again on the next check
+                self.logger.error(f'Failed to refresh regional species: {e}')
@@ -0,0 +1,71 @@
+"""
+Sharpness metrics for blur rejection. All take a uint8 grayscale image; higher means sharper.
+"""
+import numpy as np
+import cv2
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Variance of the Laplacian. int16 output is exact for uint8 input and cheaper than float64."""
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    return float(std[0, 0] ** 2)
+
+
+def tenengrad(gray: np.ndarray) -> float:
+    """Mean squared Sobel gradient magnitude."""
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    return float(cv2.mean(gx * gx + gy * gy)[0])
+
+
+def fft_highpass_ratio(gray: np.ndarray, cutoff: float = 0.1) -> float:
+    """
+    Fraction of spectral power above `cutoff` of the sampling frequency.
+    The mean is removed first: the DC term grows faster with image size than the rest of
+    the spectrum, which would make the ratio depend on crop size.
+    """
+    image = gray.astype(np.float32)
+    image -= image.mean()
+    power = np.abs(np.fft.rfft2(image)) ** 2
+    h, w = gray.shape
+    rh, rw = max(1, int(h * cutoff)), max(1, int(w * cutoff))
+    # Unshifted spectrum: low frequencies sit in the top and bottom rows of the first columns
+    low = power[:rh, :rw].sum() + power[-rh:, :rw].sum()
+    total = power.sum()
+    return float(1 - low / total) if total else 0.0
+
+
+SHARPNESS_METRICS = {
+    'laplacian': laplacian_variance,
+    'tenengrad': tenengrad,
+    'fft': fft_highpass_ratio,
+}
+
+# Blur thresholds per metric. Tenengrad and FFT values are the scores at which progressively
+# blurred textures cross the Laplacian default (see tests/test_sharpness.py); tune them per camera.
+DEFAULT_BLUR_THRESHOLDS = {
+    'laplacian': 100.0,
+    'tenengrad': 4250.0,
+    'fft': 0.45,
+}
+
+
+def measure_sharpness(gray: np.ndarray, metric: str = 'laplacian', max_side: int = 320) -> float:
+    """
+    Compute sharpness of a grayscale image on its central window of at most max_side x max_side pixels.
+
+    The window is cut at native resolution rather than downscaled: resampling changes the
+    metrics (downscaling sharpens soft edges and averages away fine texture), so thresholds
+    and best-frame scores would depend on crop size. The metrics are per-pixel averages, so
+    a window gives the same scale as the whole crop at a bounded cost.
+
+    Args:
+        gray: uint8 grayscale image (can be a slice of a larger frame)
+        metric: One of SHARPNESS_METRICS
+        max_side: Largest window side. None measures the whole image.
+    """
+    h, w = gray.shape[:2]
+    if max_side and max(h, w) > max_side:
+        top, left = max(0, (h - max_side) // 2), max(0, (w - max_side) // 2)
+        gray = gray[top:top + max_side, left:left + max_side]
+    return SHARPNESS_METRICS[metric](gray)
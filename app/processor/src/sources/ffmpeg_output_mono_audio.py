@@ -10,10 +10,12 @@ class FfmpegOutputMonoAudio(Output):
     Picamera2-specific class to handle FFmpeg output with mono audio using ALSA.
     This class is a modified version of the FfmpegOutput class from the Picamera2 library.
     It has been adapted to force mono audio output instead of the default stereo.
+    It can also tee the captured audio as raw PCM (s16le mono) to `audio_tap`, so audio can be
+    analyzed while recording is still in progress (the ALSA device can't be opened twice).
     """
 
     def __init__(self, output_filename, audio=False, audio_device="hw:1,0", audio_sync=-0.3,
-                 audio_samplerate=48000, audio_codec="aac", audio_bitrate=128000, pts=None):
+                 audio_samplerate=48000, audio_codec="aac", audio_bitrate=128000, pts=None, audio_tap=None):
         super().__init__(pts=pts)
         self.ffmpeg = None
         self.output_filename = output_filename
@@ -23,6 +25,7 @@ class FfmpegOutputMonoAudio(Output):
         self.audio_samplerate = audio_samplerate
         self.audio_codec = audio_codec
         self.audio_bitrate = audio_bitrate
+        self.audio_tap = audio_tap
         self.timeout = 1 if audio else None
         self.error_callback = None
         self.needs_pacing = True
@@ -51,8 +54,14 @@ class FfmpegOutputMonoAudio(Output):
                 '-ac', '1'  # Force mono output
             ]
 
+        tap_output = []
+        if self.audio and self.audio_tap:
+            # Second output: the same audio as raw PCM, flushed as it is captured
+            tap_output = ['-map', '0:a', '-f', 's16le', '-acodec', 'pcm_s16le',
+                          '-ac', '1', '-ar', str(self.audio_samplerate), '-flush_packets', '1', self.audio_tap]
+
         command = ['ffmpeg'] + general_options + audio_input + video_input + \
-            audio_codec + video_codec + self.output_filename.split()
+            audio_codec + video_codec + self.output_filename.split() + tap_output
 
         self.ffmpeg = subprocess.Popen(command, stdin=subprocess.PIPE,
                                        preexec_fn=lambda: prctl.set_pdeathsig(signal.SIGKILL))
@@ -2,6 +2,7 @@ import logging
 import threading
 import io
 import multiprocessing
+import queue
 import socketserver
 from http import server
 from threading import Condition
@@ -9,6 +10,7 @@ from picamera2 import Picamera2
 from picamera2.encoders import H264Encoder, JpegEncoder, Quality
 from picamera2.outputs import FileOutput
 from .ffmpeg_output_mono_audio import FfmpegOutputMonoAudio
+from .shared_frame_ring import SharedFrameRing
 import cv2
 try:
     from libcamera import controls
@@ -105,9 +107,10 @@ def _enable_hdr_if_available():
         return False
 
 
-def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multiprocessing.Queue, main_size: tuple, lores_size: tuple, camera_config: dict = None):
+def recording_worker(control_queue: multiprocessing.Queue, ack_queue: multiprocessing.Queue, ring_name: str, ring_condition, ring_slots: int, main_size: tuple, lores_size: tuple, camera_config: dict = None):
     """Handles video processing and streaming."""
     logging.info("Recording worker started")
+    frame_ring = SharedFrameRing(lores_frame_shape(lores_size), num_slots=ring_slots, name=ring_name, condition=ring_condition)
 
     # Enable HDR if configured (must be done before Picamera2 init)
     if camera_config and camera_config.get('hdr_mode', True):
@@ -149,32 +152,36 @@ def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multipro
     active_clients = 0
 
     while True:
-        command, data = control_queue.get()
+        try:
+            # While the processor is active, keep publishing lores frames and only poll for commands
+            command, data = control_queue.get_nowait() if processor_active else control_queue.get()
+        except queue.Empty:
+            frame_ring.write(picam2.capture_array("lores"))
+            continue
         logging.debug(
             f"Command: {command}, Data: {data}, Clients: {active_clients}")
 
         if command == "start":
             processor_active = True
-            output = FfmpegOutputMonoAudio(data, audio=True,
+            video_path, audio_tap = data
+            output = FfmpegOutputMonoAudio(video_path, audio=True,
                                            audio_samplerate=48000, audio_codec="aac",
-                                           audio_bitrate=128000)
+                                           audio_bitrate=128000, audio_tap=audio_tap)
             encoder.output = [output]
             picam2.start_encoder(encoder, quality=Quality.MEDIUM)
             if not recording:
                 picam2.start()
                 recording = True
-            # push first frame to signal that recording has started
-            frame_queue.put(picam2.capture_array("lores"))
+            # publish first frame and ack its sequence number to signal that recording has started
+            ack_queue.put(frame_ring.write(picam2.capture_array("lores")))
         elif command == "stop":
             processor_active = False
             picam2.stop_encoder(encoder)
             if not active_clients:
                 picam2.stop()
                 recording = False
-            # put empty frame to signal that recording has stopped
-            frame_queue.put(None)
-        elif command == "capture":
-            frame_queue.put(picam2.capture_array("lores"))
+            # ack to signal that recording has stopped
+            ack_queue.put(None)
         elif command == "client_connect":
             active_clients += 1
             if active_clients == 1:
@@ -192,38 +199,68 @@ def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multipro
         elif command == "exit":
             break
 
+    frame_ring.close()
     logging.info("Shutting down recording worker")
 
 
+def lores_frame_shape(lores_size: tuple) -> tuple:
+    """Shape of a YUV420 (I420) lores frame as returned by Picamera2: Y plane followed by U and V planes."""
+    width, height = lores_size
+    return (height * 3 // 2, width)
+
+
 class MediaSource:
     """Manages camera recording and streaming."""
 
-    def __init__(self, main_size: tuple = (1280, 720), lores_size: tuple = (640, 480), camera_config: dict = None):
-        self.frame_queue = multiprocessing.Queue(maxsize=1)
+    def __init__(self, main_size: tuple = (1280, 720), lores_size: tuple = (640, 480), camera_config: dict = None,
+                 ring_slots: int = 4, capture_timeout: float = 5.0):
+        # Lores frames are shared through a ring buffer; the queues only carry commands and acks
+        self.frame_ring = SharedFrameRing(lores_frame_shape(lores_size), num_slots=ring_slots, create=True)
+        self.capture_timeout = capture_timeout
+        self.last_seq = 0
+        self.ack_queue = multiprocessing.Queue(maxsize=1)
         self.control_queue = multiprocessing.Queue()
         self.process = multiprocessing.Process(
             target=recording_worker,
-            args=(self.control_queue, self.frame_queue, main_size, lores_size, camera_config),
+            args=(self.control_queue, self.ack_queue, self.frame_ring.name, self.frame_ring.condition, ring_slots,
+                  main_size, lores_size, camera_config),
         )
         self.process.start()
 
-    def start_recording(self, output: str):
-        self.control_queue.put(("start", output))
-        # capture first frame before proceeding to make sure camera is running
-        self.frame_queue.get()
+    def start_recording(self, output: str, audio_tap: str = None):
+        """Start recording to `output`. With audio_tap, raw PCM audio is also written there as it is captured."""
+        self.control_queue.put(("start", (output, audio_tap)))
+        # wait for first frame before proceeding to make sure camera is running
+        self.last_seq = self.ack_queue.get()
 
     def stop_recording(self):
         self.control_queue.put(("stop", None))
-        # capture empty frame before proceeding to make sure camera is stopped
-        self.frame_queue.get()
+        # wait for ack before proceeding to make sure camera is stopped
+        self.ack_queue.get()
 
     def capture(self):
-        self.control_queue.put(("capture", None))
-        image = self.frame_queue.get()
-        # Convert YUV420 (I420 format) from lores stream to BGR for OpenCV
-        # Picamera2 uses I420 (Y-U-V planar), not YV12 (Y-V-U), so use COLOR_YUV2BGR_I420
-        return cv2.cvtColor(image, cv2.COLOR_YUV2BGR_I420)
+        """
+        Return the newest lores frame as BGR, or None if the recording worker has exited.
+        Raises TimeoutError if the worker is alive but published no frame within capture_timeout
+        (e.g. a camera stall); callers can retry.
+        """
+        while True:
+            seq, image = self.frame_ring.wait_newer(self.last_seq, timeout=self.capture_timeout)
+            if image is None:
+                if not self.process.is_alive():
+                    logging.error(f"Recording worker exited (code {self.process.exitcode})")
+                    return None
+                raise TimeoutError(f"No new frame within {self.capture_timeout}s")
+            # Convert YUV420 (I420 format) from lores stream to BGR for OpenCV
+            # Picamera2 uses I420 (Y-U-V planar), not YV12 (Y-V-U), so use COLOR_YUV2BGR_I420
+            # The conversion reads straight from shared memory, so the only copy is the BGR output
+            frame = cv2.cvtColor(image, cv2.COLOR_YUV2BGR_I420)
+            if self.frame_ring.is_intact(seq):
+                self.last_seq = seq
+                return frame
+            # Slot was recycled by the worker mid-conversion, retry with a newer frame
 
     def close(self):
         self.control_queue.put(("exit", None))
         self.process.join()
+        self.frame_ring.close()
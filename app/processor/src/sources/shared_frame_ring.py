@@ -0,0 +1,106 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of preallocated frame slots in shared memory.
+
+    A single writer process publishes frames continuously and readers pick up
+    the newest one without any pickling or request/response round trip.
+
+    Layout of the shared block:
+        header: int64[1 + num_slots] -> [latest_seq, slot_seq_0, slot_seq_1, ...]
+        slots:  uint8[num_slots, *frame_shape]
+
+    Sequence numbers start at 1 (0 means "no frame yet"). The writer clears a
+    slot's sequence number before overwriting it, so a reader can verify after
+    using a slot in place that it was not recycled underneath it.
+
+    Header reads and writes go through a shared condition's lock. It is only held
+    for the sequence numbers, never for frame copies, but acquiring and releasing
+    it are memory barriers: on weakly ordered CPUs (the Pi's ARM cores) a reader
+    can't see a new sequence number before the frame data written ahead of it,
+    or miss the slot being cleared before its data is overwritten. Readers block
+    on the condition until the writer publishes, instead of polling the header.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], num_slots: int = 4, name: Optional[str] = None, create: bool = False,
+                 condition=None):
+        """
+        Args:
+            frame_shape: Shape of one uint8 frame
+            num_slots: Number of frame slots
+            name: Shared memory block to attach to, None to create one with a generated name
+            create: Create the shared memory block (the owner unlinks it on close)
+            condition: The creator's `condition`, required when attaching from another process
+        """
+        if condition is None and not create:
+            raise ValueError('Attaching to an existing ring requires its condition')
+        self.condition = condition or multiprocessing.Condition()
+        self.frame_shape = tuple(frame_shape)
+        self.num_slots = num_slots
+        header_bytes = (1 + num_slots) * np.dtype(np.int64).itemsize
+        frame_bytes = int(np.prod(self.frame_shape))
+        size = header_bytes + num_slots * frame_bytes
+
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self._owner = create
+        self._header = np.ndarray((1 + num_slots,), dtype=np.int64, buffer=self.shm.buf)
+        self._slots = np.ndarray((num_slots, *self.frame_shape), dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self._header[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        with self.condition:
+            return int(self._header[0])
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copy a frame into the next slot and publish it. Returns its sequence number."""
+        with self.condition:
+            seq = int(self._header[0]) + 1
+            slot = (seq - 1) % self.num_slots
+            # Invalidate the slot first so readers holding it can detect the overwrite
+            self._header[1 + slot] = 0
+        np.copyto(self._slots[slot], frame)
+        with self.condition:
+            self._header[1 + slot] = seq
+            self._header[0] = seq
+            self.condition.notify_all()
+        return seq
+
+    def wait_newer(self, last_seq: int, timeout: float = 5.0) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than last_seq and return (seq, view).
+
+        The returned array is a view into shared memory, not a copy. Call
+        is_intact(seq) after using it to make sure it was not overwritten.
+        Returns (last_seq, None) on timeout.
+        """
+        with self.condition:
+            # Sleeps until the writer notifies, rechecking the header on each wakeup
+            if not self.condition.wait_for(lambda: self._header[0] > last_seq, timeout):
+                return last_seq, None
+            seq = int(self._header[0])
+        return seq, self._slots[(seq - 1) % self.num_slots]
+
+    def is_intact(self, seq: int) -> bool:
+        """Check that the slot holding seq has not been recycled by the writer."""
+        with self.condition:
+            return int(self._header[1 + (seq - 1) % self.num_slots]) == seq
+
+    def close(self):
+        # Drop numpy views before closing, otherwise the buffer cannot be released
+        self._header = None
+        self._slots = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
@@ -9,9 +9,12 @@ class VideoFileSource:
     - Tracks elapsed time between capture() calls
     - Skips frames that would have passed during processing
     - Writes ALL frames to disk (skipped ones too)
+
+    With realtime=False it is deterministic instead: every capture() advances
+    exactly `stride` frames regardless of processing time (used for benchmarks).
     """
 
-    def __init__(self, video_path, main_size=(1280, 720), lores_size=(640, 640)):
+    def __init__(self, video_path, main_size=(1280, 720), lores_size=(640, 640), realtime=True, stride=1):
         self.logger = logging.getLogger(__name__)
         self.cap = cv2.VideoCapture(video_path)
         self.main_size = main_size
@@ -23,10 +26,13 @@ class VideoFileSource:
         self.frame_interval = 1.0 / self.source_fps
         self.last_capture_time = None
         self.frame_count = 0
+        self.realtime = realtime
+        self.stride = max(1, stride)
         
         self.logger.info(f'VideoFileSource: {self.source_fps} FPS')
 
-    def start_recording(self, output):
+    def start_recording(self, output, audio_tap=None):
+        # Video files have no live audio to tap; audio_tap is accepted for MediaSource compatibility
         self.logger.info(f'Start video recording to {output}')
         self.out = cv2.VideoWriter(output, self.fourcc, self.source_fps, self.main_size)
         self.frame_count = 0
@@ -49,7 +55,9 @@ class VideoFileSource:
         
         # Calculate how many frames should have passed since last capture
         now = time.time()
-        if self.last_capture_time is None:
+        if not self.realtime:
+            frames_to_advance = self.stride if self.frame_count else 1
+        elif self.last_capture_time is None:
             # First capture - start the clock now (syncs with frame_processor)
             frames_to_advance = 1
         else:
@@ -76,6 +84,11 @@ class VideoFileSource:
         
         return cv2.resize(result_frame, self.lores_size) if result_frame is not None else None
 
+    @property
+    def position_seconds(self):
+        """Video time of the last returned frame"""
+        return max(0, self.frame_count - 1) * self.frame_interval
+
     def close(self):
         self.stop_recording()
         if self.cap is not None:
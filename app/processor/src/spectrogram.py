@@ -0,0 +1,101 @@
+"""
+Mel spectrogram rendering without matplotlib: mel dB matrix -> magma LUT -> JPEG via OpenCV.
+Produces the same image as librosa.display.specshow(cmap='magma', vmin, vmax) on a borderless figure.
+"""
+from functools import lru_cache
+import numpy as np
+import cv2
+import librosa
+
+# Matplotlib's 256-entry magma colormap (OpenCV ships the same table), as a BGR lookup table
+MAGMA_LUT = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1), cv2.COLORMAP_MAGMA).reshape(256, 3)
+
+
+@lru_cache(maxsize=4)
+def mel_filterbank(sr: int, n_fft: int, n_mels: int, fmin: float, fmax: float) -> np.ndarray:
+    """Mel filterbank, cached since it only depends on the (fixed) analysis settings."""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=fmax)
+
+
+def power_to_db(power: np.ndarray, amin: float = 1e-10, top_db: float = 80.0) -> np.ndarray:
+    """Same as librosa.power_to_db(power, ref=np.max)."""
+    log_spec = 10.0 * np.log10(np.maximum(amin, power))
+    log_spec -= 10.0 * np.log10(max(amin, power.max()))
+    return np.maximum(log_spec, log_spec.max() - top_db)
+
+
+@lru_cache(maxsize=4)
+def hann_window(n_fft: int) -> np.ndarray:
+    """Periodic Hann window, as used by librosa.stft."""
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+def mel_power(samples: np.ndarray, sr: int, n_fft: int, hop_length: int, n_mels: int = 128,
+              fmin: float = 200, fmax: float = 12000, chunk_frames: int = 512) -> np.ndarray:
+    """
+    Power mel spectrogram, shape (n_mels, frames). Same framing as librosa.stft (centered,
+    zero-padded), but the STFT is computed and folded into mel bands a chunk of frames at a
+    time, so the full complex STFT of a long clip (~100 MB for 60 s) is never held in memory.
+    """
+    padded = np.pad(samples.astype(np.float32, copy=False), n_fft // 2)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+    window = hann_window(n_fft)
+    filterbank = mel_filterbank(sr, n_fft, n_mels, fmin, fmax)
+    mel = np.empty((n_mels, len(frames)), dtype=np.float32)
+    for start in range(0, len(frames), chunk_frames):
+        spectrum = np.fft.rfft(frames[start:start + chunk_frames] * window, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mel[:, start:start + chunk_frames] = filterbank @ power.T
+    return mel
+
+
+def mel_spectrogram_db(samples: np.ndarray, sr: int, n_fft: int, hop_length: int,
+                       n_mels: int = 128, fmin: float = 200, fmax: float = 12000) -> np.ndarray:
+    """Power mel spectrogram in dB relative to its max, shape (n_mels, frames)."""
+    return power_to_db(mel_power(samples, sr, n_fft, hop_length, n_mels, fmin, fmax))
+
+
+def _cell_edges(centers: np.ndarray) -> np.ndarray:
+    """Cell edges around centers, like matplotlib pcolormesh(shading='auto')."""
+    half = np.diff(centers) / 2
+    return np.concatenate([[centers[0] - half[0]], centers[:-1] + half, [centers[-1] + half[-1]]])
+
+
+def _symlog(values: np.ndarray, linthresh: float = 1000.0, base: float = 2.0) -> np.ndarray:
+    """matplotlib's symlog scale transform (linscale=1), used by specshow for mel axes."""
+    linscale_adj = 1.0 / (1.0 - 1.0 / base)
+    abs_v = np.abs(values)
+    with np.errstate(divide='ignore'):
+        log_part = np.sign(values) * linthresh * (linscale_adj + np.log(abs_v / linthresh) / np.log(base))
+    return np.where(abs_v <= linthresh, values * linscale_adj, log_part)
+
+
+def _sample_cells(edges: np.ndarray, n_px: int) -> np.ndarray:
+    """Index of the cell under each pixel center, with the axis spanning all cells."""
+    centers = edges[0] + (np.arange(n_px) + 0.5) / n_px * (edges[-1] - edges[0])
+    return np.clip(np.searchsorted(edges, centers, side='right') - 1, 0, len(edges) - 2)
+
+
+@lru_cache(maxsize=4)
+def _mel_rows(n_mels: int, sr: int, height_px: int) -> np.ndarray:
+    """Mel bin shown on each image row (top row first)."""
+    # specshow(y_axis='mel') without fmin/fmax places bins at mel frequencies over 0..sr/2 on a symlog axis
+    edges = _symlog(_cell_edges(librosa.mel_frequencies(n_mels, fmin=0.0, fmax=sr / 2)))
+    return _sample_cells(edges, height_px)[::-1]
+
+
+def render_spectrogram(S_db: np.ndarray, sr: int, width_px: int, height_px: int,
+                       vmin: float = -60, vmax: float = 0) -> np.ndarray:
+    """Map a mel dB matrix to a BGR magma image, laid out cell for cell like specshow."""
+    # Quantize like matplotlib's Normalize + Colormap: floor(x * 256), clipped to the table
+    normalized = (S_db - vmin) / (vmax - vmin)
+    indices = np.clip((normalized * 256).astype(np.int32), 0, 255).astype(np.uint8)
+    # Frames are evenly spaced, so a column maps to frame floor((x + 0.5) / width * n_frames)
+    n_mels, n_frames = S_db.shape
+    cols = _sample_cells(np.arange(n_frames + 1, dtype=np.float64), width_px)
+    return MAGMA_LUT[indices[_mel_rows(n_mels, sr, height_px)][:, cols]]
+
+
+def save_spectrogram(image: np.ndarray, output_path: str, quality: int = 85):
+    if not cv2.imwrite(output_path, image, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]):
+        raise IOError(f'Failed to write spectrogram to {output_path}')
@@ -0,0 +1,64 @@
+from typing import Optional
+import numpy as np
+
+
+class TrackHistory:
+    """
+    Compact per-track record of (timestamp, bbox) samples.
+
+    Samples live in NumPy arrays that grow in fixed-size chunks instead of a list of
+    small dicts. With max_samples set, the history is decimated when full: every other
+    sample is dropped and only every 2nd (then 4th, ...) new sample is kept, so long
+    tracks keep even coverage in bounded memory.
+    """
+
+    def __init__(self, chunk_size: int = 64, max_samples: Optional[int] = None):
+        """
+        Args:
+            chunk_size: Number of samples to grow the arrays by
+            max_samples: Cap on stored samples. None keeps every sample.
+        """
+        self.chunk_size = chunk_size
+        self.max_samples = max_samples
+        self.times = np.empty(chunk_size, dtype=np.float64)
+        self.bboxes = np.empty((chunk_size, 4), dtype=np.float32)
+        self.size = 0
+        self.step = 1  # Keep every Nth appended sample
+        self.seen = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, t: float, bbox):
+        """Record a sample; bbox is [x1, y1, x2, y2] normalized."""
+        keep = self.seen % self.step == 0
+        self.seen += 1
+        if not keep:
+            return
+
+        if self.max_samples and self.size >= self.max_samples:
+            self._decimate()
+            if (self.seen - 1) % self.step != 0:
+                return
+
+        if self.size == len(self.times):
+            grow = min(self.chunk_size, self.max_samples - self.size) if self.max_samples else self.chunk_size
+            self.times = np.concatenate([self.times, np.empty(grow, dtype=np.float64)])
+            self.bboxes = np.concatenate([self.bboxes, np.empty((grow, 4), dtype=np.float32)])
+
+        self.times[self.size] = t
+        self.bboxes[self.size] = bbox
+        self.size += 1
+
+    def _decimate(self):
+        kept = (self.size + 1) // 2
+        self.times[:kept] = self.times[:self.size:2]
+        self.bboxes[:kept] = self.bboxes[:self.size:2]
+        self.size = kept
+        self.step *= 2
+
+    def to_list(self):
+        """Materialize as a list of {t, bbox} dicts for the API payload."""
+        times = np.round(self.times[:self.size], 2).tolist()
+        bboxes = np.round(self.bboxes[:self.size].astype(np.float64), 2).tolist()
+        return [{'t': t, 'bbox': bbox} for t, bbox in zip(times, bboxes)]
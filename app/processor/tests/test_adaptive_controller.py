@@ -0,0 +1,149 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from adaptive_controller import AdaptiveController, QualityLevel, QUALITY_LEVELS
+from fps_tracker import FPSTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frames(tracker, clock, count, seconds_per_frame, busy_ratio=1.0):
+    """Time `count` frames that each take seconds_per_frame of wall time, busy_ratio of it inside the tracker."""
+    for _ in range(count):
+        with tracker:
+            clock.now += seconds_per_frame * busy_ratio
+        clock.now += seconds_per_frame * (1 - busy_ratio)
+
+
+class TestFPSTracker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = FPSTracker(window=10)
+        self.tracker.timer = self.clock
+
+    def test_rolling_fps_is_wall_clock(self):
+        self.assertIsNone(self.tracker.rolling_fps())
+        # 10 frames per second, but near-instant inside the timed block (static or off-stride frames)
+        run_frames(self.tracker, self.clock, 10, 0.1, busy_ratio=0.001)
+        self.assertAlmostEqual(self.tracker.rolling_fps(), 10.0)
+
+    def test_window_and_reset(self):
+        run_frames(self.tracker, self.clock, 20, 1.0)
+        run_frames(self.tracker, self.clock, 10, 0.1)
+        # Only the last 10 frames count
+        self.assertAlmostEqual(self.tracker.rolling_fps(), 10.0)
+
+        self.tracker.reset()
+        self.assertIsNone(self.tracker.rolling_fps())
+        self.assertEqual(self.tracker.total_frames, 0)
+
+    def test_stage_latency(self):
+        self.tracker = FPSTracker(window=None)
+        self.tracker.timer = self.clock
+        for ms in range(1, 101):
+            with self.tracker.stage('detect'):
+                self.clock.now += ms / 1000
+        self.assertAlmostEqual(self.tracker.stage_latency('detect', 50), 0.051)
+        self.assertAlmostEqual(self.tracker.stage_latency('detect', 95), 0.096)
+        self.assertIsNone(self.tracker.stage_latency('classify'))
+
+
+@patch('adaptive_controller.read_cpu_temp', return_value=50.0)
+class TestAdaptiveController(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = FPSTracker(window=10)
+        self.tracker.timer = self.clock
+        self.frame_processor = SimpleNamespace(detect_stride=1)
+        self.strategy = SimpleNamespace(imgsz=320, max_batch_size=4)
+        self.controller = AdaptiveController(self.tracker, self.frame_processor, self.strategy,
+                                             target_fps=5.0, interval=0, upgrade_cooldown=0, min_samples=10)
+
+    def step(self, fps):
+        self.tracker.reset()
+        run_frames(self.tracker, self.clock, 10, 1 / fps)
+        self.controller.update()
+        return self.controller.level
+
+    def test_steps_down_when_too_slow(self, _):
+        self.assertEqual(self.step(2.0), 1)
+        self.assertEqual(self.strategy.max_batch_size, 2)
+        self.assertEqual(self.step(2.0), 2)
+        self.assertEqual((self.strategy.imgsz, self.strategy.max_batch_size), (256, 1))
+        for _ in range(10):
+            self.step(2.0)
+        # Stops at the last level
+        self.assertEqual(self.controller.level, len(QUALITY_LEVELS) - 1)
+        self.assertEqual((self.frame_processor.detect_stride, self.strategy.imgsz, self.strategy.max_batch_size), (3, 192, 1))
+
+    def test_steps_up_with_headroom(self, _):
+        self.step(2.0)
+        self.step(2.0)
+        self.assertEqual(self.step(10.0), 1)
+        self.assertEqual(self.step(10.0), 0)
+        self.assertEqual((self.frame_processor.detect_stride, self.strategy.imgsz, self.strategy.max_batch_size), (1, 320, 4))
+
+    def test_hysteresis_band_holds_level(self, _):
+        self.step(2.0)
+        # Between 0.9x and 1.5x target: neither slow enough to degrade nor fast enough to upgrade
+        for fps in (4.6, 5.0, 7.0):
+            self.assertEqual(self.step(fps), 1)
+
+    def test_upgrade_waits_for_cooldown(self, _):
+        self.controller.upgrade_cooldown = 30
+        self.step(2.0)
+        self.assertEqual(self.step(10.0), 1)
+        # Pretend the downgrade happened 31s ago
+        self.controller.last_downgrade -= 31
+        self.assertEqual(self.step(10.0), 0)
+
+    def test_steps_down_when_too_hot(self, read_temp):
+        read_temp.return_value = 80.0
+        self.assertEqual(self.step(10.0), 1)
+
+    def test_waits_for_min_samples(self, _):
+        run_frames(self.tracker, self.clock, 5, 1.0)
+        self.controller.update()
+        self.assertEqual(self.controller.level, 0)
+
+    def test_reset_restores_full_quality(self, _):
+        self.step(2.0)
+        self.step(2.0)
+        self.controller.reset()
+        self.assertEqual(self.controller.level, 0)
+        self.assertEqual((self.frame_processor.detect_stride, self.strategy.imgsz, self.strategy.max_batch_size), (1, 320, 4))
+
+    def test_fixed_imgsz_is_not_scaled(self, _):
+        self.strategy.fixed_imgsz = True
+        self.step(2.0)
+        self.step(2.0)
+        self.assertEqual(self.strategy.imgsz, 320)
+
+
+class TestQualityLevel(unittest.TestCase):
+    def test_zero_crops_is_rejected(self):
+        with self.assertRaises(ValueError):
+            QualityLevel(detect_stride=1, imgsz_scale=1.0, max_crops=0)
+
+    def test_small_batch_size_is_not_raised(self):
+        strategy = SimpleNamespace(imgsz=320, max_batch_size=1)
+        AdaptiveController(FPSTracker(), SimpleNamespace(detect_stride=1), strategy)
+        self.assertEqual(strategy.max_batch_size, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
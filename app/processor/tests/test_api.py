@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import requests
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from api import API
+
+
+def ok_response():
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestAPI(unittest.TestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        patcher = patch.dict(os.environ, {'API_URL_BASE': 'http://web/api/processor'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_api(self):
+        api = API(backoff=0.01, max_backoff=0.01, spool_dir=self.spool_dir)
+        api.session = MagicMock()
+        api.sender_session = MagicMock()
+        self.addCleanup(api.close, 0)
+        return api
+
+    def test_notifications_are_coalesced(self):
+        api = self.make_api()
+        api.sender_session.request.return_value = ok_response()
+        api.notify_motion()
+        api.notify_motion()
+        api.notify_species('Cardinal')
+        api.notify_species('Cardinal')
+        api.notify_species('Blue Jay')
+        api.start()
+        api.close(timeout=2)
+
+        endpoints = [c.args[1].rsplit('/', 2)[-2:] for c in api.sender_session.request.call_args_list]
+        self.assertEqual(endpoints, [['notify', 'motion'], ['notify', 'detections'], ['notify', 'detections']])
+
+    def test_video_is_spooled_until_accepted(self):
+        api = self.make_api()
+        delivered = threading.Event()
+        calls = []
+
+        def request(method, url, json=None, timeout=None):
+            calls.append(json)
+            if len(calls) < 3:
+                raise requests.exceptions.ConnectionError('web is down')
+            delivered.set()
+            return ok_response()
+
+        api.sender_session.request.side_effect = request
+        now = datetime.now(timezone.utc)
+        api.create_video([{'species_name': 'Cardinal', 'best_frame': b'jpeg'}], [], now, now, 'video.mp4', None)
+        self.assertEqual(len(os.listdir(self.spool_dir)), 1)
+
+        api.start()
+        self.assertTrue(delivered.wait(2))
+        api.close(timeout=2)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[-1]['species'], [{'species_name': 'Cardinal'}])
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_spool_is_resent_on_start(self):
+        api = self.make_api()
+        now = datetime.now(timezone.utc)
+        api.create_video([], [], now, now, 'video.mp4', None)
+
+        # A new client (e.g. after a restart) picks up the spooled payload
+        api = self.make_api()
+        api.sender_session.request.return_value = ok_response()
+        api.start()
+        api.close(timeout=2)
+        api.sender_session.request.assert_called_once()
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_sync_calls_do_not_wait_for_uploads(self):
+        api = self.make_api()
+        upload_started, release_upload = threading.Event(), threading.Event()
+
+        def slow_upload(method, url, json=None, timeout=None):
+            upload_started.set()
+            release_upload.wait(5)
+            return ok_response()
+
+        api.sender_session.request.side_effect = slow_upload
+        response = ok_response()
+        response.json.return_value = {'id': 7}
+        api.session.request.return_value = response
+
+        api.notify_motion()
+        api.start()
+        self.assertTrue(upload_started.wait(2))
+        # The heartbeat goes out on its own session while the upload is still in flight
+        self.assertEqual(api.activity_log('heartbeat', {}), 7)
+        self.assertFalse(release_upload.is_set())
+        release_upload.set()
+        api.close(timeout=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+
+
+@unittest.skipUnless(importlib.util.find_spec('birdnetlib'), 'birdnetlib is not installed')
+class TestAudioProcessorModels(unittest.TestCase):
+    def test_analyzer_is_loaded_on_first_use(self):
+        import audio_processor
+        with patch.object(audio_processor, 'Analyzer') as analyzer, \
+                patch.object(audio_processor, 'RecordingBuffer'):
+            processor = audio_processor.AudioProcessor(lat=40.0, lon=-75.0)
+            analyzer.assert_not_called()
+            processor.analyze_samples([])
+            processor.analyze_samples([])
+        analyzer.assert_called_once()
+
+    def test_regional_species_do_not_load_analyzer(self):
+        import audio_processor
+        with patch.object(audio_processor, 'Analyzer') as analyzer, \
+                patch.object(audio_processor, '_species_list') as species_list:
+            species_list.return_list.return_value = [{'common_name': 'Blue Jay'}]
+            self.assertEqual(audio_processor.get_regional_species(40.0, -75.0), ['Blue Jay'])
+        analyzer.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from classification_scheduler import ClassificationScheduler
+
+
+class TestClassificationScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ClassificationScheduler(min_predictions=3)
+
+    def record_many(self, track_id, preds, area=100.0, blur=200.0):
+        for species, conf in preds:
+            self.scheduler.record(track_id, species, conf, area, blur)
+
+    def test_new_track_goes_first(self):
+        self.record_many(1, [('Blue Jay', 0.5)])
+        pending, converged = self.scheduler.prioritize([
+            {'track_id': 1, 'area': 100.0},
+            {'track_id': 2, 'area': 100.0},
+        ])
+        self.assertEqual([b['track_id'] for b in pending], [2, 1])
+        self.assertEqual(converged, [])
+
+    def test_uncertain_track_before_confident_one(self):
+        # Track 1 is split between two species, track 2 is barely above the convergence bar
+        self.record_many(1, [('Blue Jay', 0.5), ('Northern Cardinal', 0.5), ('Blue Jay', 0.5)])
+        self.record_many(2, [('Blue Jay', 0.9)] * 3 + [('Northern Cardinal', 0.9)])
+        self.scheduler.converged_margin = 0.9
+        pending, _ = self.scheduler.prioritize([
+            {'track_id': 2, 'area': 100.0},
+            {'track_id': 1, 'area': 100.0},
+        ])
+        self.assertEqual([b['track_id'] for b in pending], [1, 2])
+
+    def test_converged_track_is_skipped_until_it_grows(self):
+        self.record_many(1, [('Blue Jay', 0.9)] * 3)
+        _, converged = self.scheduler.prioritize([{'track_id': 1, 'area': 120.0}])
+        self.assertEqual([b['track_id'] for b in converged], [1])
+
+        pending, _ = self.scheduler.prioritize([{'track_id': 1, 'area': 200.0}])
+        self.assertEqual([b['track_id'] for b in pending], [1])
+
+    def test_sharper_crop_reopens_converged_track(self):
+        self.record_many(1, [('Blue Jay', 0.9)] * 3, blur=200.0)
+        self.assertFalse(self.scheduler.is_sharper(1, 250.0))
+        self.assertTrue(self.scheduler.is_sharper(1, 400.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -92,5 +92,52 @@ class TestDecisionMaker(unittest.TestCase):
         # Voting: 0.6. Avg Conf: (2.7 + 1.5)/6 = 0.7. Result: 0.42
         self.assertAlmostEqual(results[0]['confidence'], 0.42)
 
+    def test_tallies_follow_new_predictions(self):
+        """
+        Test case: Predictions appended between calls are folded in; ties go to the first species seen.
+        """
+        preds = [('Cardinal', 0.9), ('Blue Jay', 0.8), ('Blue Jay', 0.8)]
+        tracks = {
+            1: {
+                'start_time': time.time(),
+                'end_time': time.time() + 1,
+                'preds': preds,
+                'best_frame': None
+            }
+        }
+
+        results = self.decision_maker.get_results(tracks)
+        self.assertEqual(results[0]['species_name'], 'Blue Jay')
+
+        preds.append(('Cardinal', 0.7))
+        results = self.decision_maker.get_results(tracks)
+        self.assertEqual(results[0]['species_name'], 'Cardinal')
+        # Voting: 0.5. Avg Conf: 0.8. Result: 0.4
+        self.assertAlmostEqual(results[0]['confidence'], 0.4)
+    def test_frames_are_only_materialized_for_final_results(self):
+        """
+        Test case: Deciding the species per frame doesn't rebuild the frame list; final results include it.
+        """
+        frames = MagicMock()
+        frames.to_list.return_value = [{'t': 0.0, 'bbox': [0.1, 0.1, 0.5, 0.5]}]
+        tracks = {
+            1: {
+                'start_time': time.time(),
+                'end_time': time.time() + 1,
+                'preds': [('Cardinal', 0.9)] * 3,
+                'best_frame': None,
+                'frames': frames
+            }
+        }
+
+        for _ in range(3):
+            self.decision_maker.species_decided = False
+            self.assertEqual(self.decision_maker.decide_species(tracks), 'Cardinal')
+        frames.to_list.assert_not_called()
+
+        results = self.decision_maker.get_results(tracks)
+        self.assertEqual(results[0]['frames'], frames.to_list.return_value)
+        frames.to_list.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ import os
 import cv2
 import numpy as np
 import logging
+from unittest.mock import patch
 
 # Ensure project root is in path to import app modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,7 +13,7 @@ src_path = os.path.abspath(os.path.join(current_dir, '../src'))
 sys.path.append(src_path)
 
 try:
-    from detection_strategy import TwoStageStrategy, SingleStageStrategy
+    from detection_strategy import DetectionStrategy, TwoStageStrategy, SingleStageStrategy
 except ImportError:
     pass
 
@@ -127,5 +128,126 @@ class TestDetectionStrategy(unittest.TestCase):
         self.logger.info(f"Blurred image variance: {variance}")
         self.assertTrue(is_blurry, "Blurred image should be detected as blurry")
 
+    def test_filter_boxes_matches_per_box_checks(self):
+        class StubStrategy(DetectionStrategy):
+            def detect(self, frame, tracker_config, min_confidence):
+                return []
+
+            def reset(self):
+                pass
+
+        strategy = StubStrategy(min_center_dist=0.1, min_box_size_px=50)
+        h, w = 480, 640
+        xyxy = np.array([
+            [200, 150, 300, 250],   # valid
+            [0, 0, 60, 60],         # center too close to the corner
+            [200, 150, 230, 250],   # too narrow
+            [300, 200, 400, 300],   # confidence too low
+            [-20, 100, 200, 300],   # clamped on the left, still valid
+        ], dtype=np.float32)
+        xyxyn = xyxy / np.array([w, h, w, h], dtype=np.float32)
+        confidences = np.array([0.9, 0.9, 0.9, 0.05, 0.9], dtype=np.float32)
+
+        keep, coords = strategy.filter_boxes(xyxyn, xyxy, confidences, 0.1, (h, w, 3))
+
+        expected = [i for i in range(len(xyxy)) if strategy.is_valid_detection(xyxyn[i], confidences[i], 0.1)
+                    and min(xyxy[i][2], w) - max(xyxy[i][0], 0) >= 50 and min(xyxy[i][3], h) - max(xyxy[i][1], 0) >= 50]
+        self.assertEqual(keep.tolist(), expected)
+        self.assertEqual(keep.tolist(), [0, 4])
+        self.assertEqual(coords.tolist(), [[200, 150, 300, 250], [0, 100, 200, 300]])
+
+    def test_regional_filter_picks_best_allowed_class(self):
+        from types import SimpleNamespace
+        # Classifier bits only, no models loaded
+        strategy = TwoStageStrategy.__new__(TwoStageStrategy)
+        strategy.logger = self.logger
+        strategy.classifier_model = SimpleNamespace(names={
+            0: 'Blue_Jay', 1: 'Northern_Cardinal_(Adult_Male)', 2: 'Snowy_Owl', 3: 'Northern_Cardinal_(Female/Juvenile)'})
+        strategy.labels = strategy.class_labels()
+        strategy.set_regional_species(['Northern Cardinal', 'Blue Jay'])
+        self.assertEqual(strategy.classes, [0, 1, 3])
+
+        probs = SimpleNamespace(data=np.array([0.1, 0.2, 0.6, 0.1], dtype=np.float32), top1=2, top1conf=None)
+        species, conf = strategy._top_species(SimpleNamespace(probs=probs))
+        self.assertEqual(species, 'Northern Cardinal (Adult Male)')
+        self.assertAlmostEqual(conf, 0.2, places=5)
+
+        # Unchanged species set keeps the filter; a new set rebuilds it
+        index = strategy.class_index
+        strategy.set_regional_species(['Blue Jay', 'Northern Cardinal'])
+        self.assertIs(strategy.class_index, index)
+        strategy.set_regional_species(['Snowy Owl'])
+        self.assertEqual(strategy._top_species(SimpleNamespace(probs=probs))[0], 'Snowy Owl')
+
+        # Output shorter than the label list (model/labels mismatch): out-of-range ids are ignored
+        short_probs = SimpleNamespace(data=np.array([0.3, 0.7], dtype=np.float32), top1=1, top1conf=None)
+        strategy.set_regional_species(['Northern Cardinal'])
+        species, conf = strategy._top_species(SimpleNamespace(probs=short_probs))
+        self.assertEqual(species, 'Northern Cardinal (Adult Male)')
+        self.assertAlmostEqual(conf, 0.7, places=5)
+        strategy.set_regional_species(['Snowy Owl'])
+        self.assertEqual(strategy._top_species(SimpleNamespace(probs=short_probs)), ('Unknown', 0.0))
+
+    def test_strategies_run_on_dummy_backend(self):
+        from inference_backend import DummyBackend, select_backend
+
+        class FixedSizeBackend(DummyBackend):
+            def fixed_imgsz(self, model):
+                return 256
+
+            def export_imgsz(self, path):
+                return 256
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        backend = FixedSizeBackend(names={0: 'Blue_Jay', 1: 'Snowy_Owl'})
+        strategy = TwoStageStrategy('binary', 'classifier', regional_species=['Blue Jay'], backend=backend)
+        self.assertEqual(strategy.classes, [0])
+        # Both input sizes come from the models, not the defaults
+        self.assertEqual((strategy.imgsz, strategy.classifier_imgsz), (256, 256))
+        self.assertTrue(strategy.fixed_imgsz)
+        self.assertEqual(strategy.detect(frame, 'bytetrack.yaml', 0.5), [])
+
+        strategy = SingleStageStrategy('single', backend=DummyBackend())
+        self.assertEqual((strategy.imgsz, strategy.fixed_imgsz), (640, False))
+        self.assertEqual(strategy.detect(frame, 'bytetrack.yaml', 0.5), [])
+
+        self.assertEqual(select_backend('single', candidates=['dummy'], runs=2).name, 'dummy')
+
+    def test_auto_backend_is_picked_per_model(self):
+        from inference_backend import BACKENDS, DummyBackend, create_backend
+
+        class DetectorOnlyBackend(DummyBackend):
+            # Like ONNX when only the detector was exported
+            def available(self, path):
+                return path == 'binary'
+
+        with patch.dict(BACKENDS, {'ncnn': DummyBackend, 'onnx': DetectorOnlyBackend}), \
+                patch('inference_backend.benchmark_backend',
+                      side_effect=lambda backend, *args: 0.01 if isinstance(backend, DetectorOnlyBackend) else 0.02):
+            detector_backend = create_backend('auto', benchmark_model='binary')
+            classifier_backend = create_backend('auto', benchmark_model='classifier', benchmark_task='classify')
+            strategy = TwoStageStrategy('binary', 'classifier', backend=detector_backend,
+                                        classifier_backend=classifier_backend)
+        self.assertIsInstance(strategy.backend, DetectorOnlyBackend)
+        self.assertNotIsInstance(strategy.classifier_backend, DetectorOnlyBackend)
+
+        # Without a separate classifier backend both models share one
+        strategy = TwoStageStrategy('binary', 'classifier', backend=DummyBackend())
+        self.assertIs(strategy.classifier_backend, strategy.backend)
+
+    def test_onnx_session_swap_is_version_gated(self):
+        from inference_backend import supports_session_swap
+        self.assertTrue(supports_session_swap('8.3.231'))
+        self.assertFalse(supports_session_swap('9.0.0'))
+        self.assertFalse(supports_session_swap('dev'))
+
+    def test_export_imgsz_from_metadata(self):
+        from inference_backend import NcnnBackend
+        models_dir = os.path.join(current_dir, '../models/detection')
+        backend = NcnnBackend()
+        self.assertEqual(backend.export_imgsz(os.path.join(models_dir, 'nabirds_yolov8n_ncnn_model')), 640)
+        self.assertIsNone(backend.export_imgsz(os.path.join(models_dir, 'missing_ncnn_model')))
+
+
 if __name__ == '__main__':
     unittest.main()
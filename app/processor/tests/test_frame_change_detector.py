@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+import time
+import numpy as np
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from frame_change_detector import FrameChangeDetector
+from frame_processor import FrameProcessor
+from detection_strategy import DetectionResult
+
+
+def noise_frame(seed, shape=(240, 320, 3)):
+    # Noise is bright and contrasty enough to pass the light check
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+class FakeStrategy:
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frame, tracker_config, min_confidence):
+        self.calls += 1
+        crop = frame[:10, :10].copy()
+        return [DetectionResult(track_id=1, class_name='Blue Jay', confidence=0.9,
+                                bbox=[0.1, 0.1, 0.5, 0.5], blur_variance=120.0, crop=crop)]
+
+    def reset(self):
+        pass
+
+
+class TestFrameChangeDetector(unittest.TestCase):
+    def test_static_frames_are_skipped_until_max_skip(self):
+        detector = FrameChangeDetector(max_skip_frames=3)
+        frame = noise_frame(0)
+        decisions = [detector.should_detect(frame) for _ in range(6)]
+        # First frame sets the reference, then 3 skips before a forced detection
+        self.assertEqual(decisions, [True, False, False, False, True, False])
+        self.assertEqual(detector.total_skipped, 4)
+
+    def test_changed_frame_is_detected(self):
+        detector = FrameChangeDetector()
+        self.assertTrue(detector.should_detect(noise_frame(0)))
+        self.assertTrue(detector.should_detect(noise_frame(1)))
+        self.assertEqual(detector.total_skipped, 0)
+
+    def test_change_below_threshold_is_ignored(self):
+        frame = noise_frame(0)
+        # Change a block covering ~1% of the frame by +10 gray levels
+        shifted = frame.copy()
+        shifted[:24, :32] = np.clip(shifted[:24, :32].astype(np.int16) + 10, 0, 255).astype(np.uint8)
+
+        detector = FrameChangeDetector(pixel_threshold=15, sample_rate=1)
+        detector.should_detect(frame)
+        self.assertFalse(detector.should_detect(shifted))
+
+        # Same change counts once the per-pixel threshold is below it
+        detector = FrameChangeDetector(pixel_threshold=5, sample_rate=1)
+        detector.should_detect(frame)
+        self.assertTrue(detector.should_detect(shifted))
+
+        # ... unless too small a share of the frame changed
+        detector = FrameChangeDetector(pixel_threshold=5, min_changed_ratio=0.05, sample_rate=1)
+        detector.should_detect(frame)
+        self.assertFalse(detector.should_detect(shifted))
+
+    def test_reset_clears_reference(self):
+        detector = FrameChangeDetector()
+        frame = noise_frame(0)
+        detector.should_detect(frame)
+        self.assertFalse(detector.should_detect(frame))
+
+        detector.reset()
+        self.assertEqual(detector.total_skipped, 0)
+        self.assertTrue(detector.should_detect(frame))
+
+    def test_frame_size_change_forces_detection(self):
+        detector = FrameChangeDetector()
+        detector.should_detect(noise_frame(0))
+        self.assertTrue(detector.should_detect(noise_frame(0, shape=(480, 640, 3))))
+
+
+class TestStaticFrameReuse(unittest.TestCase):
+    def test_static_frame_carries_last_results_forward_unclassified(self):
+        strategy = FakeStrategy()
+        processor = FrameProcessor(strategy)
+        frame = noise_frame(0)
+
+        _, first = processor.detect(frame)
+        _, reused = processor.detect(frame)
+
+        self.assertEqual(strategy.calls, 1)
+        self.assertEqual(len(reused), 1)
+        # Same track and box, but no classification vote or best-frame candidate
+        self.assertEqual((reused[0].track_id, reused[0].bbox, reused[0].confidence),
+                         (first[0].track_id, first[0].bbox, first[0].confidence))
+        self.assertIsNone(reused[0].class_name)
+        self.assertIsNone(reused[0].crop)
+        self.assertIsNone(reused[0].blur_variance)
+        # The stored detections are untouched
+        self.assertEqual(processor.last_results[0].class_name, 'Blue Jay')
+
+        # Reused results extend the track without adding predictions
+        processor.update(1.0, first)
+        processor.update(2.0, reused)
+        track = processor.tracks[1]
+        self.assertEqual(track['preds'], [('Blue Jay', 0.9)])
+        self.assertEqual(track['end_time'], 2.0)
+        self.assertEqual(len(track['frames']), 2)
+
+    def test_off_stride_frames_reuse_results(self):
+        strategy = FakeStrategy()
+        processor = FrameProcessor(strategy, skip_static_frames=False)
+        processor.detect_stride = 2
+        results = [processor.detect(noise_frame(i))[1] for i in range(4)]
+        # Frames 2 and 4 run detection, the others reuse (frame 1 has nothing to reuse yet)
+        self.assertEqual(strategy.calls, 2)
+        self.assertEqual([len(r) for r in results], [0, 1, 1, 1])
+        self.assertIsNone(results[2][0].class_name)
+
+    def test_dark_frames_skip_without_delay_when_disabled(self):
+        strategy = FakeStrategy()
+        processor = FrameProcessor(strategy, low_light_delay=0)
+        st = time.monotonic()
+        _, results = processor.detect(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.assertLess(time.monotonic() - st, 0.5)
+        self.assertEqual((results, strategy.calls), ([], 0))
+
+    def test_reset_drops_last_results(self):
+        processor = FrameProcessor(FakeStrategy())
+        frame = noise_frame(0)
+        processor.detect(frame)
+        processor.reset()
+        self.assertEqual(processor.last_results, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from pipeline import DropOldestQueue, FramePipeline
+from decision_maker import DecisionMaker
+from fps_tracker import FPSTracker
+
+
+class FakeSource:
+    def __init__(self, n_frames):
+        self.frames = list(range(n_frames))
+
+    def capture(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+class StallingSource(FakeSource):
+    """Times out once before every frame, like a camera that stalls."""
+
+    def __init__(self, n_frames):
+        super().__init__(n_frames)
+        self.stalled = False
+
+    def capture(self):
+        self.stalled = not self.stalled
+        if self.stalled:
+            raise TimeoutError('stall')
+        return super().capture()
+
+
+class FakeFrameProcessor:
+    def __init__(self, fail_on=None):
+        self.tracks = {}
+        self.updated = []
+        self.fail_on = fail_on
+
+    def detect(self, frame, captured_at=None):
+        if frame == self.fail_on:
+            raise RuntimeError('boom')
+        return frame, ['bird']
+
+    def update(self, frame_time, results):
+        self.updated.append(frame_time)
+        self.tracks[1] = {'start_time': 0, 'end_time': frame_time, 'preds': [('Blue Jay', 0.9)]}
+        return True
+
+
+class TestPipeline(unittest.TestCase):
+    def test_drop_oldest_queue_keeps_newest(self):
+        q = DropOldestQueue(maxsize=2)
+        for i in range(5):
+            q.put_latest(i)
+        self.assertEqual([q.get(), q.get()], [3, 4])
+        self.assertEqual(q.dropped, 3)
+
+    def test_runs_until_source_ends_and_notifies_once(self):
+        frame_processor = FakeFrameProcessor()
+        notified = []
+        pipeline = FramePipeline(FakeSource(10), frame_processor, DecisionMaker(min_track_duration=0),
+                                 FPSTracker(), on_species=notified.append, frame_queue_size=10)
+        pipeline.run()
+
+        self.assertEqual(frame_processor.updated, list(range(10)))
+        self.assertEqual(notified, ['Blue Jay'])
+
+    def test_capture_timeout_does_not_end_stream(self):
+        frame_processor = FakeFrameProcessor()
+        pipeline = FramePipeline(StallingSource(5), frame_processor, DecisionMaker(min_track_duration=0),
+                                 FPSTracker(), frame_queue_size=10)
+        pipeline.run()
+
+        self.assertEqual(frame_processor.updated, list(range(5)))
+
+    def test_stage_error_is_raised(self):
+        pipeline = FramePipeline(FakeSource(10), FakeFrameProcessor(fail_on=3), DecisionMaker(),
+                                 FPSTracker(), frame_queue_size=10)
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+import post_processor
+from post_processor import PostProcessingQueue
+
+
+class TestPostProcessingQueue(unittest.TestCase):
+    def setUp(self):
+        self.jobs_dir = tempfile.mkdtemp()
+        self.release = threading.Event()
+        self.results = []
+        self.done = threading.Event()
+
+        self.crashes = 0  # how many of the next runs die like a killed worker
+
+        def fake_run_job(job):
+            self.release.wait(2)
+            if self.crashes:
+                self.crashes -= 1
+                raise BrokenProcessPool('worker died')
+            detections = [post_processor.decode_detection(d) for d in job['video_detections']]
+            return {'video_detections': detections, 'audio_detections': [], 'spectrogram_path': None}
+
+        patcher = patch.object(post_processor, 'run_job', fake_run_job)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_queue(self, **kwargs):
+        def on_done(job, result):
+            self.results.append(result)
+            self.done.set()
+
+        queue = PostProcessingQueue(on_done, jobs_dir=self.jobs_dir, **kwargs)
+        # Threads instead of worker processes so run_job can be faked
+        self.executors = []
+
+        def new_executor():
+            self.executors.append(ThreadPoolExecutor(max_workers=1))
+            return self.executors[-1]
+
+        queue._new_executor = new_executor
+        self.addCleanup(queue.close)
+        return queue
+
+    def read_job(self, job_id):
+        with open(os.path.join(self.jobs_dir, f'{job_id}.json')) as f:
+            return json.load(f)
+
+    def test_job_state_persists_until_done(self):
+        queue = self.make_queue()
+        now = datetime.now(timezone.utc)
+        queue.submit('rec/video.mp4', now, now, [{'species_name': 'Cardinal', 'best_frame': b'\xff\xd8jpeg'}])
+
+        # Submit returns right away; the job is on disk while it runs
+        jobs = os.listdir(self.jobs_dir)
+        self.assertEqual(len(jobs), 1)
+        with open(os.path.join(self.jobs_dir, jobs[0])) as f:
+            self.assertEqual(json.load(f)['status'], 'pending')
+
+        self.release.set()
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(self.results[0]['video_detections'][0]['best_frame'], b'\xff\xd8jpeg')
+        queue.close()
+        self.assertEqual(os.listdir(self.jobs_dir), [])
+
+    def test_resume_gives_up_after_max_attempts(self):
+        now = datetime.now(timezone.utc).isoformat()
+        for job_id, attempts in (('a', 1), ('b', 3)):
+            with open(os.path.join(self.jobs_dir, f'{job_id}.json'), 'w') as f:
+                json.dump({'id': job_id, 'status': 'pending', 'attempts': attempts, 'video_path': 'v.mp4',
+                           'start_time': now, 'end_time': now, 'video_detections': [],
+                           'audio_detections': None, 'audio_pcm_path': None}, f)
+
+        failed = []
+        queue = self.make_queue(on_failed=failed.append)
+        self.release.set()
+        queue.resume()
+        self.assertTrue(self.done.wait(2))
+        queue.close()
+
+        self.assertEqual(len(self.results), 1)
+        self.assertEqual(self.read_job('b')['status'], 'failed')
+        self.assertEqual([job['id'] for job in failed], ['b'])
+        self.assertFalse(os.path.exists(os.path.join(self.jobs_dir, 'a.json')))
+
+    def test_job_is_resubmitted_after_worker_dies(self):
+        queue = self.make_queue()
+        self.crashes = 1
+        self.release.set()
+        now = datetime.now(timezone.utc)
+        queue.submit('rec/video.mp4', now, now, [])
+
+        self.assertTrue(self.done.wait(2))
+        queue.close()
+        # Retried on a fresh pool, no restart needed
+        self.assertEqual(len(self.executors), 2)
+        self.assertEqual(len(self.results), 1)
+        self.assertEqual(os.listdir(self.jobs_dir), [])
+
+    def test_job_fails_when_worker_keeps_dying(self):
+        failed = threading.Event()
+        queue = self.make_queue(max_attempts=2, on_failed=lambda job: failed.set())
+        self.crashes = 5
+        self.release.set()
+        now = datetime.now(timezone.utc)
+        job_id = queue.submit('rec/video.mp4', now, now, [])
+
+        self.assertTrue(failed.wait(2))
+        queue.close()
+        job = self.read_job(job_id)
+        self.assertEqual((job['status'], job['attempts']), ('failed', 2))
+        self.assertEqual(self.results, [])
+
+    def test_failed_job_is_handed_to_on_failed(self):
+        failed = []
+        queue = self.make_queue(on_failed=failed.append)
+        self.release.set()
+        now = datetime.now(timezone.utc)
+        with patch.object(post_processor, 'run_job', side_effect=ValueError('bad audio')):
+            job_id = queue.submit('rec/video.mp4', now, now, [])
+            queue.close()
+
+        self.assertEqual([job['id'] for job in failed], [job_id])
+        self.assertEqual(self.read_job(job_id)['error'], 'bad audio')
+
+    def test_spawned_workers_do_not_load_main_dependencies(self):
+        # What a spawned worker does with the launching script: run it as __mp_main__
+        code = (
+            "import runpy, sys; "
+            f"runpy.run_path({os.path.join(src_path, 'main.py')!r}, run_name='__mp_main__'); "
+            "print(sorted({'detection_strategy', 'sources.media_source', 'ultralytics', 'picamera2'} & set(sys.modules)))"
+        )
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+import regional_species
+from regional_species import RegionalSpeciesCache
+
+
+class TestRegionalSpeciesCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.fetch = MagicMock(side_effect=lambda date: [f'Species week {date.isocalendar()[1]}'])
+
+    def make_cache(self, on_update=None):
+        return RegionalSpeciesCache(self.fetch, lat=42.36, lon=-71.06, cache_dir=self.cache_dir, on_update=on_update)
+
+    def test_list_is_computed_once_per_week(self):
+        date = datetime(2026, 5, 4)
+        self.assertEqual(self.make_cache().get(date), ['Species week 19'])
+        # A restarted processor reads the list from disk
+        self.assertEqual(self.make_cache().get(datetime(2026, 5, 10)), ['Species week 19'])
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_week_rollover_pushes_new_list(self):
+        on_update = MagicMock()
+        cache = self.make_cache(on_update)
+        cache.get(datetime(2026, 5, 10))
+
+        with patch.object(regional_species, 'datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2026, 5, 10, 23, 0)
+            self.assertFalse(cache.refresh_if_stale())
+            mock_datetime.now.return_value = datetime(2026, 5, 11, 1, 0)
+            self.assertTrue(cache.refresh_if_stale())
+        on_update.assert_called_once_with(['Species week 20'])
+
+    def test_failed_update_is_retried(self):
+        on_update = MagicMock(side_effect=[ConnectionError('web is down'), None])
+        cache = self.make_cache(on_update)
+        cache.get(datetime(2026, 5, 10))
+
+        with patch.object(regional_species, 'datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2026, 5, 11)
+            with self.assertRaises(ConnectionError):
+                cache.refresh_if_stale()
+            self.assertTrue(cache.refresh_if_stale())
+        self.assertEqual(on_update.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
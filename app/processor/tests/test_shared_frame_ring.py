@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import multiprocessing
+import time
+import numpy as np
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from sources.shared_frame_ring import SharedFrameRing
+
+
+class TestSharedFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedFrameRing((6, 4), num_slots=3, create=True)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_reader_gets_newest_frame(self):
+        for value in range(1, 5):
+            self.ring.write(np.full((6, 4), value, dtype=np.uint8))
+
+        seq, frame = self.ring.wait_newer(0, timeout=0)
+        self.assertEqual(seq, 4)
+        self.assertTrue((frame == 4).all())
+        self.assertTrue(self.ring.is_intact(seq))
+
+    def test_timeout_when_no_newer_frame(self):
+        seq = self.ring.write(np.zeros((6, 4), dtype=np.uint8))
+        self.assertEqual(self.ring.wait_newer(seq, timeout=0), (seq, None))
+
+    def test_recycled_slot_is_detected(self):
+        seq = self.ring.write(np.zeros((6, 4), dtype=np.uint8))
+        for _ in range(self.ring.num_slots):
+            self.ring.write(np.ones((6, 4), dtype=np.uint8))
+        self.assertFalse(self.ring.is_intact(seq))
+
+    def test_second_handle_shares_memory(self):
+        reader = SharedFrameRing((6, 4), num_slots=3, name=self.ring.name, condition=self.ring.condition)
+        try:
+            self.ring.write(np.full((6, 4), 7, dtype=np.uint8))
+            seq, frame = reader.wait_newer(0, timeout=0)
+            self.assertEqual(seq, 1)
+            self.assertTrue((frame == 7).all())
+        finally:
+            reader.close()
+
+    def test_attaching_requires_condition(self):
+        with self.assertRaises(ValueError):
+            SharedFrameRing((6, 4), num_slots=3, name=self.ring.name)
+
+    def test_writer_process_shares_frames(self):
+        writer = multiprocessing.Process(target=_write_frames, args=(self.ring.name, self.ring.condition, 20))
+        writer.start()
+        writer.join(timeout=30)
+        self.assertEqual(writer.exitcode, 0)
+
+        seq, frame = self.ring.wait_newer(0, timeout=0)
+        self.assertEqual(seq, 20)
+        self.assertTrue((frame == 20).all())
+        self.assertTrue(self.ring.is_intact(seq))
+
+    def test_reader_wakes_on_write(self):
+        writer = multiprocessing.Process(target=_write_frames, args=(self.ring.name, self.ring.condition, 1, 0.2))
+        writer.start()
+        try:
+            # Blocks until the writer publishes, well before the timeout
+            st = time.monotonic()
+            seq, frame = self.ring.wait_newer(0, timeout=10)
+            self.assertEqual(seq, 1)
+            self.assertLess(time.monotonic() - st, 5)
+        finally:
+            writer.join(timeout=30)
+
+    def test_wait_does_not_poll_the_header(self):
+        seq = self.ring.write(np.zeros((6, 4), dtype=np.uint8))
+        checks = []
+        header = self.ring._header
+
+        class CountingHeader(np.ndarray):
+            def __getitem__(self, index):
+                checks.append(index)
+                return np.ndarray.__getitem__(self, index)
+
+        self.ring._header = header.view(CountingHeader)
+        try:
+            self.assertEqual(self.ring.wait_newer(seq, timeout=0.3), (seq, None))
+        finally:
+            self.ring._header = header
+        # A 1 ms poll would have checked ~300 times
+        self.assertLess(len(checks), 5)
+
+
+def _write_frames(name, condition, count, delay=0.0):
+    ring = SharedFrameRing((6, 4), num_slots=3, name=name, condition=condition)
+    for value in range(1, count + 1):
+        time.sleep(delay)
+        ring.write(np.full((6, 4), value, dtype=np.uint8))
+    ring.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
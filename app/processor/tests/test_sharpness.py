@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import numpy as np
+import cv2
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from sharpness import DEFAULT_BLUR_THRESHOLDS, SHARPNESS_METRICS, measure_sharpness
+
+
+def textured_crop(shape, blur_sigma, seed=0):
+    """Uniform texture (smoothed noise) defocused by a Gaussian blur of blur_sigma pixels."""
+    image = np.random.default_rng(seed).normal(128, 60, shape).astype(np.float32)
+    image = cv2.GaussianBlur(image, (0, 0), 1.0)
+    if blur_sigma:
+        image = cv2.GaussianBlur(image, (0, 0), blur_sigma)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+class TestSharpness(unittest.TestCase):
+    SIZES = [(150, 200), (360, 480), (640, 640), (500, 900)]
+    BLUR_SIGMAS = [0, 0.5, 1.2, 1.6, 2.0, 3.0]
+
+    def test_decisions_match_full_resolution_metric(self):
+        for metric in ('laplacian', 'tenengrad', 'fft'):
+            threshold = DEFAULT_BLUR_THRESHOLDS[metric]
+            for shape in self.SIZES:
+                for sigma in self.BLUR_SIGMAS:
+                    gray = textured_crop(shape, sigma)
+                    full = SHARPNESS_METRICS[metric](gray)
+                    capped = measure_sharpness(gray, metric, max_side=320)
+                    with self.subTest(metric=metric, shape=shape, sigma=sigma):
+                        self.assertEqual(capped < threshold, full < threshold)
+                        # Same scale as the full-resolution value, so best-frame scores compare across crop sizes
+                        if metric == 'fft':
+                            # A ratio in [0, 1] that gets close to 0 when blurry
+                            self.assertAlmostEqual(capped, full, delta=0.02)
+                        else:
+                            self.assertAlmostEqual(capped / full, 1.0, delta=0.1)
+
+    def test_default_thresholds_agree_across_metrics(self):
+        laplacian_threshold = DEFAULT_BLUR_THRESHOLDS['laplacian']
+        for shape in self.SIZES:
+            for seed in range(3):
+                for sigma in np.arange(0, 3.01, 0.1):
+                    gray = textured_crop(shape, sigma, seed)
+                    laplacian = measure_sharpness(gray, 'laplacian')
+                    # Right at the threshold the metrics can't be expected to split the same way
+                    if 0.8 < laplacian / laplacian_threshold < 1.25:
+                        continue
+                    for metric in ('tenengrad', 'fft'):
+                        with self.subTest(metric=metric, shape=shape, seed=seed, sigma=round(sigma, 1)):
+                            self.assertEqual(measure_sharpness(gray, metric) < DEFAULT_BLUR_THRESHOLDS[metric],
+                                             laplacian < laplacian_threshold)
+
+    def test_fft_ratio_keeps_falling_with_blur(self):
+        scores = [measure_sharpness(textured_crop((360, 480), sigma), 'fft') for sigma in (0, 1, 2, 3)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertLess(scores[-1], 0.1)
+
+    def test_score_does_not_depend_on_crop_size(self):
+        small = measure_sharpness(textured_crop((200, 200), 1.2))
+        large = measure_sharpness(textured_crop((900, 900), 1.2))
+        self.assertAlmostEqual(large / small, 1.0, delta=0.1)
+
+    def test_small_crops_are_measured_whole(self):
+        gray = textured_crop((100, 300), 0)
+        self.assertEqual(measure_sharpness(gray, max_side=320), SHARPNESS_METRICS['laplacian'](gray))
+        self.assertEqual(measure_sharpness(gray, max_side=None), SHARPNESS_METRICS['laplacian'](gray))
+
+    def test_window_is_centered(self):
+        # Sharp texture only in the middle: the window must land on it
+        gray = np.full((900, 900), 128, dtype=np.uint8)
+        gray[300:600, 300:600] = textured_crop((300, 300), 0)
+        self.assertGreater(measure_sharpness(gray, max_side=320), DEFAULT_BLUR_THRESHOLDS['laplacian'])
+
+
+if __name__ == '__main__':
+    unittest.main()
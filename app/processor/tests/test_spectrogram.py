@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+import librosa
+from spectrogram import MAGMA_LUT, mel_power, mel_spectrogram_db, render_spectrogram
+
+
+class TestSpectrogram(unittest.TestCase):
+    def test_tone_renders_at_expected_size_and_height(self):
+        sr, px_per_sec = 48000, 200
+        t = np.arange(sr * 2) / sr
+        samples = (0.5 * np.sin(2 * np.pi * 3000 * t)).astype(np.float32)
+        hop_length = sr // px_per_sec
+
+        S_db = mel_spectrogram_db(samples, sr, n_fft=2048, hop_length=hop_length)
+        self.assertEqual(S_db.shape[0], 128)
+        self.assertAlmostEqual(S_db.max(), 0.0)
+
+        image = render_spectrogram(S_db, sr, width_px=2 * px_per_sec, height_px=256)
+        self.assertEqual(image.shape, (256, 400, 3))
+        self.assertEqual(image.dtype, np.uint8)
+        # The tone is a single bright band; everything else maps to the dark end of the colormap
+        brightness = image.astype(int).sum(axis=2).mean(axis=1)
+        loudest_row = int(np.argmax(brightness))
+        self.assertTrue(0 < loudest_row < 255)
+        self.assertTrue((image[0] == MAGMA_LUT[0]).all())
+
+    def test_mel_power_matches_librosa(self):
+        sr, hop_length = 48000, 240
+        samples = np.random.default_rng(0).standard_normal(sr).astype(np.float32) * 0.1
+        expected = librosa.feature.melspectrogram(y=samples, sr=sr, n_fft=2048, hop_length=hop_length,
+                                                  n_mels=128, fmin=200, fmax=12000, power=2.0)
+        # Small chunks to cover the chunk boundaries
+        actual = mel_power(samples, sr, n_fft=2048, hop_length=hop_length, chunk_frames=7)
+        self.assertEqual(actual.shape, expected.shape)
+        np.testing.assert_allclose(actual, expected, rtol=1e-3, atol=1e-6 * expected.max())
+
+    def test_levels_are_clipped_to_range(self):
+        S_db = np.array([[-100.0, -60.0, -30.0, 0.0, 10.0]] * 2)
+        image = render_spectrogram(S_db, 48000, width_px=5, height_px=2)
+        np.testing.assert_array_equal(image[0], MAGMA_LUT[[0, 0, 128, 255, 255]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from track_history import TrackHistory
+
+
+class TestTrackHistory(unittest.TestCase):
+    def test_grows_past_chunk_size(self):
+        history = TrackHistory(chunk_size=4)
+        for i in range(10):
+            history.append(i * 0.1, [0.1, 0.2, 0.3, 0.4])
+        frames = history.to_list()
+        self.assertEqual(len(frames), 10)
+        self.assertEqual(frames[3], {'t': 0.3, 'bbox': [0.1, 0.2, 0.3, 0.4]})
+
+    def test_decimates_when_full(self):
+        history = TrackHistory(chunk_size=4, max_samples=8)
+        for i in range(100):
+            history.append(float(i), [0, 0, 1, 1])
+        self.assertLessEqual(len(history), 8)
+        times = [f['t'] for f in history.to_list()]
+        # Evenly spaced samples from the start of the track
+        self.assertEqual(times[0], 0.0)
+        steps = {b - a for a, b in zip(times, times[1:])}
+        self.assertEqual(len(steps), 1)
+        self.assertGreater(times[-1], 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
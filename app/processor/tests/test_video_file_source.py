@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+import cv2
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/processor/tests -> app/processor/src
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+from sources.video_file_source import VideoFileSource
+
+FRAME_COUNT = 10
+FPS = 10.0
+
+
+class TestVideoFileSource(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Each frame is a flat gray level encoding its index, so frames can be told apart after compression
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.tmpdir.name, 'clip.avi')
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*'MJPG'), FPS, (64, 48))
+        for i in range(FRAME_COUNT):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def replay(self, source):
+        indices, positions = [], []
+        while True:
+            frame = source.capture()
+            if frame is None:
+                break
+            indices.append(int(round(frame.mean() / 20)))
+            positions.append(round(source.position_seconds, 3))
+        source.close()
+        return indices, positions
+
+    def test_every_frame_without_stride(self):
+        indices, positions = self.replay(VideoFileSource(self.video_path, lores_size=(32, 24), realtime=False))
+        self.assertEqual(indices, list(range(FRAME_COUNT)))
+        self.assertEqual(positions, [i / FPS for i in range(FRAME_COUNT)])
+
+    def test_stride_skips_frames(self):
+        source = VideoFileSource(self.video_path, lores_size=(32, 24), realtime=False, stride=3)
+        indices, positions = self.replay(source)
+        # First capture returns frame 0, then every 3rd frame
+        self.assertEqual(indices, [0, 3, 6, 9])
+        self.assertEqual(positions, [0.0, 0.3, 0.6, 0.9])
+        self.assertEqual(source.frame_count, FRAME_COUNT)
+
+    def test_not_realtime_ignores_processing_time(self):
+        # Same frames however long each capture takes to process
+        source = VideoFileSource(self.video_path, lores_size=(32, 24), realtime=False, stride=2)
+        source.last_capture_time = 0  # as if the previous capture was long ago
+        indices, _ = self.replay(source)
+        self.assertEqual(indices, [0, 2, 4, 6, 8])
+
+    def test_frames_are_resized_to_lores(self):
+        source = VideoFileSource(self.video_path, lores_size=(32, 24), realtime=False)
+        self.assertEqual(source.capture().shape, (24, 32, 3))
+        source.close()
+
+    def test_invalid_stride_falls_back_to_every_frame(self):
+        source = VideoFileSource(self.video_path, lores_size=(32, 24), realtime=False, stride=0)
+        indices, _ = self.replay(source)
+        self.assertEqual(indices, list(range(FRAME_COUNT)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,9 @@ import routes.ui_routes
 import routes.ui_system_routes
 import routes.processor_routes
 from models import db
+from database import configure_sqlite, startup_lock
 from seed.seed import seed
+from services.hourly_rollup import HourlyRollup
 
 # Set up logging
 logging.basicConfig(
@@ -31,8 +33,11 @@ def create_app():
 
     db.init_app(app)
     with app.app_context():
-        db.create_all()
-        seed()
+        configure_sqlite(db.engine, app.config.get('SQLITE_PRAGMAS'))
+        with startup_lock(app.config['STARTUP_LOCK_PATH']):
+            db.create_all()
+            seed()
+            HourlyRollup.backfill_if_missing()
     routes.ui_routes.register_routes(app)
     routes.ui_system_routes.register_routes(app)
     routes.processor_routes.register_routes(app)
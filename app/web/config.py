@@ -9,3 +9,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv(
         'DATABASE_URL', f'sqlite:///{db_path}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Serializes database setup across workers (see database.startup_lock)
+    STARTUP_LOCK_PATH = os.path.join(db_directory, 'startup.lock')
+    # Applied to every SQLite connection (see database.py)
+    SQLITE_PRAGMAS = {
+        # Readers don't block the writer (processor uploads, heartbeats) and vice versa
+        'journal_mode': 'WAL',
+        # Durable at checkpoints; a power cut can lose only the last commits, never corrupt
+        'synchronous': 'NORMAL',
+        'mmap_size': 128 * 1024 * 1024,  # bytes of the file read through mmap
+        'cache_size': -16000,  # page cache per connection, negative = KiB
+        'busy_timeout': 5000,  # ms to wait for the write lock instead of failing with "database is locked"
+    }
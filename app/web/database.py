@@ -0,0 +1,45 @@
+import fcntl
+import logging
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+def configure_sqlite(engine, pragmas):
+    """
+    Apply PRAGMAs to every new connection of a SQLite engine (no-op for other databases).
+
+    Most pragmas are per connection, so they're set from a connect event rather than once,
+    and pooled connections opened later by any worker get the same settings.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+    logging.info(f'SQLite journal mode: {journal_mode}, pragmas: {pragmas}')
+
+
+@contextmanager
+def startup_lock(path):
+    """
+    Exclusive lock across processes, held while a worker sets up the database.
+
+    Each gunicorn worker builds its own app, so schema creation, seeding and backfills run
+    once per worker; under this lock they run one after another, and the later workers
+    find the work already done.
+    """
+    with open(path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
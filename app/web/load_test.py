@@ -0,0 +1,165 @@
+"""
+Concurrent read/write load test for the web API, e.g. against gunicorn with several workers.
+
+Reader threads hit the heavy UI endpoints (overview, timeline, visit pages, species
+summaries) while writers do what the processor does: a heartbeat activity log update
+and video uploads with detections. Prints a JSON report with request counts, errors
+and latency percentiles per endpoint, so journal modes and pragmas can be compared.
+
+Usage:
+    gunicorn -w 4 -b 127.0.0.1:8000 app:app
+    python load_test.py http://127.0.0.1:8000 --readers 8 --duration 60
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import requests
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(list)
+
+    def record(self, name, seconds, error=None):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if error:
+                self.errors[name].append(error)
+
+    def report(self):
+        def percentile(samples, p):
+            return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+        report = {}
+        for name, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            report[name] = {
+                'count': len(samples),
+                'errors': len(self.errors[name]),
+                **{f'p{p}_ms': round(percentile(samples, p) * 1000, 1) for p in (50, 95, 99)},
+                'max_ms': round(samples[-1] * 1000, 1),
+                'first_errors': self.errors[name][:3],
+            }
+        return report
+
+
+def timed(session, stats, name, method, url, **kwargs):
+    st = time.perf_counter()
+    error = None
+    response = None
+    try:
+        response = session.request(method, url, timeout=30, **kwargs)
+        if response.status_code >= 400:
+            error = f'HTTP {response.status_code}: {response.text[:200]}'
+    except requests.RequestException as e:
+        error = str(e)
+    stats.record(name, time.perf_counter() - st, error)
+    return response if error is None else None
+
+
+def reader(base_url, stats, stop, species_ids):
+    session = requests.Session()
+    now = int(time.time())
+    day_start = now - now % 86400
+    while not stop.is_set():
+        endpoint = random.choice(['overview', 'timeline', 'visits', 'species_summary'])
+        if endpoint == 'overview':
+            timed(session, stats, endpoint, 'GET', f'{base_url}/api/ui/overview',
+                  params={'start_time': day_start, 'end_time': day_start + 86399})
+        elif endpoint == 'timeline':
+            timed(session, stats, endpoint, 'GET', f'{base_url}/api/ui/timeline',
+                  params={'start_time': now - 86400, 'end_time': now})
+        elif endpoint == 'visits':
+            # A few pages deep
+            cursor = None
+            for _ in range(3):
+                response = timed(session, stats, endpoint, 'GET', f'{base_url}/api/ui/visits',
+                                 params={'limit': 50, **({'cursor': cursor} if cursor else {})})
+                cursor = response.json()['next_cursor'] if response is not None else None
+                if not cursor:
+                    break
+        elif species_ids:
+            timed(session, stats, endpoint, 'GET', f'{base_url}/api/ui/species/{random.choice(species_ids)}/summary')
+
+
+def heartbeat_writer(base_url, stats, stop, interval):
+    """Same requests as the processor's heartbeat thread, at a faster rate."""
+    session = requests.Session()
+    log_id = None
+    while not stop.wait(interval):
+        response = timed(session, stats, 'heartbeat', 'POST', f'{base_url}/api/processor/activity_log',
+                         json={'type': 'heartbeat', 'data': {'status': 'up'}, 'id': log_id})
+        if response is not None:
+            log_id = response.json()['id']
+
+
+def video_writer(base_url, stats, stop, interval, species_names):
+    session = requests.Session()
+    while not stop.wait(interval):
+        start = datetime.now(timezone.utc)
+        detections = []
+        for track_id in range(random.randint(1, 4)):
+            offset = random.uniform(0, 20)
+            detections.append({
+                'species_name': random.choice(species_names),
+                'source': random.choice(['video', 'video', 'audio']),
+                'start_time': offset,
+                'end_time': offset + random.uniform(1, 10),
+                'confidence': random.uniform(0.5, 1.0),
+                'track_id': track_id,
+            })
+        timed(session, stats, 'create_video', 'POST', f'{base_url}/api/processor/videos', json={
+            'processor_version': 'load-test',
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(seconds=30)).isoformat(),
+            'video_path': 'data/recordings/load-test/video.mp4',
+            'spectrogram_path': None,
+            'species': detections,
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent read/write load test for the web API')
+    parser.add_argument('base_url', type=str, help='e.g. http://127.0.0.1:8000')
+    parser.add_argument('--readers', type=int, default=8, help='Concurrent reader threads')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run')
+    parser.add_argument('--heartbeat-interval', type=float, default=1.0, help='Seconds between heartbeat writes')
+    parser.add_argument('--video-interval', type=float, default=2.0, help='Seconds between video uploads')
+    parser.add_argument('--output', type=str, help='Write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip('/')
+
+    # Species with pictures are already known to the web app, so uploads don't wait on Wikipedia
+    species = requests.get(f'{base_url}/api/ui/species', timeout=30).json()
+    species_names = [s['name'] for s in species if s['image_url'] and s['description']] or \
+        [s['name'] for s in species if s['parent_id'] is not None]
+    species_ids = [s['id'] for s in species if s['count']]
+
+    stats = Stats()
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(base_url, stats, stop, species_ids)) for _ in range(args.readers)]
+    threads.append(threading.Thread(target=heartbeat_writer, args=(base_url, stats, stop, args.heartbeat_interval)))
+    threads.append(threading.Thread(target=video_writer, args=(base_url, stats, stop, args.video_interval, species_names)))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    report = json.dumps({'duration_s': args.duration, 'readers': args.readers, 'endpoints': stats.report()}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 import datetime
 from typing import List
-from sqlalchemy import String, Integer, Float, DateTime, Table, ForeignKey, Column, Index, desc
+from sqlalchemy import String, Integer, Float, DateTime, Table, ForeignKey, Column, Index, PrimaryKeyConstraint, desc
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from flask_sqlalchemy import SQLAlchemy
@@ -168,3 +168,46 @@ class SpeciesVisit(db.Model):
         Index('ix_speciesvisit_species_created_at',
               'species_id', desc('start_time')),
     )
+
+
+class SpeciesHourlyRollup(db.Model):
+    """
+    Visit totals per species and hour of visit start, maintained by VisitProcessor in the
+    same transaction as the visits, so dashboards aggregate at most 24 rows per species a day.
+    Species are grouped (active species / parent) at query time since the active set changes.
+    """
+    __tablename__ = 'species_hourly_rollup'
+    species_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('species.id'), nullable=False)
+    hour: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False)  # visit start_time truncated to the hour
+    visits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_simultaneous: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)  # sum of visits' max_simultaneous
+    duration: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0)  # sum of visit durations, seconds
+    video_seconds: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0)  # sum of video detection durations
+    audio_seconds: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0)  # sum of audio detection durations
+
+    __table_args__ = (
+        PrimaryKeyConstraint('species_id', 'hour'),
+        Index('ix_specieshourlyrollup_hour', 'hour'),
+    )
+
+
+class SpeciesStatsCache(db.Model):
+    """
+    Precomputed species summary statistics (species and its direct children), JSON encoded.
+    VisitProcessor invalidates rows when visits of the species change (data cleared, version
+    bumped), and rows expire after a while so the 24h/7d/30d windows keep sliding.
+    """
+    __tablename__ = 'species_stats_cache'
+    species_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey('species.id'), primary_key=True)
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0)  # bumped by every invalidation
+    computed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=True)
+    data: Mapped[str] = mapped_column(String, nullable=True)  # None until computed or once invalidated
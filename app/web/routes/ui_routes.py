@@ -3,8 +3,11 @@ import json as json_module
 from sqlalchemy import func, case, distinct, or_
 from sqlalchemy.orm import aliased
 from datetime import datetime, timezone, timedelta
-from models import db, BirdFood, Video, Species, VideoSpecies, SpeciesVisit, video_bird_food_association
-from util import weather_fetcher, update_species_info_from_wiki
+from models import db, BirdFood, Video, Species, VideoSpecies, SpeciesVisit
+from services.hourly_rollup import HourlyRollup
+from services.species_stats import SpeciesStats
+from services.visit_feed import VisitFeed
+from util import weather_fetcher, update_species_info_from_wiki_async
 from app_config.app_config import app_config
 
 
@@ -160,110 +163,80 @@ def register_routes(app):
             )
         ).subquery()
 
-        # Query to get top species with hourly detections for the given day
-        top_species_query = db.session.query(
-            active_species_subq.c.group_id.label('id'),
-            Species.name.label('name'),
-            *[
-                func.sum(
-                    case(
-                        (func.strftime('%H', SpeciesVisit.start_time) == str(hour).zfill(2),
-                         SpeciesVisit.max_simultaneous),
-                        else_=0
-                    )
-                ).label(f'detection_hour_{hour}')
-                for hour in range(24)
-            ]
-        ).join(
-            Species, Species.id == active_species_subq.c.group_id
+        # Day totals come from the hourly rollup: at most 24 rows per species, however long the history
+        day_rows = HourlyRollup.rows(start_of_day, end_of_day)
+        rollup_hour = func.strftime('%H', day_rows.c.hour)
+
+        # Hourly detections per species group for the given day
+        hourly_by_group = db.session.query(
+            active_species_subq.c.group_id,
+            rollup_hour.label('hour'),
+            func.sum(day_rows.c.max_simultaneous).label('count')
         ).join(
-            SpeciesVisit, SpeciesVisit.species_id == active_species_subq.c.id
-        ).filter(
-            SpeciesVisit.start_time >= start_of_day,
-            SpeciesVisit.start_time <= end_of_day
+            day_rows, day_rows.c.species_id == active_species_subq.c.id
         ).group_by(
-            active_species_subq.c.group_id
-        ).order_by(
-            func.sum(SpeciesVisit.max_simultaneous).desc()
-        ).limit(10)
+            active_species_subq.c.group_id, rollup_hour
+        ).all()
+
+        detections_by_group = {}
+        for group_id, hour, count in hourly_by_group:
+            detections_by_group.setdefault(group_id, [0] * 24)[int(hour)] = count or 0
+
+        # Top 10 species groups by total detections
+        top_group_ids = sorted(detections_by_group, key=lambda id: sum(detections_by_group[id]), reverse=True)[:10]
+        group_names = dict(db.session.query(Species.id, Species.name).filter(
+            Species.id.in_(top_group_ids)).all()) if top_group_ids else {}
+        top_species = [{
+            'id': group_id,
+            'name': group_names.get(group_id),
+            'detections': detections_by_group[group_id]
+        } for group_id in top_group_ids]
 
         # Query to get the busiest hour
         busiest_hour_query = db.session.query(
-            func.strftime('%H', SpeciesVisit.start_time).label('hour'),
-            func.sum(SpeciesVisit.max_simultaneous).label('visit_count')
-        ).filter(
-            SpeciesVisit.start_time >= start_of_day,
-            SpeciesVisit.start_time <= end_of_day
+            rollup_hour.label('hour'),
+            func.sum(day_rows.c.max_simultaneous).label('visit_count')
         ).group_by(
-            'hour'
+            rollup_hour
         ).order_by(
-            func.sum(SpeciesVisit.max_simultaneous).desc()
+            func.sum(day_rows.c.max_simultaneous).desc()
         ).first()
 
-        # Format the top species data
-        top_species = []
-        for species in top_species_query:
-            species_data = {
-                'id': species.id,
-                'name': species.name,
-                'detections': [getattr(species, f'detection_hour_{hour}', 0) or 0 for hour in range(24)]
-            }
-            top_species.append(species_data)
-
         # Statistics query
         stats_query = db.session.query(
             func.count(distinct(active_species_subq.c.group_id)
                        ).label('uniqueSpecies'),
-            func.sum(SpeciesVisit.max_simultaneous).label('totalDetections'),
-            func.sum(
-                case(
-                    (SpeciesVisit.start_time >= datetime.now() - timedelta(hours=1),
-                     SpeciesVisit.max_simultaneous),
-                    else_=0
-                )
-            ).label('lastHourDetections'),
-            func.avg(
-                func.strftime('%s', SpeciesVisit.end_time) -
-                func.strftime('%s', SpeciesVisit.start_time)
-            ).label('avgVisitDuration')
+            func.sum(day_rows.c.max_simultaneous).label('totalDetections'),
+            func.sum(day_rows.c.duration).label('totalDuration'),
+            func.sum(day_rows.c.visits).label('visits')
+        ).join(
+            active_species_subq, day_rows.c.species_id == active_species_subq.c.id
+        ).first()
+
+        # The last hour is finer than the rollup, but only scans the visits of one hour
+        last_hour_detections = db.session.query(
+            func.sum(SpeciesVisit.max_simultaneous)
         ).join(
             active_species_subq, SpeciesVisit.species_id == active_species_subq.c.id
         ).filter(
-            SpeciesVisit.start_time >= start_of_day,
+            SpeciesVisit.start_time >= max(start_of_day, datetime.now() - timedelta(hours=1)),
             SpeciesVisit.start_time <= end_of_day
-        ).first()
+        ).scalar()
 
         # Calculate total detection durations by source
         source_duration_query = db.session.query(
-            func.sum(
-                case(
-                    (VideoSpecies.source == 'video',
-                     VideoSpecies.end_time - VideoSpecies.start_time),
-                    else_=0
-                )
-            ).label('video_duration'),
-            func.sum(
-                case(
-                    (VideoSpecies.source == 'audio',
-                     VideoSpecies.end_time - VideoSpecies.start_time),
-                    else_=0
-                )
-            ).label('audio_duration')
-        ).join(
-            SpeciesVisit, VideoSpecies.species_visit_id == SpeciesVisit.id
-        ).filter(
-            SpeciesVisit.start_time >= start_of_day,
-            SpeciesVisit.start_time <= end_of_day
+            func.sum(day_rows.c.video_seconds).label('video_duration'),
+            func.sum(day_rows.c.audio_seconds).label('audio_duration')
         ).first()
 
         # Format stats data
         stats = {
             'uniqueSpecies': stats_query.uniqueSpecies if stats_query.uniqueSpecies else 0,
             'totalDetections': stats_query.totalDetections if stats_query.totalDetections else 0,
-            'lastHourDetections': stats_query.lastHourDetections if stats_query.lastHourDetections else 0,
+            'lastHourDetections': last_hour_detections or 0,
             'busiestHour': int(busiest_hour_query.hour) if busiest_hour_query else 0,
             # in seconds
-            'avgVisitDuration': round(stats_query.avgVisitDuration or 0),
+            'avgVisitDuration': round((stats_query.totalDuration or 0) / stats_query.visits) if stats_query.visits else 0,
             # in seconds
             'videoDuration': round(source_duration_query.video_duration or 0),
             # in seconds
@@ -343,60 +316,41 @@ def register_routes(app):
         if end_time - start_time > timedelta(days=1):
             return {'error': 'The interval between start_time and end_time must not exceed 1 day'}, 400
 
-        # Query SpeciesVisit records within the interval
-        visits = (
-            db.session.query(SpeciesVisit)
-            .join(Species)
-            .join(VideoSpecies)
-            .join(Video)
-            .filter(
-                # Use overlap logic
-                SpeciesVisit.end_time >= start_time,
-                SpeciesVisit.start_time <= end_time
-            )
-            .order_by(SpeciesVisit.start_time.desc())
-            .all()
-        )
+        # Visits within the interval, with detections and videos eagerly loaded
+        return [VisitFeed.serialize(visit) for visit in VisitFeed.between(start_time, end_time)]
 
-        # Construct the response
-        response = []
-        for visit in visits:
-            # Get the first video for weather data (assuming similar conditions during visit)
-            video = visit.video_species[0].video if visit.video_species else None
-
-            # Prepare detections for this visit
-            detections = []
-            sorted_video_species = sorted(
-                visit.video_species, key=lambda x: x.created_at, reverse=True)
-            for video_species in sorted_video_species:
-                video_start_time = video_species.video.start_time
-                detections.append({
-                    'video_id': video_species.video_id,
-                    'start_time': (video_start_time + timedelta(seconds=video_species.start_time)).astimezone(timezone.utc).isoformat(),
-                    'end_time': (video_start_time + timedelta(seconds=video_species.end_time)).astimezone(timezone.utc).isoformat(),
-                    'confidence': video_species.confidence,
-                    'source': video_species.source
-                })
-
-            response.append({
-                'id': visit.id,
-                'start_time': visit.start_time.astimezone(timezone.utc).isoformat(),
-                'end_time': visit.end_time.astimezone(timezone.utc).isoformat(),
-                'max_simultaneous': visit.max_simultaneous,
-                'weather': {
-                    'temp': video.weather_temp if video else None,
-                    'clouds': video.weather_clouds if video else None,
-                } if video else None,
-                'species': {
-                    'id': visit.species.id,
-                    'name': visit.species.name,
-                    'image_url': visit.species.image_url,
-                    'parent_id': visit.species.parent_id,
-                },
-                'detections': detections
-            })
+    @app.route('/api/ui/visits', methods=['GET'])
+    def get_visits():
+        """Paginated visit history, newest first. Pass next_cursor back as cursor for the next page."""
+        try:
+            limit = int(request.args.get('limit', 50))
+            species_id = request.args.get('species_id', type=int)
+            min_confidence = request.args.get('min_confidence', type=float)
+            start_time = request.args.get('start_time')
+            end_time = request.args.get('end_time')
+            # Use UTC but remove timezone info to match naive DB storage
+            start_time = datetime.fromtimestamp(int(start_time), timezone.utc).replace(tzinfo=None) if start_time else None
+            end_time = datetime.fromtimestamp(int(end_time), timezone.utc).replace(tzinfo=None) if end_time else None
+        except ValueError:
+            return {'error': 'Invalid query parameter format'}, 400
 
-        return response
+        if not 1 <= limit <= 200:
+            return {'error': 'limit must be between 1 and 200'}, 400
+        source = request.args.get('source')
+        if source not in (None, 'video', 'audio'):
+            return {'error': 'source must be "video" or "audio"'}, 400
+
+        try:
+            visits, next_cursor = VisitFeed.page(
+                limit=limit, cursor=request.args.get('cursor'), species_id=species_id, source=source,
+                min_confidence=min_confidence, start_time=start_time, end_time=end_time)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return {
+            'visits': [VisitFeed.serialize(visit) for visit in visits],
+            'next_cursor': next_cursor
+        }
 
     @app.route('/api/ui/species', methods=['GET'])
     def get_all_species():
@@ -473,154 +427,18 @@ def register_routes(app):
     @app.route('/api/ui/species/<int:species_id>/summary', methods=['GET'])
     def get_species_summary(species_id):
         # Get the species and its direct children
-        species = Species.query.get(species_id)
+        species = db.session.get(Species, species_id)
         if not species:
             return {'error': 'Species not found'}, 404
 
         children = Species.query.filter_by(parent_id=species_id).all()
         all_species_ids = [species.id] + [child.id for child in children]
 
-        if update_species_info_from_wiki(species):
-            db.session.add(species)
-            db.session.commit()
-
-        # Calculate date ranges
-        now = datetime.now(timezone.utc)
-        last_24h = now - timedelta(days=1)
-        last_7d = now - timedelta(days=7)
-        last_30d = now - timedelta(days=30)
-
-        # Function to get visit stats with species breakdown
-        def get_visit_stats(since_time):
-            return db.session.query(
-                SpeciesVisit.species_id,
-                func.sum(SpeciesVisit.max_simultaneous).label('count')
-            ).filter(
-                SpeciesVisit.species_id.in_(all_species_ids),
-                SpeciesVisit.start_time >= since_time
-            ).group_by(
-                SpeciesVisit.species_id
-            ).all()
-
-        # Get visit stats with species breakdown
-        stats_24h = dict(get_visit_stats(last_24h))
-        stats_7d = dict(get_visit_stats(last_7d))
-        stats_30d = dict(get_visit_stats(last_30d))
-
-        # Get first and last sighting dates across all species
-        sightings = db.session.query(
-            func.min(SpeciesVisit.start_time).label('first'),
-            func.max(SpeciesVisit.end_time).label('last')
-        ).filter(
-            SpeciesVisit.species_id.in_(all_species_ids)
-        ).first()
+        # Wikipedia info is filled in the background and shows up on a later request
+        update_species_info_from_wiki_async(app, species)
 
-        # Get hourly activity pattern with species breakdown
-        hourly_activity = db.session.query(
-            SpeciesVisit.species_id,
-            func.strftime('%H', SpeciesVisit.start_time).label('hour'),
-            func.sum(SpeciesVisit.max_simultaneous).label('count')
-        ).filter(
-            SpeciesVisit.species_id.in_(all_species_ids),
-            SpeciesVisit.start_time >= last_30d
-        ).group_by(
-            SpeciesVisit.species_id,
-            'hour'
-        ).all()
-
-        # Process hourly activity
-        activity_by_species = {sid: [0] * 24 for sid in all_species_ids}
-        activity_total = [0] * 24
-        for species_id, hour, count in hourly_activity:
-            hour_idx = int(hour)
-            activity_by_species[species_id][hour_idx] = int(count or 0)
-            activity_total[hour_idx] += int(count or 0)
-
-        # Get weather preferences with all species combined using visits
-        weather_stats = db.session.query(
-            func.round(Video.weather_temp).label('temp'),
-            Video.weather_clouds,
-            func.sum(SpeciesVisit.max_simultaneous).label('count')
-        ).join(
-            VideoSpecies, Video.id == VideoSpecies.video_id
-        ).join(
-            SpeciesVisit, VideoSpecies.species_visit_id == SpeciesVisit.id
-        ).filter(
-            SpeciesVisit.species_id.in_(all_species_ids),
-            Video.weather_temp.isnot(None)
-        ).group_by(
-            func.round(Video.weather_temp),
-            Video.weather_clouds
-        ).all()
-
-        # Get food preferences with all species combined using visits
-        food_stats = db.session.query(
-            BirdFood.name,
-            func.sum(SpeciesVisit.max_simultaneous).label('count')
-        ).join(
-            video_bird_food_association,
-            BirdFood.id == video_bird_food_association.c.birdfood_id
-        ).join(
-            Video,
-            Video.id == video_bird_food_association.c.video_id
-        ).join(
-            VideoSpecies, VideoSpecies.video_id == Video.id
-        ).join(
-            SpeciesVisit, VideoSpecies.species_visit_id == SpeciesVisit.id
-        ).filter(
-            SpeciesVisit.species_id.in_(all_species_ids)
-        ).group_by(
-            BirdFood.name
-        ).order_by(
-            func.sum(SpeciesVisit.max_simultaneous).desc()
-        ).limit(5).all()
-
-        # Get 10 most recent visits
-        recent_visits = (
-            db.session.query(SpeciesVisit)
-            .filter(SpeciesVisit.species_id.in_(all_species_ids))
-            .order_by(SpeciesVisit.start_time.desc())
-            .limit(10)
-            .all()
-        )
-
-        # Format recent visits to match timeline endpoint format
-        formatted_visits = []
-        for visit in recent_visits:
-            # Get the first video for weather data
-            video = visit.video_species[0].video if visit.video_species else None
-
-            # Prepare detections for this visit
-            detections = []
-            sorted_video_species = sorted(
-                visit.video_species, key=lambda x: x.created_at, reverse=True)
-            for video_species in sorted_video_species:
-                video_start_time = video_species.video.start_time
-                detections.append({
-                    'video_id': video_species.video_id,
-                    'start_time': (video_start_time + timedelta(seconds=video_species.start_time)).astimezone(timezone.utc).isoformat(),
-                    'end_time': (video_start_time + timedelta(seconds=video_species.end_time)).astimezone(timezone.utc).isoformat(),
-                    'confidence': video_species.confidence,
-                    'source': video_species.source
-                })
-
-            formatted_visits.append({
-                'id': visit.id,
-                'start_time': visit.start_time.astimezone(timezone.utc).isoformat(),
-                'end_time': visit.end_time.astimezone(timezone.utc).isoformat(),
-                'max_simultaneous': visit.max_simultaneous,
-                'weather': {
-                    'temp': video.weather_temp if video else None,
-                    'clouds': video.weather_clouds if video else None,
-                } if video else None,
-                'species': {
-                    'id': visit.species.id,
-                    'name': visit.species.name,
-                    'image_url': visit.species.image_url,
-                    'parent_id': visit.species.parent_id,
-                },
-                'detections': detections
-            })
+        # Precomputed stats, recomputed only after new visits or when expired
+        species_stats = SpeciesStats.get(species_id, all_species_ids)
 
         # Construct response
         response = {
@@ -635,47 +453,17 @@ def register_routes(app):
                     'name': species.parent.name
                 } if species.parent else None
             },
-            'stats': {
-                'detections': {
-                    'detections_24h': sum(stats_24h.values() or [0]),
-                    'detections_7d': sum(stats_7d.values() or [0]),
-                    'detections_30d': sum(stats_30d.values() or [0]),
-                },
-                'timeRange': {
-                    'first_sighting': sightings.first.isoformat() if sightings.first else None,
-                    'last_sighting': sightings.last.isoformat() if sightings.last else None,
-                },
-                'hourlyActivity': activity_total,
-                'weather': [
-                    {
-                        'temp': temp,
-                        'clouds': clouds,
-                        'count': int(count or 0)
-                    } for temp, clouds, count in weather_stats
-                ],
-                'food': [
-                    {
-                        'name': name,
-                        'count': int(count or 0)
-                    } for name, count in food_stats
-                ]
-            },
+            'stats': species_stats['stats'],
             'subspecies': [{
                 'species': {
                     'id': child.id,
                     'name': child.name,
                     'image_url': child.image_url,
                 },
-                'stats': {
-                    'detections': {
-                        'detections_24h': stats_24h.get(child.id, 0),
-                        'detections_7d': stats_7d.get(child.id, 0),
-                        'detections_30d': stats_30d.get(child.id, 0),
-                    },
-                    'hourlyActivity': activity_by_species[child.id]
-                }
+                'stats': species_stats['by_species'][child.id]
             } for child in children],
-            'recentVisits': formatted_visits  # Add recent visits to the response
+            # Same format as the timeline
+            'recentVisits': [VisitFeed.serialize(visit) for visit in VisitFeed.recent(all_species_ids)]
         }
 
         return response
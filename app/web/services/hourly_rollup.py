@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+import logging
+from sqlalchemy import func, case
+from sqlalchemy.dialects.sqlite import insert
+from models import db, SpeciesVisit, VideoSpecies, SpeciesHourlyRollup
+
+ROLLUP_FIELDS = ('visits', 'max_simultaneous', 'duration', 'video_seconds', 'audio_seconds')
+
+
+class HourlyRollup:
+    """Maintains the species_hourly_rollup table (see SpeciesHourlyRollup)."""
+
+    @staticmethod
+    def bucket(time: datetime) -> datetime:
+        """Hour bucket of a visit start time, as stored (SQLite keeps the wall time, dropping tzinfo)."""
+        return time.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+    @staticmethod
+    def apply(deltas: Dict[Tuple[int, datetime], Dict[str, float]]) -> None:
+        """
+        Add deltas keyed by (species_id, hour) to the rollup, in the current transaction.
+        Upserts increment in place, so concurrent writers can't lose each other's updates.
+        """
+        for (species_id, hour), delta in deltas.items():
+            values = {field: delta.get(field, 0) for field in ROLLUP_FIELDS}
+            if not any(values.values()):
+                continue
+            stmt = insert(SpeciesHourlyRollup).values(species_id=species_id, hour=hour, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['species_id', 'hour'],
+                set_={field: getattr(SpeciesHourlyRollup, field) + getattr(stmt.excluded, field)
+                      for field in ROLLUP_FIELDS})
+            db.session.execute(stmt)
+
+    @staticmethod
+    def rows(start: datetime, end: datetime):
+        """
+        Totals per species and hour for visits starting in [start, end], as a subquery with the
+        rollup's columns. Whole hours come from the rollup. When the range isn't hour-aligned
+        (e.g. a local day in UTC+5:30), the partial hours at its ends are aggregated from the
+        visits instead, so they don't pull in visits from outside the range.
+        """
+        first_hour = HourlyRollup.bucket(start)
+        if first_hour < start:
+            first_hour += timedelta(hours=1)
+        # end is inclusive, e.g. 23:59:59 for a whole day
+        end_hour = HourlyRollup.bucket(end + timedelta(seconds=1))
+        if first_hour >= end_hour:
+            # Within a single hour: nothing whole to read from the rollup
+            return HourlyRollup._visit_rows(SpeciesVisit.start_time >= start, SpeciesVisit.start_time <= end).subquery()
+
+        query = db.session.query(
+            SpeciesHourlyRollup.species_id.label('species_id'),
+            SpeciesHourlyRollup.hour.label('hour'),
+            *(getattr(SpeciesHourlyRollup, field).label(field) for field in ROLLUP_FIELDS)
+        ).filter(
+            SpeciesHourlyRollup.hour >= first_hour,
+            SpeciesHourlyRollup.hour < end_hour
+        )
+        edges = []
+        if start < first_hour:
+            edges.append(HourlyRollup._visit_rows(SpeciesVisit.start_time >= start, SpeciesVisit.start_time < first_hour))
+        if end_hour <= end:
+            edges.append(HourlyRollup._visit_rows(SpeciesVisit.start_time >= end_hour, SpeciesVisit.start_time <= end))
+        return query.union_all(*edges).subquery() if edges else query.subquery()
+
+    @staticmethod
+    def _visit_rows(*filters):
+        """Rollup columns aggregated live from the visits matching filters."""
+        def source_seconds(source):
+            return db.session.query(
+                func.sum(VideoSpecies.end_time - VideoSpecies.start_time)
+            ).filter(
+                VideoSpecies.species_visit_id == SpeciesVisit.id,
+                VideoSpecies.source == source
+            ).scalar_subquery()
+
+        hour = func.strftime('%Y-%m-%d %H:00:00', SpeciesVisit.start_time)
+        return db.session.query(
+            SpeciesVisit.species_id.label('species_id'),
+            hour.label('hour'),
+            func.count(SpeciesVisit.id).label('visits'),
+            func.sum(SpeciesVisit.max_simultaneous).label('max_simultaneous'),
+            func.sum((func.julianday(SpeciesVisit.end_time) - func.julianday(SpeciesVisit.start_time)) * 86400).label('duration'),
+            func.coalesce(func.sum(source_seconds('video')), 0).label('video_seconds'),
+            func.coalesce(func.sum(source_seconds('audio')), 0).label('audio_seconds')
+        ).filter(*filters).group_by(SpeciesVisit.species_id, hour)
+
+    @staticmethod
+    def rebuild() -> None:
+        """Recompute the whole rollup from visits, e.g. for databases created before it existed."""
+        hour = func.strftime('%Y-%m-%d %H:00:00', SpeciesVisit.start_time)
+        visit_rows = db.session.query(
+            SpeciesVisit.species_id, hour,
+            func.count(SpeciesVisit.id),
+            func.sum(SpeciesVisit.max_simultaneous),
+            func.sum((func.julianday(SpeciesVisit.end_time) - func.julianday(SpeciesVisit.start_time)) * 86400)
+        ).group_by(SpeciesVisit.species_id, hour).all()
+        source_rows = db.session.query(
+            SpeciesVisit.species_id, hour,
+            func.sum(case((VideoSpecies.source == 'video', VideoSpecies.end_time - VideoSpecies.start_time), else_=0)),
+            func.sum(case((VideoSpecies.source == 'audio', VideoSpecies.end_time - VideoSpecies.start_time), else_=0))
+        ).join(
+            VideoSpecies, VideoSpecies.species_visit_id == SpeciesVisit.id
+        ).group_by(SpeciesVisit.species_id, hour).all()
+
+        rows = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+        for species_id, hour_str, visits, max_simultaneous, duration in visit_rows:
+            row = rows[(species_id, datetime.fromisoformat(hour_str))]
+            row.update(visits=visits, max_simultaneous=max_simultaneous or 0, duration=duration or 0)
+        for species_id, hour_str, video_seconds, audio_seconds in source_rows:
+            row = rows[(species_id, datetime.fromisoformat(hour_str))]
+            row.update(video_seconds=video_seconds or 0, audio_seconds=audio_seconds or 0)
+
+        db.session.query(SpeciesHourlyRollup).delete()
+        db.session.add_all(SpeciesHourlyRollup(species_id=species_id, hour=hour, **values)
+                           for (species_id, hour), values in rows.items())
+        db.session.commit()
+        logging.info(f'Rebuilt species hourly rollup: {len(rows)} rows')
+
+    @staticmethod
+    def backfill_if_missing() -> None:
+        """
+        Build the rollup on first start after an upgrade (visits exist but the rollup is empty).
+        Run it under the startup lock (see database.startup_lock) so only the first worker rebuilds.
+        """
+        if not SpeciesHourlyRollup.query.first() and SpeciesVisit.query.first():
+            HourlyRollup.rebuild()
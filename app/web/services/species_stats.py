@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+import json
+import logging
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from models import db, BirdFood, Video, Species, VideoSpecies, SpeciesVisit, SpeciesStatsCache, video_bird_food_association
+
+# Cached stats are recomputed after this long even without new visits, so time windows slide
+STATS_MAX_AGE = timedelta(minutes=10)
+
+
+class SpeciesStats:
+    """Species summary statistics, materialized in species_stats_cache (see SpeciesStatsCache)."""
+
+    @staticmethod
+    def get(species_id: int, all_species_ids: List[int]) -> Dict:
+        """
+        Stats of a species and its direct children (all_species_ids), from the cache if fresh.
+        Returns {'stats': {...}, 'by_species': {species_id: {'detections', 'hourlyActivity'}}}.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        cached = db.session.execute(
+            select(SpeciesStatsCache.version, SpeciesStatsCache.computed_at, SpeciesStatsCache.data)
+            .where(SpeciesStatsCache.species_id == species_id)
+        ).first()
+        if cached and cached.data is not None and now - cached.computed_at < STATS_MAX_AGE:
+            data = json.loads(cached.data)
+            data['by_species'] = {int(id): stats for id, stats in data['by_species'].items()}
+            return data
+
+        # The version is read before computing, so stats computed while new visits commit aren't stored
+        data = SpeciesStats.compute(all_species_ids)
+        SpeciesStats._store(species_id, cached.version if cached else None, now, data)
+        return data
+
+    @staticmethod
+    def _store(species_id: int, version: Optional[int], computed_at: datetime, data: Dict) -> None:
+        """
+        Cache computed stats unless the species was invalidated since `version` was read.
+        Best effort, on its own connection: the request's session stays read-only, and a
+        busy database only costs the next request a recompute.
+        """
+        values = {'computed_at': computed_at, 'data': json.dumps(data)}
+        if version is None:
+            # A concurrent invalidation (or another request) created the row first: leave it
+            stmt = insert(SpeciesStatsCache).values(species_id=species_id, version=0, **values)
+            stmt = stmt.on_conflict_do_nothing(index_elements=['species_id'])
+        else:
+            stmt = update(SpeciesStatsCache).where(
+                SpeciesStatsCache.species_id == species_id,
+                SpeciesStatsCache.version == version
+            ).values(**values)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(stmt)
+        except OperationalError as e:
+            logging.warning(f'Species {species_id} stats not cached: {e}')
+
+    @staticmethod
+    def invalidate(species_ids: Iterable[int]) -> None:
+        """
+        Invalidate cached stats that include these species: their own and their parents'
+        (in the current transaction). Bumps the version so in-flight computations aren't stored.
+        """
+        species_ids = set(species_ids)
+        if not species_ids:
+            return
+        parent_ids = {parent_id for parent_id, in db.session.query(Species.parent_id).filter(
+            Species.id.in_(species_ids), Species.parent_id.isnot(None))}
+        stmt = insert(SpeciesStatsCache).values(
+            [{'species_id': id, 'version': 1} for id in sorted(species_ids | parent_ids)])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['species_id'],
+            set_={'version': SpeciesStatsCache.version + 1, 'computed_at': None, 'data': None}))
+
+    @staticmethod
+    def compute(all_species_ids: List[int]) -> Dict:
+        # Calculate date ranges
+        now = datetime.now(timezone.utc)
+        last_24h = now - timedelta(days=1)
+        last_7d = now - timedelta(days=7)
+        last_30d = now - timedelta(days=30)
+
+        # Function to get visit stats with species breakdown
+        def get_visit_stats(since_time):
+            return db.session.query(
+                SpeciesVisit.species_id,
+                func.sum(SpeciesVisit.max_simultaneous).label('count')
+            ).filter(
+                SpeciesVisit.species_id.in_(all_species_ids),
+                SpeciesVisit.start_time >= since_time
+            ).group_by(
+                SpeciesVisit.species_id
+            ).all()
+
+        # Get visit stats with species breakdown
+        stats_24h = dict(get_visit_stats(last_24h))
+        stats_7d = dict(get_visit_stats(last_7d))
+        stats_30d = dict(get_visit_stats(last_30d))
+
+        # Get first and last sighting dates across all species
+        sightings = db.session.query(
+            func.min(SpeciesVisit.start_time).label('first'),
+            func.max(SpeciesVisit.end_time).label('last')
+        ).filter(
+            SpeciesVisit.species_id.in_(all_species_ids)
+        ).first()
+
+        # Get hourly activity pattern with species breakdown
+        hourly_activity = db.session.query(
+            SpeciesVisit.species_id,
+            func.strftime('%H', SpeciesVisit.start_time).label('hour'),
+            func.sum(SpeciesVisit.max_simultaneous).label('count')
+        ).filter(
+            SpeciesVisit.species_id.in_(all_species_ids),
+            SpeciesVisit.start_time >= last_30d
+        ).group_by(
+            SpeciesVisit.species_id,
+            'hour'
+        ).all()
+
+        # Process hourly activity
+        activity_by_species = {sid: [0] * 24 for sid in all_species_ids}
+        activity_total = [0] * 24
+        for species_id, hour, count in hourly_activity:
+            hour_idx = int(hour)
+            activity_by_species[species_id][hour_idx] = int(count or 0)
+            activity_total[hour_idx] += int(count or 0)
+
+        # Get weather preferences with all species combined using visits
+        weather_stats = db.session.query(
+            func.round(Video.weather_temp).label('temp'),
+            Video.weather_clouds,
+            func.sum(SpeciesVisit.max_simultaneous).label('count')
+        ).join(
+            VideoSpecies, Video.id == VideoSpecies.video_id
+        ).join(
+            SpeciesVisit, VideoSpecies.species_visit_id == SpeciesVisit.id
+        ).filter(
+            SpeciesVisit.species_id.in_(all_species_ids),
+            Video.weather_temp.isnot(None)
+        ).group_by(
+            func.round(Video.weather_temp),
+            Video.weather_clouds
+        ).all()
+
+        # Get food preferences with all species combined using visits
+        food_stats = db.session.query(
+            BirdFood.name,
+            func.sum(SpeciesVisit.max_simultaneous).label('count')
+        ).join(
+            video_bird_food_association,
+            BirdFood.id == video_bird_food_association.c.birdfood_id
+        ).join(
+            Video,
+            Video.id == video_bird_food_association.c.video_id
+        ).join(
+            VideoSpecies, VideoSpecies.video_id == Video.id
+        ).join(
+            SpeciesVisit, VideoSpecies.species_visit_id == SpeciesVisit.id
+        ).filter(
+            SpeciesVisit.species_id.in_(all_species_ids)
+        ).group_by(
+            BirdFood.name
+        ).order_by(
+            func.sum(SpeciesVisit.max_simultaneous).desc()
+        ).limit(5).all()
+
+        return {
+            'stats': {
+                'detections': {
+                    'detections_24h': sum(stats_24h.values() or [0]),
+                    'detections_7d': sum(stats_7d.values() or [0]),
+                    'detections_30d': sum(stats_30d.values() or [0]),
+                },
+                'timeRange': {
+                    'first_sighting': sightings.first.isoformat() if sightings.first else None,
+                    'last_sighting': sightings.last.isoformat() if sightings.last else None,
+                },
+                'hourlyActivity': activity_total,
+                'weather': [
+                    {
+                        'temp': temp,
+                        'clouds': clouds,
+                        'count': int(count or 0)
+                    } for temp, clouds, count in weather_stats
+                ],
+                'food': [
+                    {
+                        'name': name,
+                        'count': int(count or 0)
+                    } for name, count in food_stats
+                ]
+            },
+            'by_species': {
+                sid: {
+                    'detections': {
+                        'detections_24h': stats_24h.get(sid, 0),
+                        'detections_7d': stats_7d.get(sid, 0),
+                        'detections_30d': stats_30d.get(sid, 0),
+                    },
+                    'hourlyActivity': activity_by_species[sid]
+                } for sid in all_species_ids
+            }
+        }
@@ -0,0 +1,152 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, Species, VideoSpecies, SpeciesVisit
+
+
+class VisitFeed:
+    """Loads species visits with their detections and serializes them for the timeline and species pages."""
+
+    @staticmethod
+    def query():
+        """
+        SpeciesVisit query with everything serialize() touches loaded up front: species joined,
+        detections and their videos in one extra SELECT each, however many visits there are.
+        """
+        return db.session.query(SpeciesVisit).options(
+            joinedload(SpeciesVisit.species),
+            selectinload(SpeciesVisit.video_species).joinedload(VideoSpecies.video),
+        )
+
+    @staticmethod
+    def between(start_time: datetime, end_time: datetime) -> List[SpeciesVisit]:
+        """Visits with detections overlapping the interval, newest first."""
+        return (
+            VisitFeed.query()
+            .filter(
+                # Use overlap logic
+                SpeciesVisit.end_time >= start_time,
+                SpeciesVisit.start_time <= end_time,
+                # EXISTS rather than a join, so each visit comes back once
+                SpeciesVisit.video_species.any()
+            )
+            .order_by(SpeciesVisit.start_time.desc())
+            .all()
+        )
+
+    @staticmethod
+    def recent(species_ids: List[int], limit: int = 10) -> List[SpeciesVisit]:
+        """Most recent visits of the given species."""
+        return (
+            VisitFeed.query()
+            .filter(SpeciesVisit.species_id.in_(species_ids))
+            .order_by(SpeciesVisit.start_time.desc())
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def encode_cursor(visit: SpeciesVisit) -> str:
+        """Opaque cursor pointing just past this visit in (start_time, id) descending order."""
+        key = f'{visit.start_time.replace(tzinfo=None).isoformat()}|{visit.id}'
+        return base64.urlsafe_b64encode(key.encode()).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Raises ValueError for malformed cursors."""
+        try:
+            start_time, visit_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode().split('|')
+            return datetime.fromisoformat(start_time), int(visit_id)
+        except (UnicodeError, TypeError, ValueError) as e:
+            raise ValueError(f'Invalid cursor: {e}')
+
+    @staticmethod
+    def page(limit: int = 50, cursor: Optional[str] = None, species_id: Optional[int] = None,
+             source: Optional[str] = None, min_confidence: Optional[float] = None,
+             start_time: Optional[datetime] = None, end_time: Optional[datetime] = None) -> Tuple[List[SpeciesVisit], Optional[str]]:
+        """
+        One page of visits, newest first, using keyset pagination on (start_time, id): every page
+        is a range scan on the start_time indexes, however deep into the history it is.
+
+        Args:
+            limit: Max visits per page
+            cursor: next_cursor of the previous page, None for the first page
+            species_id: Only visits of this species or its direct children
+            source: Only visits with a detection from this source ('video' or 'audio')
+            min_confidence: Only visits with a detection at least this confident
+            start_time: Only visits starting at or after this time
+            end_time: Only visits starting at or before this time
+
+        Returns:
+            Tuple of (visits, cursor of the next page or None if this is the last one).
+        """
+        query = VisitFeed.query()
+        if species_id is not None:
+            child_ids = [id for id, in db.session.query(Species.id).filter(Species.parent_id == species_id)]
+            query = query.filter(SpeciesVisit.species_id.in_([species_id] + child_ids))
+        if start_time is not None:
+            query = query.filter(SpeciesVisit.start_time >= start_time)
+        if end_time is not None:
+            query = query.filter(SpeciesVisit.start_time <= end_time)
+
+        # Visits without detections aren't listed, same as the timeline
+        detection_filters = []
+        if source is not None:
+            detection_filters.append(VideoSpecies.source == source)
+        if min_confidence is not None:
+            detection_filters.append(VideoSpecies.confidence >= min_confidence)
+        query = query.filter(SpeciesVisit.video_species.any(and_(*detection_filters) if detection_filters else None))
+
+        if cursor:
+            cursor_time, cursor_id = VisitFeed.decode_cursor(cursor)
+            # The plain start_time bound lets SQLite use it as an index range
+            query = query.filter(
+                SpeciesVisit.start_time <= cursor_time,
+                or_(SpeciesVisit.start_time < cursor_time, SpeciesVisit.id < cursor_id))
+
+        # One extra row tells whether there is a next page
+        visits = query.order_by(SpeciesVisit.start_time.desc(), SpeciesVisit.id.desc()).limit(limit + 1).all()
+        if len(visits) <= limit:
+            return visits, None
+        visits = visits[:limit]
+        return visits, VisitFeed.encode_cursor(visits[-1])
+
+    @staticmethod
+    def serialize(visit: SpeciesVisit) -> Dict:
+        # Weather of the first video (assuming similar conditions during visit)
+        first = min(visit.video_species, key=lambda vs: vs.id) if visit.video_species else None
+        video = first.video if first else None
+
+        # Prepare detections for this visit
+        detections = []
+        sorted_video_species = sorted(
+            visit.video_species, key=lambda x: x.created_at, reverse=True)
+        for video_species in sorted_video_species:
+            video_start_time = video_species.video.start_time
+            detections.append({
+                'video_id': video_species.video_id,
+                'start_time': (video_start_time + timedelta(seconds=video_species.start_time)).astimezone(timezone.utc).isoformat(),
+                'end_time': (video_start_time + timedelta(seconds=video_species.end_time)).astimezone(timezone.utc).isoformat(),
+                'confidence': video_species.confidence,
+                'source': video_species.source
+            })
+
+        return {
+            'id': visit.id,
+            'start_time': visit.start_time.astimezone(timezone.utc).isoformat(),
+            'end_time': visit.end_time.astimezone(timezone.utc).isoformat(),
+            'max_simultaneous': visit.max_simultaneous,
+            'weather': {
+                'temp': video.weather_temp,
+                'clouds': video.weather_clouds,
+            } if video else None,
+            'species': {
+                'id': visit.species.id,
+                'name': visit.species.name,
+                'image_url': visit.species.image_url,
+                'parent_id': visit.species.parent_id,
+            },
+            'detections': detections
+        }
@@ -1,7 +1,10 @@
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Tuple
 import json
 from models import Video, Species, VideoSpecies, SpeciesVisit
+from services.hourly_rollup import HourlyRollup
+from services.species_stats import SpeciesStats
 from util import update_species_info_from_wiki
 
 
@@ -10,6 +13,8 @@ class VisitProcessor:
         self.db = db
         self.logger = logger
         self.visit_timeout = visit_timeout
+        # Visits touched by the current process_detections call, with their state before it
+        self._visit_baselines = {}
 
     def process_video_detection(self, species: Species, video: Video,
                                 detection_start: float, detection_end: float,
@@ -20,7 +25,11 @@ class VisitProcessor:
         Returns the visit and video_species record.
         """
         detection_time = video.start_time + timedelta(seconds=detection_start)
-        visit, _ = self._get_or_create_visit(species, detection_time)
+        visit, created = self._get_or_create_visit(species, detection_time)
+        if id(visit) not in self._visit_baselines:
+            # A new visit adds all of its totals
+            self._visit_baselines[id(visit)] = (visit, created, 0.0, 0) if created else (
+                visit, created, self._visit_duration(visit), visit.max_simultaneous)
 
         # Extend visit duration
         visit.end_time = max(
@@ -80,6 +89,7 @@ class VisitProcessor:
         """
         video_species_records = []
         visits_to_update = {}  # Map (species_id, start_time) to visit data
+        self._visit_baselines = {}
 
         # First pass: Process all detections
         for det in detections:
@@ -126,8 +136,30 @@ class VisitProcessor:
             self._update_simultaneous_count(
                 visit_data['visit'], visit_data['detections'])
 
+        # Keep the hourly rollup and species stats in step, in the same transaction
+        HourlyRollup.apply(self._rollup_deltas(video_species_records))
+        SpeciesStats.invalidate(vs.species_visit.species_id for vs in video_species_records)
+
         return video_species_records
 
+    @staticmethod
+    def _visit_duration(visit: SpeciesVisit) -> float:
+        return (visit.end_time - visit.start_time).total_seconds()
+
+    def _rollup_deltas(self, video_species_records: List[VideoSpecies]) -> Dict[Tuple[int, datetime], Dict[str, float]]:
+        """Changes to the hourly rollup made by this call, keyed by (species_id, hour of visit start)."""
+        deltas = defaultdict(lambda: defaultdict(float))
+        for visit, created, duration, max_simultaneous in self._visit_baselines.values():
+            delta = deltas[(visit.species_id, HourlyRollup.bucket(visit.start_time))]
+            delta['visits'] += int(created)
+            delta['max_simultaneous'] += visit.max_simultaneous - max_simultaneous
+            delta['duration'] += self._visit_duration(visit) - duration
+        for video_species in video_species_records:
+            visit = video_species.species_visit
+            delta = deltas[(visit.species_id, HourlyRollup.bucket(visit.start_time))]
+            delta[f'{video_species.source}_seconds'] += video_species.end_time - video_species.start_time
+        return deltas
+
     def _get_or_create_visit(self, species: Species, detection_time: datetime) -> Tuple[SpeciesVisit, bool]:
         """
         Gets existing or creates new visit for a species.
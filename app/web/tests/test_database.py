@@ -0,0 +1,93 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+web_path = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(web_path)
+from config import Config
+from database import configure_sqlite, startup_lock
+
+
+class TestSqlitePragmas(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def make_engine(self, pragmas):
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'test.db')}")
+        self.addCleanup(engine.dispose)
+        configure_sqlite(engine, pragmas)
+        with engine.begin() as connection:
+            connection.exec_driver_sql('CREATE TABLE IF NOT EXISTS heartbeat (id INTEGER PRIMARY KEY)')
+            connection.exec_driver_sql('INSERT INTO heartbeat DEFAULT VALUES')
+        return engine
+
+    def test_pragmas_applied_to_every_connection(self):
+        engine = self.make_engine(Config.SQLITE_PRAGMAS)
+        # Two connections checked out at once, so the second is a fresh one
+        with engine.connect() as first, engine.connect() as second:
+            for connection in (first, second):
+                self.assertEqual(connection.exec_driver_sql('PRAGMA journal_mode').scalar(), 'wal')
+                self.assertEqual(connection.exec_driver_sql('PRAGMA synchronous').scalar(), 1)  # NORMAL
+                self.assertEqual(connection.exec_driver_sql('PRAGMA busy_timeout').scalar(), 5000)
+                self.assertEqual(connection.exec_driver_sql('PRAGMA cache_size').scalar(), -16000)
+
+    def write_during_open_read(self, engine):
+        """Commit a write while another connection is in the middle of a read transaction."""
+        reader = engine.raw_connection()
+        try:
+            cursor = reader.cursor()
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT count(*) FROM heartbeat').fetchone()
+            with engine.begin() as writer:
+                writer.exec_driver_sql('INSERT INTO heartbeat DEFAULT VALUES')
+            # The reader keeps its snapshot
+            return cursor.execute('SELECT count(*) FROM heartbeat').fetchone()[0]
+        finally:
+            reader.rollback()
+            reader.close()
+
+    def test_readers_do_not_block_writer(self):
+        engine = self.make_engine({**Config.SQLITE_PRAGMAS, 'busy_timeout': 100})
+        self.assertEqual(self.write_during_open_read(engine), 1)
+
+    def test_rollback_journal_blocks_writer(self):
+        # What WAL avoids: with the default journal a reader holds off commits until the busy timeout
+        engine = self.make_engine({'journal_mode': 'DELETE', 'busy_timeout': 100})
+        with self.assertRaises(OperationalError):
+            self.write_during_open_read(engine)
+
+
+class TestStartupLock(unittest.TestCase):
+    def test_setup_runs_one_worker_at_a_time(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        lock_path = os.path.join(tmp_dir, 'startup.lock')
+        events = []
+
+        def worker(name):
+            with startup_lock(lock_path):
+                events.append(f'{name} start')
+                time.sleep(0.05)
+                events.append(f'{name} end')
+
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ('a', 'b', 'c')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Never two setups interleaved
+        self.assertEqual(len(events), 6)
+        for i in range(0, 6, 2):
+            self.assertEqual(events[i].split()[0], events[i + 1].split()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import logging
+import os
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from flask import Flask
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/web/tests -> app/web (modules) and app (app_config)
+web_path = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(web_path)
+sys.path.append(os.path.abspath(os.path.join(web_path, '..')))
+import routes.ui_routes
+from models import db, Species, Video, VideoSpecies, SpeciesVisit, SpeciesHourlyRollup
+from services.hourly_rollup import HourlyRollup
+from services.visit_processor import VisitProcessor
+
+DAY = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+def rollup_rows():
+    return sorted((r.species_id, r.hour, r.visits, r.max_simultaneous, r.duration, r.video_seconds, r.audio_seconds)
+                  for r in SpeciesHourlyRollup.query.all())
+
+
+class TestHourlyRollup(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        routes.ui_routes.register_routes(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        db.create_all()
+
+        # Children are grouped under the active parent; image and description set, so nothing is looked up on Wikipedia
+        self.parent = Species(name='Cardinals', image_url='img', description='desc', active=True)
+        db.session.add(self.parent)
+        db.session.flush()
+        self.names = ['Cardinals', 'Northern Cardinal', 'Pyrrhuloxia']
+        for name in self.names[1:]:
+            db.session.add(Species(name=name, parent_id=self.parent.id, image_url='img', description='desc'))
+        db.session.commit()
+        self.processor = VisitProcessor(db, logging.getLogger(__name__))
+
+    def add_videos(self, count, seed=0):
+        """Videos at irregular gaps over about two days: some extend a visit, some start new ones."""
+        rng = random.Random(seed)
+        start = DAY
+        for i in range(count):
+            start += timedelta(seconds=rng.choice([20, 40, 90, 400, 1500]))
+            video = Video(processor_version='test', start_time=start, end_time=start + timedelta(seconds=30),
+                          video_path=f'{i}.mp4', weather_temp=20.0, weather_clouds=10)
+            db.session.add(video)
+            detections = []
+            for _ in range(rng.randint(1, 3)):
+                detection_start = rng.uniform(0, 20)
+                detections.append({'species_name': rng.choice(self.names), 'source': rng.choice(['video', 'audio']),
+                                   'start_time': detection_start, 'end_time': detection_start + rng.uniform(1, 10),
+                                   'confidence': 0.9})
+            self.processor.process_detections(video, detections)
+            db.session.commit()
+
+    def live_overview(self, start, end):
+        """What the overview computed from the visits before the rollup existed."""
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        visits = [v for v in SpeciesVisit.query.all() if start <= v.start_time <= end]
+        detections = [0] * 24
+        for visit in visits:
+            detections[visit.start_time.hour] += visit.max_simultaneous
+        seconds = defaultdict(float)
+        for video_species in VideoSpecies.query.filter(VideoSpecies.species_visit_id.in_([v.id for v in visits])):
+            seconds[video_species.source] += video_species.end_time - video_species.start_time
+        duration = sum((v.end_time - v.start_time).total_seconds() for v in visits)
+        return {
+            'detections': detections,
+            'totalDetections': sum(detections),
+            'avgVisitDuration': round(duration / len(visits)) if visits else 0,
+            'videoDuration': round(seconds['video']),
+            'audioDuration': round(seconds['audio']),
+        }
+
+    def assert_rows_equal(self, rows, expected):
+        self.assertEqual([row[:4] for row in rows], [row[:4] for row in expected])
+        for row, expected_row in zip(rows, expected):
+            # Rebuilt durations come from julianday(), precise to the millisecond
+            for value, expected_value in zip(row[4:], expected_row[4:]):
+                self.assertAlmostEqual(value, expected_value, delta=0.01)
+
+    def get_overview(self, start, end):
+        response = self.app.test_client().get(
+            f'/api/ui/overview?start_time={int(start.timestamp())}&end_time={int(end.timestamp())}')
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_incremental_updates_match_rebuild(self):
+        self.add_videos(150)
+        incremental = rollup_rows()
+        HourlyRollup.rebuild()
+        self.assert_rows_equal(rollup_rows(), incremental)
+        self.assertGreater(len(incremental), 24)
+
+    def test_extending_a_visit_updates_its_start_hour(self):
+        video_start = DAY + timedelta(hours=3, minutes=59, seconds=50)
+        for i, offset in enumerate((0, 30)):
+            start = video_start + timedelta(seconds=offset)
+            video = Video(processor_version='test', start_time=start, end_time=start + timedelta(seconds=30),
+                          video_path=f'{i}.mp4')
+            db.session.add(video)
+            self.processor.process_detections(video, [{'species_name': 'Pyrrhuloxia', 'source': 'video',
+                                                       'start_time': 0.0, 'end_time': 20.0, 'confidence': 0.9}])
+            db.session.commit()
+
+        # One visit from 3:59:50 to 4:00:40, counted once in the hour it started
+        row, = SpeciesHourlyRollup.query.all()
+        self.assertEqual((row.hour, row.visits, row.max_simultaneous), (datetime(2026, 5, 1, 3), 1, 1))
+        self.assertAlmostEqual(row.duration, 50.0)
+        self.assertAlmostEqual(row.video_seconds, 40.0)
+
+    def test_overview_matches_live_query(self):
+        self.add_videos(300)
+        # UTC days, and local days in UTC+5:30 / UTC+5:45 that don't start on the hour
+        for offset in (timedelta(0), timedelta(hours=5, minutes=30), timedelta(hours=5, minutes=45)):
+            for day in range(2):
+                start = DAY + timedelta(days=day) - offset
+                end = start + timedelta(seconds=86399)
+                with self.subTest(offset=offset, day=day):
+                    expected = self.live_overview(start, end)
+                    overview = self.get_overview(start, end)
+                    self.assertEqual(overview['topSpecies'][0]['detections'], expected.pop('detections'))
+                    for key, value in expected.items():
+                        self.assertEqual(overview['stats'][key], value, key)
+
+    def test_range_within_one_hour(self):
+        self.add_videos(100)
+        start = DAY + timedelta(hours=2, minutes=10)
+        end = start + timedelta(minutes=30)
+        expected = self.live_overview(start, end)
+        self.assertEqual(self.get_overview(start, end)['stats']['totalDetections'], expected['totalDetections'])
+
+    def test_backfill_builds_missing_rollup_once(self):
+        self.add_videos(50)
+        expected = rollup_rows()
+        db.session.query(SpeciesHourlyRollup).delete()
+        db.session.commit()
+
+        HourlyRollup.backfill_if_missing()
+        self.assert_rows_equal(rollup_rows(), expected)
+
+        # A later start (or another worker after the first) finds the rollup and leaves it alone
+        with patch.object(HourlyRollup, 'rebuild') as rebuild:
+            HourlyRollup.backfill_if_missing()
+        rebuild.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
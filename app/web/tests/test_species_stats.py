@@ -0,0 +1,107 @@
+import unittest
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from flask import Flask
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/web/tests -> app/web (modules) and app (app_config)
+web_path = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(web_path)
+sys.path.append(os.path.abspath(os.path.join(web_path, '..')))
+import routes.ui_routes
+from models import db, Species, Video, SpeciesStatsCache
+from services.species_stats import SpeciesStats, STATS_MAX_AGE
+from services.visit_processor import VisitProcessor
+
+
+class TestSpeciesStats(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        routes.ui_routes.register_routes(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        db.create_all()
+
+        # Image and description set, so nothing is looked up on Wikipedia
+        self.parent = Species(name='Cardinals', image_url='img', description='desc')
+        db.session.add(self.parent)
+        db.session.flush()
+        self.child = Species(name='Northern Cardinal', parent_id=self.parent.id, image_url='img', description='desc')
+        db.session.add(self.child)
+        db.session.commit()
+        self.processor = VisitProcessor(db, logging.getLogger(__name__))
+        self.videos = 0
+
+        self.real_compute = SpeciesStats.compute
+        compute = patch.object(SpeciesStats, 'compute', wraps=self.real_compute)
+        self.compute = compute.start()
+        self.addCleanup(compute.stop)
+
+    def add_visit(self):
+        """A new visit of the child species, recent enough for the 24h window."""
+        self.videos += 1
+        start = datetime.now(timezone.utc) - timedelta(hours=10 - self.videos)
+        video = Video(processor_version='test', start_time=start, end_time=start + timedelta(seconds=30),
+                      video_path=f'{self.videos}.mp4')
+        db.session.add(video)
+        self.processor.process_detections(video, [{'species_name': 'Northern Cardinal', 'source': 'video',
+                                                   'start_time': 0.0, 'end_time': 5.0, 'confidence': 0.9}])
+        db.session.commit()
+
+    def get_detections(self):
+        response = self.app.test_client().get(f'/api/ui/species/{self.parent.id}/summary')
+        self.assertEqual(response.status_code, 200)
+        return response.json['stats']['detections']['detections_24h']
+
+    def cache_row(self):
+        db.session.expire_all()
+        return db.session.get(SpeciesStatsCache, self.parent.id)
+
+    def test_fresh_stats_are_served_from_cache(self):
+        self.add_visit()
+        self.assertEqual(self.get_detections(), 1)
+        self.assertEqual(self.get_detections(), 1)
+        self.assertEqual(self.compute.call_count, 1)
+        # Per-species stats survive the JSON round trip with integer keys
+        response = self.app.test_client().get(f'/api/ui/species/{self.parent.id}/summary')
+        self.assertEqual(response.json['subspecies'][0]['stats']['detections']['detections_24h'], 1)
+
+    def test_new_visit_invalidates_parent_and_child(self):
+        self.add_visit()
+        self.get_detections()
+        self.add_visit()
+        self.assertIsNone(self.cache_row().data)
+        self.assertEqual(self.get_detections(), 2)
+        self.assertEqual(self.compute.call_count, 2)
+
+    def test_expired_stats_are_recomputed(self):
+        self.get_detections()
+        row = self.cache_row()
+        row.computed_at -= STATS_MAX_AGE + timedelta(seconds=1)
+        db.session.commit()
+        self.get_detections()
+        self.assertEqual(self.compute.call_count, 2)
+
+    def test_stats_computed_during_invalidation_are_not_stored(self):
+        self.add_visit()
+
+        def visit_commits_midway(all_species_ids):
+            # Computed from the visits before the new one, which commits before the result is stored
+            data = self.real_compute(all_species_ids)
+            self.add_visit()
+            return data
+
+        with patch.object(SpeciesStats, 'compute', side_effect=visit_commits_midway):
+            self.assertEqual(self.get_detections(), 1)
+        self.assertIsNone(self.cache_row().data)
+        self.assertEqual(self.get_detections(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from sqlalchemy import event
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# app/web/tests -> app/web (modules) and app (app_config)
+web_path = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.append(web_path)
+sys.path.append(os.path.abspath(os.path.join(web_path, '..')))
+import routes.ui_routes
+from models import db, Species, Video
+from services.visit_processor import VisitProcessor
+
+DAY = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+class TestVisitFeed(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        routes.ui_routes.register_routes(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        db.create_all()
+
+        # Image and description set, so nothing is looked up on Wikipedia
+        self.parent = Species(name='Cardinals', image_url='img', description='desc')
+        db.session.add(self.parent)
+        db.session.flush()
+        for name in ('Northern Cardinal', 'Pyrrhuloxia'):
+            db.session.add(Species(name=name, parent_id=self.parent.id, image_url='img', description='desc'))
+        db.session.commit()
+        self.processor = VisitProcessor(db, logging.getLogger(__name__))
+
+    def add_visits(self, count, detections_per_visit=3, species=('Northern Cardinal',)):
+        """Videos far enough apart that each one starts a new visit per species."""
+        start = DAY + timedelta(hours=1, minutes=len(Video.query.all()) * 5)
+        for i in range(count):
+            video_start = start + timedelta(minutes=5 * i)
+            video = Video(processor_version='test', start_time=video_start, end_time=video_start + timedelta(seconds=30),
+                          video_path=f'{i}.mp4', weather_temp=20.0, weather_clouds=10)
+            db.session.add(video)
+            detections = [{'species_name': name, 'source': 'video', 'start_time': float(d),
+                           'end_time': d + 2.0, 'confidence': 0.9} for name in species for d in range(detections_per_visit)]
+            detections.append({'species_name': 'Cardinals', 'source': 'audio', 'start_time': 0.0,
+                               'end_time': 3.0, 'confidence': 0.8})
+            self.processor.process_detections(video, detections)
+            db.session.commit()
+
+    def get_counting_queries(self, url):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response = self.app.test_client().get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        self.assertEqual(response.status_code, 200)
+        return response.json, len(statements)
+
+    def timeline_url(self):
+        start = int(DAY.timestamp())
+        return f'/api/ui/timeline?start_time={start}&end_time={start + 86399}'
+
+    def test_timeline_query_count_does_not_grow_with_visits(self):
+        self.add_visits(3)
+        visits, few_queries = self.get_counting_queries(self.timeline_url())
+        self.assertEqual(len(visits), 3)
+
+        self.add_visits(20)
+        visits, many_queries = self.get_counting_queries(self.timeline_url())
+        self.assertEqual(len(visits), 23)
+        self.assertEqual(many_queries, few_queries)
+        self.assertLessEqual(many_queries, 3)
+
+        # One entry per visit, with all of its video and audio detections
+        self.assertEqual(len({v['id'] for v in visits}), len(visits))
+        self.assertTrue(all(len(v['detections']) == 4 for v in visits))
+        self.assertEqual(visits[0]['weather'], {'temp': 20.0, 'clouds': 10})
+
+    def test_recent_visits_match_timeline(self):
+        self.add_visits(12)
+        timeline, _ = self.get_counting_queries(self.timeline_url())
+        summary, _ = self.get_counting_queries(f'/api/ui/species/{self.parent.id}/summary')
+        self.assertEqual(summary['recentVisits'], timeline[:10])
+
+    def test_visit_pages_cover_history_once(self):
+        # Two species per video: visits with the same start time, ordered by id
+        self.add_visits(7, detections_per_visit=1, species=('Northern Cardinal', 'Pyrrhuloxia'))
+        all_ids = [v['id'] for v in self.get_counting_queries('/api/ui/visits?limit=200')[0]['visits']]
+        self.assertEqual(len(all_ids), 14)
+
+        paged_ids, cursor = [], None
+        while True:
+            url = f'/api/ui/visits?limit=3&species_id={self.parent.id}' + (f'&cursor={cursor}' if cursor else '')
+            page, queries = self.get_counting_queries(url)
+            self.assertLessEqual(queries, 4)
+            paged_ids += [v['id'] for v in page['visits']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(paged_ids, all_ids)
+
+        # Filters on the visits' detections
+        self.assertEqual(len(self.get_counting_queries('/api/ui/visits?source=audio')[0]['visits']), 7)
+        self.assertEqual(self.get_counting_queries('/api/ui/visits?min_confidence=0.95')[0]['visits'], [])
+        self.assertEqual(self.app.test_client().get('/api/ui/visits?cursor=bogus').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
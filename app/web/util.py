@@ -2,6 +2,7 @@ import logging
 from datetime import timedelta, datetime
 import requests
 import re
+import threading
 import time
 from app_config.app_config import app_config
 from models import Species, db
@@ -139,6 +140,35 @@ def update_species_info_from_wiki(sp):
     return bool(image_url or description)
 
 
+# Species IDs with a Wikipedia lookup in flight or recently attempted -> attempt time
+_wiki_attempts = {}
+_wiki_lock = threading.Lock()
+WIKI_RETRY_SECONDS = 3600
+
+
+def update_species_info_from_wiki_async(app, species):
+    """Fill missing species data from Wikipedia in a background thread, so requests don't wait on it."""
+    if species.image_url and species.description:
+        return
+    with _wiki_lock:
+        last_attempt = _wiki_attempts.get(species.id)
+        if last_attempt is not None and time.time() - last_attempt < WIKI_RETRY_SECONDS:
+            return
+        _wiki_attempts[species.id] = time.time()
+
+    def run(species_id):
+        with app.app_context():
+            try:
+                sp = db.session.get(Species, species_id)
+                if sp and update_species_info_from_wiki(sp):
+                    db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logging.warning(f'Failed to update species {species_id} from Wikipedia: {e}')
+
+    threading.Thread(target=run, args=(species.id,), daemon=True).start()
+
+
 def notify(message, link="live", tags=None):
     if app_config.get('general.enable_notifications'):
         requests.post("http://ntfy/birdlense",